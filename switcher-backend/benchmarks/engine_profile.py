@@ -0,0 +1,122 @@
+"""Compara los perfiles "default" y "production" del motor SQLite con movimientos concurrentes.
+
+Un hilo de escritura (como el hilo de base de datos del servidor) aplica movimientos en varias partidas y confirma
+cada uno, mientras otros hilos leen la lista de salas sin parar. Con el perfil "production" los lectores usan el
+pool de solo lectura.
+
+Uso:
+    PYTHONPATH=. python benchmarks/engine_profile.py --games 50 --readers 4 --seconds 5
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from src.database import Base, create_sqlite_engine
+from src.games.infrastructure.models import Game as GameDB
+from src.players.infrastructure.models import Player as PlayerDB
+from src.rooms.infrastructure.models import PlayerRoom as PlayerRoomDB
+from src.rooms.infrastructure.models import Room as RoomDB
+from src.rooms.infrastructure.repository import SQLAlchemyRepository as RoomRepository
+
+COLORS = "RGBY"
+
+
+def populate(session_factory: sessionmaker, games: int) -> None:
+    with session_factory() as db:
+        for gameID in range(1, games + 1):
+            players = [PlayerDB(username=f"player {gameID}-{seat}") for seat in range(4)]
+            db.add_all(players)
+            db.flush()
+            db.add(RoomDB(roomID=gameID, roomName=f"room {gameID}", minPlayers=2, maxPlayers=4))
+            db.flush()
+            db.add_all(
+                PlayerRoomDB(playerID=player.playerID, roomID=gameID, position=seat + 1)
+                for seat, player in enumerate(players)
+            )
+            board = "".join(random.choice(COLORS) for _ in range(36))
+            db.add(GameDB(gameID=gameID, roomID=gameID, board=board, lastMovements=json.dumps([])))
+        db.commit()
+
+
+def run_profile(profile: str, games: int, readers: int, seconds: float) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), f"{profile}.sqlite")
+    write_engine = create_sqlite_engine(path, profile=profile)
+    Base.metadata.create_all(bind=write_engine)
+    WriteSession = sessionmaker(bind=write_engine)
+    populate(WriteSession, games)
+
+    read_engine = create_sqlite_engine(path, profile=profile, read_only=True) if profile == "production" else None
+    ReadSession = sessionmaker(bind=read_engine or write_engine)
+
+    stop = threading.Event()
+    counts = {"moves": 0, "reads": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def writer() -> None:
+        with WriteSession() as db:
+            while not stop.is_set():
+                game = db.get(GameDB, random.randint(1, games))
+                board = list(game.board)
+                origin, destination = random.sample(range(36), 2)
+                board[origin], board[destination] = board[destination], board[origin]
+                game.board = "".join(board)
+                game.lastMovements = json.dumps([{"origin": origin, "destination": destination}])
+                try:
+                    db.commit()
+                    counts["moves"] += 1
+                except OperationalError:
+                    db.rollback()
+                    counts["errors"] += 1
+
+    def reader() -> None:
+        while not stop.is_set():
+            try:
+                with ReadSession() as db:
+                    RoomRepository(db).get_all_rooms()
+                with lock:
+                    counts["reads"] += 1
+            except OperationalError:
+                with lock:
+                    counts["errors"] += 1
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    write_engine.dispose()
+    if read_engine is not None:
+        read_engine.dispose()
+
+    return {
+        "profile": profile,
+        "moves/s": round(counts["moves"] / seconds, 1),
+        "lobby reads/s": round(counts["reads"] / seconds, 1),
+        "lock errors": counts["errors"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=50)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    for profile in ("default", "production"):
+        print(run_profile(profile, args.games, args.readers, args.seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Mide cuánto tarda en armarse la lista de salas del lobby con 1.000 y 10.000 salas.
+
+Compara la consulta agregada de `get_all_rooms` con el recorrido anterior, que cargaba los jugadores de cada sala y
+consultaba `player_room` dos veces por jugador. El recorrido anterior se salta con `--skip-per-room` porque con
+10.000 salas hace cientos de miles de consultas.
+
+Uso:
+    PYTHONPATH=. python benchmarks/lobby_rooms.py --rooms 1000 10000 --players 3
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.database import Base, create_sqlite_engine
+from src.games.infrastructure.models import Game as GameDB
+from src.players.infrastructure.models import Player as PlayerDB
+from src.rooms.domain.models import RoomExtendedInfo
+from src.rooms.infrastructure.models import PlayerRoom as PlayerRoomDB
+from src.rooms.infrastructure.models import Room as RoomDB
+from src.rooms.infrastructure.repository import SQLAlchemyRepository as RoomRepository
+
+
+def populate(session_factory: sessionmaker, rooms: int, players: int) -> None:
+    with session_factory() as db:
+        for roomID in range(1, rooms + 1):
+            members = [PlayerDB(username=f"player {roomID}-{seat}") for seat in range(players)]
+            db.add_all(members)
+            db.flush()
+            password = "secreta" if roomID % 5 == 0 else None
+            db.add(RoomDB(roomID=roomID, roomName=f"room {roomID}", minPlayers=2, maxPlayers=4, password=password))
+            db.flush()
+            db.add_all(
+                PlayerRoomDB(playerID=player.playerID, roomID=roomID, position=seat + 1, isActive=seat != 0)
+                for seat, player in enumerate(members)
+            )
+            if roomID % 2 == 0:
+                db.add(GameDB(roomID=roomID, board="RGBY" * 9, lastMovements="[]"))
+        db.commit()
+
+
+def get_all_rooms_per_room(db_session: Session) -> list:
+    """Implementación anterior de `get_all_rooms`, conservada solo como referencia"""
+    room_list = []
+    for room in db_session.query(RoomDB).order_by(RoomDB.roomID).all():
+        active = [
+            player.playerID
+            for player in room.players
+            if db_session.query(PlayerRoomDB).filter_by(playerID=player.playerID, roomID=room.roomID).one().isActive
+        ]
+        room_list.append(
+            RoomExtendedInfo(
+                roomID=room.roomID,
+                roomName=room.roomName,
+                maxPlayers=room.maxPlayers,
+                actualPlayers=len(active),
+                started=room.game is not None,
+                private=room.password is not None,
+                playersID=active,
+            )
+        )
+    return room_list
+
+
+def measure(engine, session_factory: sessionmaker, function) -> tuple:
+    queries = 0
+
+    def count(*args):
+        nonlocal queries
+        queries += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        with session_factory() as db:
+            start = time.perf_counter()
+            rooms = function(db)
+            elapsed = time.perf_counter() - start
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return rooms, elapsed, queries
+
+
+def run(rooms: int, players: int, skip_per_room: bool) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), f"lobby-{rooms}.sqlite")
+    engine = create_sqlite_engine(path)
+    Base.metadata.create_all(bind=engine)
+    SessionFactory = sessionmaker(bind=engine)
+    populate(SessionFactory, rooms, players)
+
+    result = {"rooms": rooms}
+    aggregated, elapsed, queries = measure(engine, SessionFactory, lambda db: RoomRepository(db).get_all_rooms())
+    result["aggregated ms"] = round(elapsed * 1000, 1)
+    result["aggregated queries"] = queries
+
+    if not skip_per_room:
+        per_room, elapsed, queries = measure(engine, SessionFactory, get_all_rooms_per_room)
+        assert per_room == aggregated
+        result["per room ms"] = round(elapsed * 1000, 1)
+        result["per room queries"] = queries
+
+    engine.dispose()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--players", type=int, default=3)
+    parser.add_argument("--skip-per-room", action="store_true")
+    args = parser.parse_args()
+
+    for rooms in args.rooms:
+        print(run(rooms, args.players, args.skip_per_room))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,24 @@ from unittest.mock import patch
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import StaticPool, create_engine
+from sqlalchemy import StaticPool, create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 from src.database import Base, get_db
+from src.games.infrastructure.cache import game_states
+from src.games.infrastructure.figure_index import figure_indexes
+from src.games.infrastructure.models import FigureCard as FigureCardDB
+from src.games.infrastructure.models import Game as GameDB
+from src.games.infrastructure.models import MovementCard as MovementCardDB
+from src.games.infrastructure.status import game_status_history
+from src.games.infrastructure.timer import turn_timers
 from src.main import app
+from src.players.infrastructure.models import Player as PlayerDB
+from src.rooms.infrastructure.lobby import lobby_broadcaster, lobby_rooms
+from src.rooms.infrastructure.models import PlayerRoom as PlayerRoomDB
+from src.rooms.infrastructure.models import Room as RoomDB
+from src.rooms.infrastructure.passwords import password_hasher
+from src.shared.websocket import heartbeats
 
 engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
 
@@ -26,8 +39,16 @@ app.dependency_overrides[get_db] = override_get_db
 
 @pytest.fixture(autouse=True)
 def mock_mi_funcion():
-    with patch("src.games.application.service.GameService._run_timer") as mock_func:
+    with patch.object(turn_timers, "on_expire") as mock_func:
         yield mock_func
+    turn_timers.clean_up()
+
+
+@pytest.fixture(autouse=True)
+def flush_lobby_immediately():
+    with patch.object(lobby_broadcaster, "window", 0):
+        yield
+    lobby_broadcaster.clean_up()
 
 
 @pytest.fixture(scope="function")
@@ -39,8 +60,74 @@ def test_db():
     finally:
         db.close()
         Base.metadata.drop_all(bind=engine)
+        game_states.clean_up()
+        figure_indexes.clean_up()
+        game_status_history.clean_up()
+        lobby_rooms.clean_up()
+        password_hasher.clean_up()
+        heartbeats.clean_up()
 
 
 @pytest.fixture(scope="function")
 def client():
     return TestClient(app)
+
+
+def _create_game(db, amount_players=2):
+    players = [PlayerDB(username=f"player{i}") for i in range(1, amount_players + 1)]
+    db.add_all(players)
+    db.commit()
+
+    room = RoomDB(roomName="test_room1", minPlayers=2, maxPlayers=4, hostID=players[0].playerID)
+    db.add(room)
+    db.commit()
+
+    db.add_all(
+        [
+            PlayerRoomDB(playerID=player.playerID, roomID=room.roomID, position=position)
+            for position, player in enumerate(players, start=1)
+        ]
+    )
+    game = GameDB(roomID=room.roomID, board="RGBY" * 9, lastMovements="[]", posEnabledToPlay=1, prohibitedColor="R")
+    db.add(game)
+    db.commit()
+
+    for player in players:
+        db.add_all(
+            [
+                MovementCardDB(gameID=game.gameID, playerID=player.playerID, type="mov01"),
+                FigureCardDB(gameID=game.gameID, playerID=player.playerID, type="fig01", isPlayable=True),
+                FigureCardDB(gameID=game.gameID, playerID=player.playerID, type="fig02", isPlayable=False),
+            ]
+        )
+    db.commit()
+    return game.gameID, [player.playerID for player in players]
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *args):
+        event.remove(engine, "before_cursor_execute", self)
+
+
+@pytest.fixture(scope="function")
+def game_factory():
+    """Crea una partida con sus jugadores y una mano mínima.
+    Uso: gameID, playerIDs = game_factory(db, amount_players=2)
+    """
+    return _create_game
+
+
+@pytest.fixture(scope="function")
+def query_counter():
+    """Cuenta las consultas a la base de datos dentro de un bloque with query_counter() as counter"""
+    return QueryCounter
@@ -1,19 +1,81 @@
+import asyncio
+import functools
+import inspect
 import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from types import TracebackType
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar, Union
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+
+from src.shared.config import (
+    DB_ENGINE_PROFILE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_SIZE,
+    DB_READ_POOL_SIZE,
+    SQLITE_PRAGMAS,
+)
+from src.shared.unit_of_work import UnitOfWork, run_effect
 
 sqlite_file_url = "../database.sqlite"
 base_dir = os.path.dirname(os.path.realpath(__file__))
-database_url = f"sqlite:///{os.path.join(base_dir, sqlite_file_url)}"
+database_path = os.path.join(base_dir, sqlite_file_url)
+database_url = f"sqlite:///{database_path}"
+
+
+def set_pragmas(pragmas: Dict[str, Union[int, str]], dbapi_connection: Any, connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def create_sqlite_engine(path: str, profile: str = DB_ENGINE_PROFILE, read_only: bool = False) -> Engine:
+    """Crea un motor para la base de datos SQLite del archivo indicado
+
+    Args:
+        path (str): Ruta del archivo de la base de datos
+        profile (str): "production" ejecuta SQLITE_PRAGMAS en cada conexión, "default" no cambia nada
+        read_only (bool): Si las conexiones abren el archivo en modo de solo lectura
+    """
+    if not read_only:
+        engine = create_engine(f"sqlite:///{path}", echo=False, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+        pragmas = SQLITE_PRAGMAS
+    else:
+        engine = create_engine(
+            f"sqlite:///file:{path}?mode=ro&uri=true", echo=False, pool_size=DB_READ_POOL_SIZE, max_overflow=0
+        )
+        # El modo WAL lo fija la conexión de escritura y queda guardado en el archivo
+        pragmas = {**{k: v for k, v in SQLITE_PRAGMAS.items() if k != "journal_mode"}, "query_only": "ON"}
+
+    if profile == "production":
+        event.listen(engine, "connect", functools.partial(set_pragmas, pragmas))
+    return engine
 
-engine = create_engine(database_url, echo=False, pool_size=100, max_overflow=100)
 
+engine = create_sqlite_engine(database_path)
 
 SessionLocal = sessionmaker(bind=engine)
 
+# Lecturas de la lista de salas y de snapshots: no toman locks de escritura y, en modo WAL, no esperan a las
+# escrituras en curso
+read_engine: Optional[Engine] = None
+if DB_ENGINE_PROFILE == "production":
+    read_engine = create_sqlite_engine(database_path, read_only=True)
+
+ReadSessionLocal = sessionmaker(bind=read_engine)
+
 Base = declarative_base()
 
+# Todas las consultas se ejecutan en este hilo: el event loop nunca espera al disco, SQLite recibe una sola
+# escritura a la vez y los caches en memoria de los repositorios solo se modifican desde un hilo
+db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="database")
+db_read_executor = ThreadPoolExecutor(max_workers=DB_READ_POOL_SIZE, thread_name_prefix="database-read")
+
+T = TypeVar("T")
+
 
 def get_db():
     db = SessionLocal()
@@ -21,3 +83,180 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def run_db(function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Ejecuta una función que accede a la base de datos en el hilo de base de datos
+
+    Args:
+        function (Callable): Función síncrona a ejecutar
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, functools.partial(function, *args, **kwargs))
+
+
+def uses_read_pool(db_session: Session) -> bool:
+    return read_engine is not None and db_session.get_bind() is engine
+
+
+def open_read_session(db_session: Session) -> Session:
+    """Abre una sesión de corta duración para lecturas sobre la misma base de datos que db_session.
+    Usa el pool de solo lectura cuando db_session usa el motor principal.
+
+    Args:
+        db_session (Session): Sesión del request
+    """
+    if uses_read_pool(db_session):
+        return ReadSessionLocal()
+    return Session(bind=db_session.get_bind())
+
+
+async def run_read(db_session: Session, function: Callable[[Session], T]) -> T:
+    """Ejecuta una lectura que no depende de los caches en memoria (como la lista de salas).
+    Con el pool de solo lectura corre en paralelo con el hilo de base de datos, usando una sesión propia; si no,
+    corre en el hilo de base de datos con la sesión del request.
+
+    Args:
+        db_session (Session): Sesión del request, indica la base de datos a leer
+        function (Callable[[Session], T]): Lectura a ejecutar
+    """
+    if not uses_read_pool(db_session):
+        return await run_db(function, db_session)
+
+    def read() -> T:
+        with ReadSessionLocal() as read_session:
+            return function(read_session)
+
+    return await asyncio.get_running_loop().run_in_executor(db_read_executor, read)
+
+
+def writes(method: Callable[..., T]) -> Callable[..., T]:
+    """Marca un método de repositorio que confirma cambios con commit, directamente o a través de otro método"""
+    method.writes = True
+    return method
+
+
+class AsyncRepository:
+    """Versión asíncrona de un repositorio SQLAlchemy.
+    Cada método síncrono del repositorio se ejecuta con run_db y se espera como una corutina; los métodos que
+    ya son asíncronos (envío por websockets) se devuelven sin cambios.
+    Fuera de una unidad de trabajo los métodos marcados con @writes confirman cambios, así que esperan el candado
+    de escritura igual que las unidades de trabajo. Las lecturas no lo esperan: en modo WAL no bloquean a la
+    escritura en curso.
+    """
+
+    def __init__(self, repository: Any):
+        self.repository = repository
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.repository, name)
+        if not callable(attribute) or inspect.iscoroutinefunction(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            db_session = getattr(self.repository, "db_session", None)
+            if not getattr(attribute, "writes", False) or db_session is None or db_session.info.get("unit_of_work"):
+                return await run_db(attribute, *args, **kwargs)
+            async with write_lock():
+                return await run_db(attribute, *args, **kwargs)
+
+        return call
+
+
+def commit(db_session: Session) -> None:
+    """Confirma los cambios de un repositorio. Si la sesión tiene una unidad de trabajo abierta solo los envía a la
+    base de datos (flush), y la unidad de trabajo los confirma al terminar.
+    Los commits fuera de una unidad de trabajo llegan siempre a través de un método @writes de AsyncRepository, que
+    toma write_lock antes de encolarlos en el hilo de base de datos.
+
+    Args:
+        db_session (Session): Sesión del repositorio
+    """
+    if db_session.info.get("unit_of_work"):
+        db_session.flush()
+    else:
+        db_session.commit()
+
+
+async def after_commit(db_session: Session, callback: Callable[..., Any], *args: Any) -> None:
+    """Ejecuta un efecto visible fuera de la base de datos cuando se confirman los cambios de la sesión.
+    Con una unidad de trabajo abierta el efecto espera a que termine, y se descarta si se revierte; si no, corre
+    en el momento.
+
+    Args:
+        db_session (Session): Sesión del repositorio
+        callback (Callable[..., Any]): Función o corutina a ejecutar
+    """
+    if db_session.info.get("unit_of_work"):
+        db_session.info["after_commit"].append((callback, args))
+    else:
+        await run_effect(callback, *args)
+
+
+write_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+
+
+def write_lock() -> asyncio.Lock:
+    """Candado que serializa las escrituras del event loop actual: las unidades de trabajo y las llamadas a
+    repositorios fuera de ellas.
+    SQLite admite una sola transacción de escritura a la vez: si una escritura se intercalara con una unidad de
+    trabajo abierta, esperaría el lock de SQLite bloqueando el hilo de base de datos que la unidad de trabajo
+    necesita para terminar.
+    """
+    loop = asyncio.get_running_loop()
+    lock = write_locks.get(loop)
+    if lock is None:
+        lock = write_locks[loop] = asyncio.Lock()
+    return lock
+
+
+class SQLAlchemyUnitOfWork(UnitOfWork):
+    """Unidad de trabajo sobre la sesión del request: un solo commit por caso de uso"""
+
+    def __init__(self, db_session: Session):
+        self.db_session = db_session
+        self.lock: Optional[asyncio.Lock] = None
+
+    async def __aenter__(self) -> "SQLAlchemyUnitOfWork":
+        depth = self.db_session.info.get("unit_of_work", 0)
+        if depth == 0:
+            self.lock = write_lock()
+            await self.lock.acquire()
+            self.db_session.info["after_commit"] = []
+        self.db_session.info["unit_of_work"] = depth + 1
+        return self
+
+    async def after_commit(self, callback: Callable[..., Any], *args: Any) -> None:
+        await after_commit(self.db_session, callback, *args)
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        depth = self.db_session.info["unit_of_work"] - 1
+        self.db_session.info["unit_of_work"] = depth
+        if depth > 0:
+            return
+        effects: List[Tuple[Callable[..., Any], Tuple[Any, ...]]] = self.db_session.info.pop("after_commit", [])
+        try:
+            await run_db(self.finish, exc_type is None)
+        finally:
+            if self.lock is not None:
+                self.lock.release()
+                self.lock = None
+        if exc_type is None:
+            for callback, args in effects:
+                await run_effect(callback, *args)
+
+    def finish(self, succeeded: bool) -> None:
+        if not succeeded:
+            self.db_session.rollback()
+            return
+        try:
+            self.db_session.commit()
+        except Exception:
+            self.db_session.rollback()
+            raise
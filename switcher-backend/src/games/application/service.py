@@ -1,12 +1,11 @@
-import asyncio
 import datetime
-import time
 from typing import List, Optional
 
-from fastapi import BackgroundTasks, WebSocket
+from fastapi import WebSocket
 
-from src.games.domain.models import BoardPiecePosition, GameID, MovementCardRequest
-from src.games.domain.repository import GameRepositoryWS
+from src.games.domain.models import BoardPiecePosition, GameID, Hint, MovementCardMoves, MovementCardRequest
+from src.games.domain.movements import hand_movements
+from src.games.domain.repository import GameRepositoryWS, TurnScheduler
 from src.games.domain.service import GameServiceDomain
 from src.games.domain.service import RepositoryValidators as GameRepositoryValidators
 from src.players.domain.models import PlayerID
@@ -14,6 +13,7 @@ from src.players.domain.repository import PlayerRepository
 from src.players.domain.service import RepositoryValidators as PlayerRepositoryValidators
 from src.rooms.domain.repository import RoomRepositoryWS
 from src.rooms.domain.service import RepositoryValidators as RoomRepositoryValidators
+from src.shared.unit_of_work import AutoCommit, UnitOfWork
 
 
 class GameService:
@@ -22,10 +22,14 @@ class GameService:
         game_repository: GameRepositoryWS,
         player_repository: PlayerRepository,
         room_repository: Optional[RoomRepositoryWS] = None,
+        turn_scheduler: Optional[TurnScheduler] = None,
+        unit_of_work: Optional[UnitOfWork] = None,
     ):
         self.game_repository = game_repository
         self.player_repository = player_repository
         self.room_repository = room_repository
+        self.turn_scheduler = turn_scheduler
+        self.unit_of_work = unit_of_work or AutoCommit()
         self.player_domain_service = PlayerRepositoryValidators(player_repository)
         if room_repository is not None:
             self.room_domain_service = RoomRepositoryValidators(room_repository, player_repository)
@@ -33,176 +37,216 @@ class GameService:
 
         self.recently_unblocked_cards: List[int] = []
 
-    async def _set_turn_timer(
-        self, gameID: int, playerID: int, total_seconds: int, background_tasks: BackgroundTasks
-    ) -> None:
+    async def _set_turn_timer(self, gameID: int, total_seconds: int) -> None:
         timestamp = datetime.datetime.now() + datetime.timedelta(seconds=total_seconds)
-        self.game_repository.set_timestamp_next_turn(gameID, timestamp)
-        background_tasks.add_task(self._run_timer, playerID, gameID, timestamp, background_tasks)
+        await self.game_repository.set_timestamp_next_turn(gameID, timestamp)
+        if self.turn_scheduler is not None:
+            await self.unit_of_work.after_commit(self.turn_scheduler.schedule, gameID, total_seconds)
 
-    async def _run_timer(
-        self, playerID: int, gameID: int, timestamp: datetime.datetime, background_tasks: BackgroundTasks
-    ) -> None:
-        try:
-            while datetime.datetime.now() < timestamp:
-                if self.game_repository.get_current_timestamp_next_turn(gameID) == timestamp:
-                    await asyncio.sleep(0.5)
-                else:
-                    break
-            if self.game_repository.get_current_timestamp_next_turn(gameID) == timestamp:
-                await self.skip_turn(playerID, gameID, background_tasks, auto=True)
-        except AttributeError:
-            pass
-
-    async def start_game(self, roomID: int, playerID: PlayerID, background_tasks: BackgroundTasks) -> GameID:
-        await self.player_domain_service.validate_player_exists(playerID.playerID)
-        await self.room_domain_service.validate_room_exists(roomID)
-        self.room_domain_service.validate_player_is_owner(playerID.playerID, roomID)
-        self.game_domain_service.validate_min_players_to_start(roomID)
-
-        board = GameServiceDomain.create_board()
-
-        response = self.game_repository.create(roomID, board)
-        gameID = response.gameID
-
-        self.game_repository.create_figure_cards(gameID)
-        self.game_repository.create_movement_cards(gameID)
+    async def _end_game(self, gameID: int) -> None:
+        await self.game_repository.delete_and_clean(gameID)
+        if self.turn_scheduler is not None:
+            await self.unit_of_work.after_commit(self.turn_scheduler.cancel, gameID)
+
+    async def _broadcast_room_list(self, roomID: int) -> None:
+        if self.room_repository is not None:
+            await self.room_repository.broadcast_status_room_list(roomID)
 
+    async def start_game(self, roomID: int, playerID: PlayerID) -> GameID:
         if self.room_repository is None:
             raise ValueError("RoomRepository is required to start a game")
-        game_service_domain = GameServiceDomain(self.game_repository, self.room_repository)
 
-        first_turnID = game_service_domain.set_game_turn_order(gameID)
-        await self._set_turn_timer(gameID, first_turnID, 120, background_tasks)
-        await self.room_repository.broadcast_status_room_list()
+        async with self.unit_of_work:
+            await self.player_domain_service.validate_player_exists(playerID.playerID)
+            await self.room_domain_service.validate_room_exists(roomID)
+            await self.room_domain_service.validate_player_is_owner(playerID.playerID, roomID)
+            await self.game_domain_service.validate_min_players_to_start(roomID)
+
+            board = GameServiceDomain.create_board()
+
+            response = await self.game_repository.create(roomID, board)
+            gameID = response.gameID
+
+            await self.game_repository.create_figure_cards(gameID)
+            await self.game_repository.create_movement_cards(gameID)
+
+            game_service_domain = GameServiceDomain(self.game_repository, self.room_repository)
+
+            await game_service_domain.set_game_turn_order(gameID)
+            await self._set_turn_timer(gameID, 120)
+
+        await self.room_repository.broadcast_status_room_list(roomID)
         await self.room_repository.broadcast_start_game(roomID, gameID)
 
         return response
 
-    async def skip_turn(
-        self, playerID: int, gameID: int, background_tasks: BackgroundTasks, auto: bool = False
-    ) -> None:
-        await self.player_domain_service.validate_player_exists(playerID)
-        await self.game_domain_service.validate_game_exists(gameID)
-        await self.game_domain_service.is_player_in_game(playerID, gameID)
-        self.game_domain_service.validate_is_player_turn(playerID, gameID)
-        posEnabledToPlay = self.game_repository.skip(gameID)
-        self.game_repository.clean_partial_movements(gameID)
-        self.game_repository.replacement_movement_card(gameID, playerID)
-        self.game_repository.replacement_figure_card(gameID, playerID)
+    async def skip_turn(self, playerID: int, gameID: int, auto: bool = False) -> None:
+        async with self.unit_of_work:
+            await self.player_domain_service.validate_player_exists(playerID)
+            await self.game_domain_service.validate_game_exists(gameID)
+            await self.game_domain_service.is_player_in_game(playerID, gameID)
+            await self.game_domain_service.validate_is_player_turn(playerID, gameID)
+            await self.game_repository.skip(gameID)
+            await self.game_repository.clean_partial_movements(gameID)
+            await self.game_repository.replacement_movement_card(gameID, playerID)
+            await self.game_repository.replacement_figure_card(gameID, playerID)
 
-        await self.game_repository.send_log_turn_skip(gameID, playerID, auto)
-        next_turn = self.room_domain_service.room_repository.get_turn(gameID, posEnabledToPlay)
-        await self._set_turn_timer(gameID, next_turn, 120, background_tasks)
+            await self.game_repository.send_log_turn_skip(gameID, playerID, auto)
+            await self._set_turn_timer(gameID, 120)
 
         await self.game_repository.broadcast_status_game(gameID)
 
-    async def connect_to_game_websocket(self, playerID: int, gameID: int, websocket: WebSocket) -> None:
+    async def connect_to_game_websocket(
+        self,
+        playerID: int,
+        gameID: int,
+        websocket: WebSocket,
+        patches: bool = False,
+        heartbeat: bool = False,
+        chat_batches: bool = False,
+    ) -> None:
         await self.player_domain_service.validate_player_exists(playerID, websocket)
         await self.game_domain_service.validate_game_exists(gameID, websocket)
         await self.game_domain_service.is_player_in_game(playerID, gameID, websocket)
 
-        await self.game_repository.setup_connection_game(playerID, gameID, websocket)
+        await self.game_repository.setup_connection_game(playerID, gameID, websocket, patches, heartbeat, chat_batches)
 
     async def play_movement_card(self, gameID: int, request: MovementCardRequest) -> None:
-        await self.game_domain_service.validate_game_exists(gameID)
-        await self.game_domain_service.validate_player_turn(request.playerID, gameID)
-        await self.game_domain_service.is_player_in_game(request.playerID, gameID)
-        await self.game_domain_service.validate_game_exists(gameID)
-        self.game_domain_service.card_exists(request.cardID)
-        self.game_domain_service.has_movement_card(request.playerID, request.cardID)
-        self.game_domain_service.validate_movement_card(request)
-        self.game_domain_service.validate_card_is_partial_movement(gameID, request.cardID)
-        await self.game_repository.send_log_play_movement_card(gameID, request.playerID, request.cardID)
-        self.game_repository.play_movement(
-            gameID,
-            card_id=request.cardID,
-            originX=request.origin.posX,
-            originY=request.origin.posY,
-            destinationX=request.destination.posX,
-            destinationY=request.destination.posY,
-        )
+        async with self.unit_of_work:
+            await self.game_domain_service.validate_game_exists(gameID)
+            await self.game_domain_service.validate_player_turn(request.playerID, gameID)
+            await self.game_domain_service.is_player_in_game(request.playerID, gameID)
+            await self.game_domain_service.validate_game_exists(gameID)
+            await self.game_domain_service.card_exists(request.cardID)
+            await self.game_domain_service.has_movement_card(request.playerID, request.cardID)
+            await self.game_domain_service.validate_movement_card(request)
+            await self.game_domain_service.validate_card_is_partial_movement(gameID, request.cardID)
+            await self.game_repository.send_log_play_movement_card(gameID, request.playerID, request.cardID)
+            await self.game_repository.play_movement(
+                gameID,
+                card_id=request.cardID,
+                originX=request.origin.posX,
+                originY=request.origin.posY,
+                destinationX=request.destination.posX,
+                destinationY=request.destination.posY,
+            )
+
         await self.game_repository.broadcast_status_game(gameID)
 
-    async def delete_partial_movement(self, gameID: int, playerID: int) -> None:
-        await self.game_domain_service.validate_game_exists(gameID)
-        await self.game_domain_service.validate_player_turn(playerID, gameID)
+    async def get_legal_movements(self, gameID: int, playerID: int) -> List[MovementCardMoves]:
         await self.game_domain_service.validate_game_exists(gameID)
         await self.game_domain_service.is_player_in_game(playerID, gameID)
-        self.game_domain_service.partial_movement_exists(gameID)
-        await self.game_repository.send_log_cancel_movement_card(gameID, playerID)
-        self.game_repository.delete_partial_movement(gameID)
-        await self.game_repository.broadcast_status_game(gameID)
 
-    async def leave_game(self, gameID: int, playerID: int) -> None:
-        await self.player_domain_service.validate_player_exists(playerID)
+        cards = await self.game_repository.get_player_movement_cards(gameID, playerID)
+        return hand_movements(cards)
+
+    async def get_hint(self, gameID: int, playerID: int) -> Optional[Hint]:
         await self.game_domain_service.validate_game_exists(gameID)
         await self.game_domain_service.is_player_in_game(playerID, gameID)
+        await self.game_domain_service.validate_player_turn(playerID, gameID)
 
-        self.game_repository.set_player_inactive(playerID, gameID)
-        await self.game_repository.remove_player(playerID, gameID)
+        board = await self.game_repository.get_board(gameID)
+        prohibitedColor = await self.game_repository.get_prohibited_color(gameID)
+        movement_cards = await self.game_repository.get_player_movement_cards(gameID, playerID)
+        _, figure_cards = await self.game_repository.get_player_figure_cards(gameID, playerID)
+        return await self.game_repository.find_hint(board, prohibitedColor, movement_cards, figure_cards)
 
-        active_players = self.game_repository.get_active_players(gameID)
-        if len(active_players) == 1:
-            await self.game_repository.broadcast_end_game(gameID, active_players[0].playerID)
-            self.game_repository.delete_and_clean(gameID)
-        else:
-            await self.game_repository.send_log_player_leave_game(gameID, playerID)
+    async def delete_partial_movement(self, gameID: int, playerID: int) -> None:
+        async with self.unit_of_work:
+            await self.game_domain_service.validate_game_exists(gameID)
+            await self.game_domain_service.validate_player_turn(playerID, gameID)
+            await self.game_domain_service.validate_game_exists(gameID)
+            await self.game_domain_service.is_player_in_game(playerID, gameID)
+            await self.game_domain_service.partial_movement_exists(gameID)
+            await self.game_repository.send_log_cancel_movement_card(gameID, playerID)
+            await self.game_repository.delete_partial_movement(gameID)
+
+        await self.game_repository.broadcast_status_game(gameID)
+
+    async def leave_game(self, gameID: int, playerID: int) -> None:
+        async with self.unit_of_work:
+            await self.player_domain_service.validate_player_exists(playerID)
+            await self.game_domain_service.validate_game_exists(gameID)
+            await self.game_domain_service.is_player_in_game(playerID, gameID)
+
+            roomID = await self.game_repository.get_room_id(gameID)
+            await self.game_repository.set_player_inactive(playerID, gameID)
+            await self.game_repository.remove_player(playerID, gameID)
+
+            active_players = await self.game_repository.get_active_players(gameID)
+            game_over = len(active_players) == 1
+            if game_over:
+                await self.game_repository.broadcast_end_game(gameID, active_players[0].playerID)
+                await self._end_game(gameID)
+            else:
+                await self.game_repository.send_log_player_leave_game(gameID, playerID)
+
+        if not game_over:
             await self.game_repository.broadcast_status_game(gameID)
+        await self._broadcast_room_list(roomID)
 
     async def block_figure(
         self, gameID: int, playerID: int, targetID: int, cardID: int, figure: List[BoardPiecePosition]
     ):
-        await self.player_domain_service.validate_player_exists(playerID)
-        await self.game_domain_service.validate_game_exists(gameID)
-        await self.game_domain_service.is_player_in_game(playerID, gameID)
-
-        self.game_domain_service.validate_figure_card_exists(gameID, cardID)
-        self.game_domain_service.validate_figure_card_belongs_to_player(targetID, cardID)
-        self.game_domain_service.validate_figure_is_empty(figure)
-        self.game_domain_service.validate_figure_matches_board(gameID, figure)
-        self.game_domain_service.validate_figure_matches_card(cardID, figure)
-        self.game_domain_service.validate_figure_border_validity(gameID, figure)
-
-        self.game_domain_service.validate_card_is_not_blocked(cardID)
-        self.game_domain_service.validate_target_has_three_cards(gameID, targetID)
-
-        await self.game_repository.send_log_block_figure(gameID, playerID, targetID, cardID)
-        self.game_repository.block_managment(gameID, cardID, figure)
-        self.game_repository.desvinculate_partial_movement_cards(gameID)
-        self.game_repository.set_partial_movements_to_empty(gameID)
+        async with self.unit_of_work:
+            await self.player_domain_service.validate_player_exists(playerID)
+            await self.game_domain_service.validate_game_exists(gameID)
+            await self.game_domain_service.is_player_in_game(playerID, gameID)
+
+            await self.game_domain_service.validate_figure_card_exists(gameID, cardID)
+            await self.game_domain_service.validate_figure_card_belongs_to_player(targetID, cardID)
+            self.game_domain_service.validate_figure_is_empty(figure)
+            await self.game_domain_service.validate_figure_matches_board(gameID, figure)
+            await self.game_domain_service.validate_figure_matches_card(cardID, figure)
+            await self.game_domain_service.validate_figure_border_validity(gameID, figure)
+
+            await self.game_domain_service.validate_card_is_not_blocked(cardID)
+            await self.game_domain_service.validate_target_has_three_cards(gameID, targetID)
+
+            await self.game_repository.send_log_block_figure(gameID, playerID, targetID, cardID)
+            await self.game_repository.block_managment(gameID, cardID, figure)
+            await self.game_repository.desvinculate_partial_movement_cards(gameID)
+            await self.game_repository.set_partial_movements_to_empty(gameID)
 
         await self.game_repository.broadcast_status_game(gameID)
 
     async def play_figure(self, gameID: int, playerID: int, figureID: int, figure: List[BoardPiecePosition]) -> None:
-        await self.player_domain_service.validate_player_exists(playerID)
-        await self.game_domain_service.validate_game_exists(gameID)
-        await self.game_domain_service.is_player_in_game(playerID, gameID)
-        self.game_domain_service.validate_is_player_turn(playerID, gameID)
-        self.game_domain_service.validate_figure_card_exists(gameID, figureID)
-        self.game_domain_service.validate_figure_card_belongs_to_player(playerID, figureID)
-        self.game_domain_service.validate_figure_is_empty(figure)
-        self.game_domain_service.validate_figure_matches_board(gameID, figure)
-        self.game_domain_service.validate_prohibited_color(gameID, figure)
-        self.game_domain_service.validate_figure_matches_card(figureID, figure)
-        self.game_domain_service.validate_figure_border_validity(gameID, figure)
-
-        await self.game_repository.send_log_play_figure(gameID, playerID, figureID)
-        self.game_repository.play_figure(gameID, figureID, figure)
-
-        self.game_repository.desvinculate_partial_movement_cards(gameID)
-        self.game_repository.set_partial_movements_to_empty(gameID)
-
-        blockedcardID = self.game_repository.get_blocked_card(gameID, playerID)
-
-        if blockedcardID is not None and self.game_repository.card_was_blocked(blockedcardID):
-            self.game_repository.set_was_blocked_false(blockedcardID)
-
-        if blockedcardID is not None and self.game_repository.is_blocked_and_last_card(gameID, blockedcardID):
-            self.game_repository.unblock_managment(gameID, blockedcardID)
-
-        if self.game_repository.figure_card_count(gameID, playerID) == 0:
-            await self.game_repository.broadcast_end_game(gameID, playerID)
-            self.game_repository.delete_and_clean(gameID)
+        async with self.unit_of_work:
+            await self.player_domain_service.validate_player_exists(playerID)
+            await self.game_domain_service.validate_game_exists(gameID)
+            await self.game_domain_service.is_player_in_game(playerID, gameID)
+            await self.game_domain_service.validate_is_player_turn(playerID, gameID)
+            await self.game_domain_service.validate_figure_card_exists(gameID, figureID)
+            await self.game_domain_service.validate_figure_card_belongs_to_player(playerID, figureID)
+            self.game_domain_service.validate_figure_is_empty(figure)
+            await self.game_domain_service.validate_figure_matches_board(gameID, figure)
+            await self.game_domain_service.validate_prohibited_color(gameID, figure)
+            await self.game_domain_service.validate_figure_matches_card(figureID, figure)
+            await self.game_domain_service.validate_figure_border_validity(gameID, figure)
+
+            await self.game_repository.send_log_play_figure(gameID, playerID, figureID)
+            await self.game_repository.play_figure(gameID, figureID, figure)
+
+            await self.game_repository.desvinculate_partial_movement_cards(gameID)
+            await self.game_repository.set_partial_movements_to_empty(gameID)
+
+            blockedcardID = await self.game_repository.get_blocked_card(gameID, playerID)
+
+            if blockedcardID is not None and await self.game_repository.card_was_blocked(blockedcardID):
+                await self.game_repository.set_was_blocked_false(blockedcardID)
+
+            if blockedcardID is not None and await self.game_repository.is_blocked_and_last_card(
+                gameID, blockedcardID
+            ):
+                await self.game_repository.unblock_managment(gameID, blockedcardID)
+
+            game_over = await self.game_repository.figure_card_count(gameID, playerID) == 0
+            if game_over:
+                roomID = await self.game_repository.get_room_id(gameID)
+                await self.game_repository.broadcast_end_game(gameID, playerID)
+                await self._end_game(gameID)
+
+        if game_over:
+            await self._broadcast_room_list(roomID)
         else:
             await self.game_repository.broadcast_status_game(gameID)
@@ -79,3 +79,19 @@ FIGURE_CARDS_FORM = {
     "fige06": [[1, 1, 1, 1]],
     "fige07": [[0, 0, 1], [1, 1, 1]],
 }
+
+
+# Segundos sin acceder al estado de una partida antes de quitarla del cache
+GAME_STATE_CACHE_IDLE_SECONDS = 600
+
+# Chat de la partida: mensajes por segundo que recupera cada conexión, ráfaga máxima permitida
+# y tamaño máximo en bytes de cada mensaje recibido
+CHAT_RATE_PER_SECOND = 2
+CHAT_BURST = 5
+CHAT_MAX_MESSAGE_BYTES = 1024
+
+# Pistas de jugada: movimientos parciales que se prueban como máximo, segundos de CPU que puede tardar una búsqueda
+# y hilos dedicados a buscarlas fuera del event loop
+HINT_MAX_MOVES = 3
+HINT_TIME_BUDGET_SECONDS = 0.05
+HINT_SEARCH_WORKERS = 2
@@ -0,0 +1,54 @@
+import json
+from typing import Any, Dict, Iterable, List, Mapping, Union
+
+from src.games.config import COLORS
+from src.games.domain.figures import BOARD_CELLS, BOARD_SIZE, cell_index
+
+
+class BoardCodec:
+    """Representación compacta del tablero: un string de 36 caracteres con el color de cada casilla,
+    indexado por cell_index (posX * 6 + posY).
+    """
+
+    @staticmethod
+    def encode(pieces: Iterable[Mapping[str, Any]]) -> str:
+        colors = [""] * BOARD_CELLS
+        for piece in pieces:
+            colors[cell_index(piece["posX"], piece["posY"])] = piece["color"]
+        if not all(colors):
+            raise ValueError("El tablero debe tener 36 piezas.")
+        return "".join(colors)
+
+    @staticmethod
+    def decode(board: str) -> List[Dict[str, Union[int, str]]]:
+        return [
+            {"posX": posX, "posY": posY, "color": board[cell_index(posX, posY)]}
+            for posX in range(BOARD_SIZE)
+            for posY in range(BOARD_SIZE)
+        ]
+
+    @staticmethod
+    def color_at(board: str, posX: int, posY: int) -> str:
+        return board[cell_index(posX, posY)]
+
+    @staticmethod
+    def swap(board: str, originX: int, originY: int, destinationX: int, destinationY: int) -> str:
+        first, second = sorted((cell_index(originX, originY), cell_index(destinationX, destinationY)))
+        if first == second:
+            return board
+        return board[:first] + board[second] + board[first + 1 : second] + board[first] + board[second + 1 :]
+
+    @staticmethod
+    def is_compact(board: Any) -> bool:
+        return isinstance(board, str) and len(board) == BOARD_CELLS and all(color in COLORS for color in board)
+
+    @classmethod
+    def from_legacy(cls, board: Any) -> str:
+        """Convierte un tablero guardado como lista JSON de {posX, posY, color} (posiblemente codificada
+        más de una vez) a la representación compacta
+        """
+        while isinstance(board, str) and not cls.is_compact(board):
+            board = json.loads(board)
+        if isinstance(board, str):
+            return board
+        return cls.encode(board)
@@ -0,0 +1,189 @@
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.games.config import COLORS, FIGURE_CARDS_FORM
+
+BOARD_SIZE = 6
+BOARD_CELLS = BOARD_SIZE * BOARD_SIZE
+
+
+class FigurePlacement(NamedTuple):
+    figureType: str
+    cells: int
+    border: int
+    positions: Tuple[Tuple[int, int], ...]
+
+
+def cell_index(posX: int, posY: int) -> int:
+    """Índice de la casilla dentro del tablero, coincide con el orden en que se guarda el tablero"""
+    return posX * BOARD_SIZE + posY
+
+
+def _border_mask(positions: Sequence[Tuple[int, int]], cells: int) -> int:
+    border = 0
+    for x, y in positions:
+        for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < BOARD_SIZE and 0 <= ny < BOARD_SIZE:
+                border |= 1 << cell_index(nx, ny)
+    return border & ~cells
+
+
+def _build_placements() -> List[FigurePlacement]:
+    """Enumera todas las ubicaciones posibles de cada figura (rotaciones y traslaciones) sobre el tablero.
+    Las rotaciones simétricas generan la misma máscara de casillas, por lo que solo se conserva la primera.
+    """
+    placements: List[FigurePlacement] = []
+    seen = set()
+
+    for figure_type, form in FIGURE_CARDS_FORM.items():
+        for k in range(4):
+            shape = np.rot90(np.array(form), k)
+            shape_height, shape_width = shape.shape
+            for y in range(BOARD_SIZE - shape_height + 1):
+                for x in range(BOARD_SIZE - shape_width + 1):
+                    positions = tuple(
+                        (x + shape_x, y + shape_y)
+                        for shape_y in range(shape_height)
+                        for shape_x in range(shape_width)
+                        if shape[shape_y, shape_x] == 1
+                    )
+                    cells = 0
+                    for posX, posY in positions:
+                        cells |= 1 << cell_index(posX, posY)
+                    if cells in seen:
+                        continue
+                    seen.add(cells)
+                    placements.append(FigurePlacement(figure_type, cells, _border_mask(positions, cells), positions))
+
+    return placements
+
+
+FIGURE_PLACEMENTS: List[FigurePlacement] = _build_placements()
+
+# Índices de las ubicaciones agrupados por su casilla de menor índice
+PLACEMENTS_BY_ANCHOR: List[List[int]] = [[] for _ in range(BOARD_CELLS)]
+# Índices de las ubicaciones cuyo resultado depende de cada casilla (la figura o su borde la contienen)
+PLACEMENTS_BY_CELL: List[List[int]] = [[] for _ in range(BOARD_CELLS)]
+for _index, _placement in enumerate(FIGURE_PLACEMENTS):
+    PLACEMENTS_BY_ANCHOR[(_placement.cells & -_placement.cells).bit_length() - 1].append(_index)
+    for _cell in range(BOARD_CELLS):
+        if (_placement.cells | _placement.border) >> _cell & 1:
+            PLACEMENTS_BY_CELL[_cell].append(_index)
+
+
+def color_masks(colors: Sequence[str]) -> Dict[str, int]:
+    """Calcula una máscara de 36 bits por color a partir de los colores del tablero
+
+    Args:
+        colors (Sequence[str]): Color de cada casilla, indexado por cell_index
+    """
+    masks = {color: 0 for color in COLORS}
+    for index, color in enumerate(colors):
+        masks[color] = masks.get(color, 0) | 1 << index
+    return masks
+
+
+def placement_matches(placement: FigurePlacement, mask: int) -> bool:
+    """Indica si la figura está formada en el color de la máscara y no tiene vecinos del mismo color"""
+    return placement.cells & mask == placement.cells and not placement.border & mask
+
+
+def border_is_valid(colors: Sequence[str], positions: Sequence[Tuple[int, int]]) -> bool:
+    """Indica si ninguna casilla de la figura tiene una vecina del mismo color fuera de la figura
+
+    Args:
+        colors (Sequence[str]): Color de cada casilla, indexado por cell_index
+        positions (Sequence[Tuple[int, int]]): Casillas (posX, posY) de la figura
+    """
+    cells = set(positions)
+    for x, y in positions:
+        for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < BOARD_SIZE and 0 <= ny < BOARD_SIZE and (nx, ny) not in cells:
+                if colors[cell_index(nx, ny)] == colors[cell_index(x, y)]:
+                    return False
+    return True
+
+
+def find_figures(colors: Sequence[str], prohibitedColor: Optional[str] = None) -> List[FigurePlacement]:
+    """Busca las figuras formadas en el tablero, ignorando las del color prohibido.
+    El resultado se ordena por color y luego por el orden de la tabla de ubicaciones.
+
+    Args:
+        colors (Sequence[str]): Color de cada casilla, indexado por cell_index
+        prohibitedColor (Optional[str]): Color prohibido
+    """
+    masks = color_masks(colors)
+    figures: List[FigurePlacement] = []
+
+    for color in COLORS:
+        if color == prohibitedColor:
+            continue
+        mask = masks[color]
+        matched: List[int] = []
+        remaining = mask
+        while remaining:
+            anchor = remaining & -remaining
+            remaining ^= anchor
+            for index in PLACEMENTS_BY_ANCHOR[anchor.bit_length() - 1]:
+                if placement_matches(FIGURE_PLACEMENTS[index], mask):
+                    matched.append(index)
+        figures.extend(FIGURE_PLACEMENTS[index] for index in sorted(matched))
+
+    return figures
+
+
+class FigureIndex:
+    """Conjunto de figuras formadas en un tablero, mantenido de forma incremental.
+    Guarda las figuras de todos los colores; el color prohibido se filtra al consultar.
+    """
+
+    def __init__(self, colors: Sequence[str]):
+        self.colors = list(colors)
+        self.masks = color_masks(self.colors)
+        self.matches: Dict[int, str] = {}
+        self._full_scan()
+
+    @property
+    def board(self) -> str:
+        return "".join(self.colors)
+
+    def _evaluate(self, index: int) -> None:
+        placement = FIGURE_PLACEMENTS[index]
+        color = self.colors[(placement.cells & -placement.cells).bit_length() - 1]
+        if color in COLORS and placement_matches(placement, self.masks[color]):
+            self.matches[index] = color
+        else:
+            self.matches.pop(index, None)
+
+    def _full_scan(self) -> None:
+        self.matches.clear()
+        for index in range(len(FIGURE_PLACEMENTS)):
+            self._evaluate(index)
+
+    def swap(self, first: int, second: int) -> None:
+        """Intercambia dos casillas y vuelve a evaluar solo las ubicaciones que dependen de ellas
+
+        Args:
+            first (int): Índice de la primera casilla
+            second (int): Índice de la segunda casilla
+        """
+        first_color, second_color = self.colors[first], self.colors[second]
+        if first_color == second_color:
+            return
+
+        self.colors[first], self.colors[second] = second_color, first_color
+        self.masks[first_color] ^= 1 << first | 1 << second
+        self.masks[second_color] ^= 1 << first | 1 << second
+
+        for index in set(PLACEMENTS_BY_CELL[first]).union(PLACEMENTS_BY_CELL[second]):
+            self._evaluate(index)
+
+    def figures(self, prohibitedColor: Optional[str] = None) -> List[FigurePlacement]:
+        """Devuelve las figuras formadas en el mismo orden que find_figures"""
+        matches = sorted(
+            (COLORS.index(color), index) for index, color in self.matches.items() if color != prohibitedColor
+        )
+        return [FIGURE_PLACEMENTS[index] for _, index in matches]
@@ -0,0 +1,281 @@
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from src.games.config import COLORS, HINT_MAX_MOVES, HINT_TIME_BUDGET_SECONDS
+from src.games.domain.figures import BOARD_CELLS, BOARD_SIZE, FIGURE_PLACEMENTS, FigurePlacement
+from src.games.domain.models import BoardPiecePosition, FigureCard, Hint, HintMovement, MovementCard, Position
+from src.games.domain.movements import MOVE_TABLE
+
+
+def _build_swap_pairs() -> Dict[str, Tuple[Tuple[int, int], ...]]:
+    """Intercambios distintos que permite cada carta, como (origen, destino) en una dirección válida.
+    Mover la ficha de a hacia b deja el mismo tablero que moverla de b hacia a, así que cada par se guarda una vez.
+    """
+    pairs = {}
+    for movement_type, table in MOVE_TABLE.items():
+        seen: Set[Tuple[int, int]] = set()
+        for origin in range(BOARD_CELLS):
+            for destination in range(BOARD_CELLS):
+                if table[origin] >> destination & 1 and (destination, origin) not in seen:
+                    seen.add((origin, destination))
+        pairs[movement_type] = tuple(sorted(seen))
+    return pairs
+
+
+SWAP_PAIRS = _build_swap_pairs()
+
+# Para cada carta y cada casilla, (otra casilla, origen, destino) de los intercambios que la incluyen
+SWAP_PARTNERS: Dict[str, List[List[Tuple[int, int, int]]]] = {}
+for _movement_type, _pairs in SWAP_PAIRS.items():
+    SWAP_PARTNERS[_movement_type] = [[] for _ in range(BOARD_CELLS)]
+    for _origin, _destination in _pairs:
+        SWAP_PARTNERS[_movement_type][_origin].append((_destination, _origin, _destination))
+        SWAP_PARTNERS[_movement_type][_destination].append((_origin, _origin, _destination))
+
+PLACEMENTS_BY_TYPE: Dict[str, List[FigurePlacement]] = {}
+for _placement in FIGURE_PLACEMENTS:
+    PLACEMENTS_BY_TYPE.setdefault(_placement.figureType, []).append(_placement)
+
+
+class Candidate(NamedTuple):
+    """Ubicación de una figura de la mano en un color permitido, junto con cuántas casillas le faltan cambiar:
+    las de la figura que no tienen ese color más las del borde que sí lo tienen
+    """
+
+    mismatch: int
+    color: int
+    cells: int
+    border: int
+    figureCardID: int
+    placement: FigurePlacement
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def _mismatch(placement: FigurePlacement, mask: int) -> int:
+    return (placement.cells & ~mask).bit_count() + (placement.border & mask).bit_count()
+
+
+def _after_swap(
+    candidates: List[Candidate], first: int, second: int, first_color: int, second_color: int, limit: int
+) -> List[Candidate]:
+    """Actualiza las casillas faltantes de cada candidato tras intercambiar dos casillas y descarta los que ya no
+    pueden completarse: un intercambio corrige a lo sumo dos casillas de un candidato.
+
+    Args:
+        candidates (List[Candidate]): Candidatos antes del intercambio
+        first (int): Índice de la primera casilla
+        second (int): Índice de la segunda casilla
+        first_color (int): Color de la primera casilla antes del intercambio
+        second_color (int): Color de la segunda casilla antes del intercambio
+        limit (int): Casillas faltantes que todavía se pueden corregir con los movimientos restantes
+    """
+    first_bit, second_bit = 1 << first, 1 << second
+    result = []
+    for candidate in candidates:
+        mismatch = candidate.mismatch
+        if candidate.color == first_color or candidate.color == second_color:
+            cells, border = candidate.cells, candidate.border
+            # +1 si la casilla pertenece a la figura, -1 si está en su borde
+            first_side = 1 if cells & first_bit else -1 if border & first_bit else 0
+            second_side = 1 if cells & second_bit else -1 if border & second_bit else 0
+            if candidate.color == first_color:
+                mismatch += first_side - second_side
+            else:
+                mismatch += second_side - first_side
+            if mismatch <= limit:
+                result.append(candidate._replace(mismatch=mismatch))
+        elif mismatch <= limit:
+            result.append(candidate)
+    return result
+
+
+class HintSearch:
+    """Búsqueda en profundidad iterativa de la secuencia más corta de movimientos parciales que forma una figura
+    de la mano. Los tableros ya visitados con las mismas cartas restantes se recuerdan en una tabla de
+    transposición, y la búsqueda se abandona al agotar el tiempo disponible.
+    """
+
+    def __init__(
+        self,
+        colors: Sequence[str],
+        prohibitedColor: Optional[str],
+        movement_cards: List[MovementCard],
+        figure_cards: List[FigureCard],
+        budget: float = HINT_TIME_BUDGET_SECONDS,
+    ):
+        self.board = bytearray(COLORS.index(color) for color in colors)
+        self.cards = sorted((card.type, card.cardID) for card in movement_cards if not card.isUsed)
+        self.figure_cards = figure_cards
+        self.prohibitedColor = prohibitedColor
+        self.budget = budget
+        self.deadline = 0.0
+        self.nodes = 0
+        self.visited: Set[Tuple[int, bytes, Tuple[str, ...]]] = set()
+        self.path: List[Tuple[int, int, int]] = []
+
+    def candidates(self, limit: int) -> List[Candidate]:
+        """Ubicaciones de las figuras jugables de la mano a las que les faltan a lo sumo limit casillas"""
+        masks = [0] * len(COLORS)
+        for index, color in enumerate(self.board):
+            masks[color] |= 1 << index
+
+        candidates = []
+        seen_types = set()
+        for card in self.figure_cards:
+            if card.isBlocked or card.type in seen_types:
+                continue
+            seen_types.add(card.type)
+            for placement in PLACEMENTS_BY_TYPE[card.type]:
+                for color, mask in enumerate(masks):
+                    if COLORS[color] == self.prohibitedColor:
+                        continue
+                    mismatch = _mismatch(placement, mask)
+                    if mismatch <= limit:
+                        candidates.append(
+                            Candidate(mismatch, color, placement.cells, placement.border, card.cardID, placement)
+                        )
+        return candidates
+
+    def run(self, max_moves: int = HINT_MAX_MOVES) -> Optional[Hint]:
+        """Busca una pista, o devuelve None si no hay una al alcance o se agotó el tiempo
+
+        Args:
+            max_moves (int): Cantidad máxima de movimientos parciales de la pista
+        """
+        self.deadline = time.perf_counter() + self.budget
+        max_moves = min(max_moves, len(self.cards))
+        root = self.candidates(2 * max_moves)
+        try:
+            for depth in range(max_moves + 1):
+                candidates = [candidate for candidate in root if candidate.mismatch <= 2 * depth]
+                found = self.search(depth, candidates, tuple(self.cards))
+                if found is not None:
+                    return self.to_hint(found)
+        except SearchTimeout:
+            pass
+        return None
+
+    def search(
+        self, depth: int, candidates: List[Candidate], cards: Tuple[Tuple[str, int], ...]
+    ) -> Optional[Candidate]:
+        """Busca en profundidad con a lo sumo depth movimientos más, usando solo las cartas de cards
+
+        Args:
+            depth (int): Movimientos que todavía se pueden hacer en esta iteración
+            candidates (List[Candidate]): Candidatos que pueden completarse con depth movimientos
+            cards (Tuple[Tuple[str, int], ...]): Tipo e ID de las cartas sin usar, ordenadas por tipo
+        """
+        for candidate in candidates:
+            if candidate.mismatch == 0:
+                return candidate
+        if depth == 0 or not candidates:
+            return None
+
+        self.nodes += 1
+        if not self.nodes & 0xFF and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        key = (depth, bytes(self.board), tuple(movement_type for movement_type, _ in cards))
+        if key in self.visited:
+            return None
+        self.visited.add(key)
+        if depth == 1:
+            return self.last_move(candidates, cards)
+
+        board = self.board
+        limit = 2 * (depth - 1)
+        # Los intercambios fuera de las casillas de los candidatos no los acercan a completarse
+        region = 0
+        for candidate in candidates:
+            region |= candidate.cells | candidate.border
+        untouched = [candidate for candidate in candidates if candidate.mismatch <= limit]
+        for position, (movement_type, cardID) in enumerate(cards):
+            if position > 0 and cards[position - 1][0] == movement_type:
+                # Dos cartas del mismo tipo permiten los mismos movimientos
+                continue
+            rest = cards[:position] + cards[position + 1 :]
+            for origin, destination in SWAP_PAIRS[movement_type]:
+                origin_color, destination_color = board[origin], board[destination]
+                if origin_color == destination_color:
+                    continue
+                if region >> origin & 1 or region >> destination & 1:
+                    children = _after_swap(candidates, origin, destination, origin_color, destination_color, limit)
+                else:
+                    children = untouched
+                if not children:
+                    continue
+
+                board[origin], board[destination] = destination_color, origin_color
+                self.path.append((cardID, origin, destination))
+                found = self.search(depth - 1, children, rest)
+                if found is not None:
+                    board[origin], board[destination] = origin_color, destination_color
+                    return found
+                self.path.pop()
+                board[origin], board[destination] = origin_color, destination_color
+        return None
+
+    def last_move(self, candidates: List[Candidate], cards: Tuple[Tuple[str, int], ...]) -> Optional[Candidate]:
+        """Con un solo movimiento restante, un candidato se completa solo si el intercambio incluye su primera
+        casilla a corregir, así que se prueban únicamente los intercambios de esa casilla
+        """
+        board = self.board
+        for candidate in candidates:
+            region = candidate.cells | candidate.border
+            while region:
+                bit = region & -region
+                region ^= bit
+                wrong = bit.bit_length() - 1
+                if (board[wrong] == candidate.color) != bool(candidate.cells & bit):
+                    break
+
+            for movement_type, cardID in cards:
+                for partner, origin, destination in SWAP_PARTNERS[movement_type][wrong]:
+                    if board[partner] != board[wrong] and _after_swap(
+                        [candidate], wrong, partner, board[wrong], board[partner], 0
+                    ):
+                        self.path.append((cardID, origin, destination))
+                        return candidate
+        return None
+
+    def to_hint(self, found: Candidate) -> Hint:
+        return Hint(
+            movements=[
+                HintMovement(
+                    cardID=cardID,
+                    origin=Position(posX=origin // BOARD_SIZE, posY=origin % BOARD_SIZE),
+                    destination=Position(posX=destination // BOARD_SIZE, posY=destination % BOARD_SIZE),
+                )
+                for cardID, origin, destination in self.path
+            ],
+            figureCardID=found.figureCardID,
+            figure=[BoardPiecePosition(posX=posX, posY=posY) for posX, posY in found.placement.positions],
+        )
+
+
+def find_hint(
+    colors: Sequence[str],
+    prohibitedColor: Optional[str],
+    movement_cards: List[MovementCard],
+    figure_cards: List[FigureCard],
+    max_moves: int = HINT_MAX_MOVES,
+    budget: float = HINT_TIME_BUDGET_SECONDS,
+) -> Optional[Hint]:
+    """Busca la secuencia más corta de movimientos parciales con las cartas de movimiento sin usar que forma, en un
+    color distinto del prohibido, una figura de alguna carta de figura jugable y no bloqueada de la mano
+
+    Args:
+        colors (Sequence[str]): Color de cada casilla, indexado por cell_index
+        prohibitedColor (Optional[str]): Color prohibido
+        movement_cards (List[MovementCard]): Cartas de movimiento del jugador
+        figure_cards (List[FigureCard]): Cartas de figura jugables del jugador
+        max_moves (int): Cantidad máxima de movimientos parciales
+        budget (float): Segundos que puede tardar la búsqueda
+
+    Returns:
+        Optional[Hint]: Movimientos a jugar y figura que forman, o None si no se encontró una a tiempo
+    """
+    return HintSearch(colors, prohibitedColor, movement_cards, figure_cards, budget).run(max_moves)
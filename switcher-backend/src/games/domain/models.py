@@ -49,6 +49,29 @@ class MovementCardRequest(BaseModel):
     destination: Position
 
 
+class LegalMovement(BaseModel):
+    origin: Position
+    destinations: List[Position]
+
+
+class MovementCardMoves(BaseModel):
+    cardID: int
+    type: str
+    movements: List[LegalMovement]
+
+
+class HintMovement(BaseModel):
+    cardID: int
+    origin: Position
+    destination: Position
+
+
+class Hint(BaseModel):
+    movements: List[HintMovement]
+    figureCardID: int
+    figure: List[BoardPiecePosition]
+
+
 class PlayerPublicInfo(BaseModel):
     playerID: int
     username: str
@@ -0,0 +1,88 @@
+from typing import Callable, Dict, List, Tuple
+
+from src.games.config import MOVEMENT_CARDS
+from src.games.domain.figures import BOARD_CELLS, BOARD_SIZE, cell_index
+from src.games.domain.models import LegalMovement, MovementCard, MovementCardMoves, Position
+
+# Regla de cada carta de movimiento sobre una casilla de origen (x, y) y una de destino (nx, ny)
+MovementRule = Callable[[int, int, int, int], bool]
+
+MOVEMENT_RULES: Dict[str, MovementRule] = {
+    # Diagonal dos casillas
+    "mov01": lambda x, y, nx, ny: abs(nx - x) == 2 and abs(ny - y) == 2,
+    # Linea recta dos casillas
+    "mov02": lambda x, y, nx, ny: sorted((abs(nx - x), abs(ny - y))) == [0, 2],
+    # Linea recta una casilla
+    "mov03": lambda x, y, nx, ny: sorted((abs(nx - x), abs(ny - y))) == [0, 1],
+    # Diagonal una casilla
+    "mov04": lambda x, y, nx, ny: abs(nx - x) == 1 and abs(ny - y) == 1,
+    # L invertida
+    "mov05": lambda x, y, nx, ny: (nx - x, ny - y) in ((-2, 1), (2, -1), (1, 2), (-1, -2)),
+    # L
+    "mov06": lambda x, y, nx, ny: (nx - x, ny - y) in ((-2, -1), (2, 1), (-1, 2), (1, -2)),
+    # Linea recta hasta el borde
+    "mov07": lambda x, y, nx, ny: (nx == x and ny in (0, BOARD_SIZE - 1)) or (ny == y and nx in (0, BOARD_SIZE - 1)),
+}
+
+
+def _build_move_table() -> Dict[str, Tuple[int, ...]]:
+    """Para cada carta y cada casilla de origen, máscara de 36 bits con las casillas de destino permitidas"""
+    table = {}
+    for movement_type in MOVEMENT_CARDS:
+        rule = MOVEMENT_RULES[movement_type]
+        masks = []
+        for x in range(BOARD_SIZE):
+            for y in range(BOARD_SIZE):
+                mask = 0
+                for nx in range(BOARD_SIZE):
+                    for ny in range(BOARD_SIZE):
+                        if rule(x, y, nx, ny):
+                            mask |= 1 << cell_index(nx, ny)
+                masks.append(mask)
+        table[movement_type] = tuple(masks)
+    return table
+
+
+MOVE_TABLE = _build_move_table()
+
+
+def is_legal_move(movement_type: str, originX: int, originY: int, destinationX: int, destinationY: int) -> bool:
+    """Indica si la carta permite mover la ficha de origen a la de destino. Las casillas deben estar en el tablero."""
+    return bool(MOVE_TABLE[movement_type][cell_index(originX, originY)] >> cell_index(destinationX, destinationY) & 1)
+
+
+def legal_destinations(movement_type: str, originX: int, originY: int) -> List[Tuple[int, int]]:
+    """Casillas a las que la carta permite mover la ficha de origen, en el orden del tablero"""
+    mask = MOVE_TABLE[movement_type][cell_index(originX, originY)]
+    return [divmod(cell, BOARD_SIZE) for cell in range(BOARD_CELLS) if mask >> cell & 1]
+
+
+def _build_legal_movements() -> Dict[str, List[LegalMovement]]:
+    """Movimientos de cada carta desde cada casilla; no dependen de los colores del tablero"""
+    return {
+        movement_type: [
+            LegalMovement(
+                origin=Position(posX=x, posY=y),
+                destinations=[Position(posX=nx, posY=ny) for nx, ny in legal_destinations(movement_type, x, y)],
+            )
+            for x in range(BOARD_SIZE)
+            for y in range(BOARD_SIZE)
+        ]
+        for movement_type in MOVEMENT_CARDS
+    }
+
+
+LEGAL_MOVEMENTS = _build_legal_movements()
+
+
+def hand_movements(cards: List[MovementCard]) -> List[MovementCardMoves]:
+    """Movimientos permitidos por las cartas de una mano que todavía no se usaron en el turno
+
+    Args:
+        cards (List[MovementCard]): Cartas de movimiento del jugador
+    """
+    return [
+        MovementCardMoves(cardID=card.cardID, type=card.type, movements=LEGAL_MOVEMENTS[card.type])
+        for card in cards
+        if not card.isUsed
+    ]
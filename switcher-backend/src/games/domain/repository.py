@@ -1,8 +1,7 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
-import numpy as np
 from fastapi.websockets import WebSocket
 
 from src.games.domain.models import (
@@ -12,6 +11,7 @@ from src.games.domain.models import (
     Game,
     GameID,
     GamePublicInfo,
+    Hint,
 )
 from src.games.domain.models import MovementCard as MovementCardDomain
 from src.players.domain.models import Player as PlayerDomain
@@ -84,6 +84,10 @@ class GameRepository(ABC):
     def replacement_figure_card(self, gameID: int, playerID: int) -> None:
         pass
 
+    @abstractmethod
+    def get_room_id(self, gameID: int) -> int:
+        pass
+
     @abstractmethod
     def get_current_turn(self, gameID: int) -> int:
         pass
@@ -109,15 +113,29 @@ class GameRepository(ABC):
         pass
 
     @abstractmethod
-    def check_border_validity(self, positions: List[BoardPiecePosition], layer: np.ndarray) -> bool:
+    def get_movement_card(self, cardID: int) -> MovementCardDomain:
         pass
 
     @abstractmethod
-    def get_movement_card(self, cardID: int) -> MovementCardDomain:
+    def has_movement_card(self, playerID: int, cardID: int) -> bool:
         pass
 
     @abstractmethod
-    def has_movement_card(self, playerID: int, cardID: int) -> bool:
+    def get_player_movement_cards(self, gameID: int, playerID: int) -> List[MovementCardDomain]:
+        pass
+
+    @abstractmethod
+    def get_player_figure_cards(self, gameID: int, playerID: int) -> Tuple[int, List[FigureCard]]:
+        pass
+
+    @abstractmethod
+    async def find_hint(
+        self,
+        board: List[BoardPiece],
+        prohibitedColor: Optional[str],
+        movement_cards: List[MovementCardDomain],
+        figure_cards: List[FigureCard],
+    ) -> Optional[Hint]:
         pass
 
     @abstractmethod
@@ -200,7 +218,15 @@ class GameRepository(ABC):
 
 class GameRepositoryWS(GameRepository):
     @abstractmethod
-    async def setup_connection_game(self, playerID: int, gameID: int, websocket: WebSocket) -> None:
+    async def setup_connection_game(
+        self,
+        playerID: int,
+        gameID: int,
+        websocket: WebSocket,
+        patches: bool = False,
+        heartbeat: bool = False,
+        chat_batches: bool = False,
+    ) -> None:
         pass
 
     @abstractmethod
@@ -238,3 +264,13 @@ class GameRepositoryWS(GameRepository):
     @abstractmethod
     async def send_log_turn_skip(self, gameID: int, playerID: int, auto: bool) -> None:
         pass
+
+
+class TurnScheduler(ABC):
+    @abstractmethod
+    def schedule(self, gameID: int, seconds: float) -> None:
+        pass
+
+    @abstractmethod
+    def cancel(self, gameID: int) -> None:
+        pass
@@ -1,84 +1,123 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, BackgroundTasks, Depends
+from fastapi import APIRouter, Depends
+from fastapi.responses import ORJSONResponse
 from fastapi.websockets import WebSocket, WebSocketDisconnect
 from sqlalchemy.orm import Session
 
-from src.database import get_db
+from src.database import AsyncRepository, SQLAlchemyUnitOfWork, get_db
 from src.games.application.service import GameService
-from src.games.domain.models import BlockCardRequest, FigureCardRequest, GameID, MovementCardRequest
+from src.games.domain.models import (
+    BlockCardRequest,
+    FigureCardRequest,
+    GameID,
+    Hint,
+    MovementCardMoves,
+    MovementCardRequest,
+)
 from src.games.infrastructure.repository import (
     WebSocketRepository as GameRepository,
 )
+from src.games.infrastructure.timer import turn_timers
 from src.players.domain.models import PlayerID
 from src.players.infrastructure.repository import SQLAlchemyRepository as PlayerRepository
 from src.rooms.infrastructure.repository import WebSocketRepository as RoomRepository
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 
 @router.post(path="/{roomID}", status_code=201)
-async def start_game(
-    roomID: int, playerID: PlayerID, background_tasks: BackgroundTasks, db_session: Session = Depends(get_db)
-) -> GameID:
-    game_repository = GameRepository(db_session)
-    player_repository = PlayerRepository(db_session)
-    room_repository = RoomRepository(db_session)
+async def start_game(roomID: int, playerID: PlayerID, db_session: Session = Depends(get_db)) -> GameID:
+    game_repository = AsyncRepository(GameRepository(db_session))
+    player_repository = AsyncRepository(PlayerRepository(db_session))
+    room_repository = AsyncRepository(RoomRepository(db_session))
 
-    game_service = GameService(game_repository, player_repository, room_repository)
+    game_service = GameService(
+        game_repository, player_repository, room_repository, turn_timers, SQLAlchemyUnitOfWork(db_session)
+    )
 
-    gameID = await game_service.start_game(roomID, playerID, background_tasks)
+    gameID = await game_service.start_game(roomID, playerID)
     return gameID
 
 
 @router.put(path="/{gameID}/turn", status_code=200)
-async def skip_turn(
-    gameID: int, playerID: PlayerID, background_tasks: BackgroundTasks, db_session: Session = Depends(get_db)
-) -> None:
-    game_repository = GameRepository(db_session)
-    player_repository = PlayerRepository(db_session)
-    room_repository = RoomRepository(db_session)
+async def skip_turn(gameID: int, playerID: PlayerID, db_session: Session = Depends(get_db)) -> None:
+    game_repository = AsyncRepository(GameRepository(db_session))
+    player_repository = AsyncRepository(PlayerRepository(db_session))
+    room_repository = AsyncRepository(RoomRepository(db_session))
 
-    game_service = GameService(game_repository, player_repository, room_repository)
-    await game_service.skip_turn(playerID.playerID, gameID, background_tasks)
+    game_service = GameService(
+        game_repository, player_repository, room_repository, turn_timers, SQLAlchemyUnitOfWork(db_session)
+    )
+    await game_service.skip_turn(playerID.playerID, gameID)
 
 
 @router.websocket("/{playerID}/{gameID}")
-async def room_websocket(playerID: int, gameID: int, websocket: WebSocket, db_session: Session = Depends(get_db)):
-    service = GameService(GameRepository(db_session), PlayerRepository(db_session))
+async def room_websocket(
+    playerID: int,
+    gameID: int,
+    websocket: WebSocket,
+    patches: bool = False,
+    heartbeat: bool = False,
+    chat_batches: bool = False,
+    db_session: Session = Depends(get_db),
+):
+    game_repository = AsyncRepository(GameRepository(db_session))
+    player_repository = AsyncRepository(PlayerRepository(db_session))
+    service = GameService(game_repository, player_repository)
 
     try:
-        await service.connect_to_game_websocket(playerID, gameID, websocket)
+        await service.connect_to_game_websocket(playerID, gameID, websocket, patches, heartbeat, chat_batches)
     except WebSocketDisconnect as e:
         await websocket.close(code=e.code, reason=e.reason)
 
 
 @router.post("/{gameID}/movement", status_code=201)
 async def play_movement_card(gameID: int, request: MovementCardRequest, db_session: Session = Depends(get_db)):
-    game_repository = GameRepository(db_session)
-    player_repository = PlayerRepository(db_session)
+    game_repository = AsyncRepository(GameRepository(db_session))
+    player_repository = AsyncRepository(PlayerRepository(db_session))
 
-    game_service = GameService(game_repository, player_repository)
+    game_service = GameService(game_repository, player_repository, unit_of_work=SQLAlchemyUnitOfWork(db_session))
 
     await game_service.play_movement_card(gameID, request)
 
 
+@router.get("/{gameID}/movement", status_code=200)
+async def get_legal_movements(
+    gameID: int, playerID: int, db_session: Session = Depends(get_db)
+) -> List[MovementCardMoves]:
+    game_repository = AsyncRepository(GameRepository(db_session))
+    player_repository = AsyncRepository(PlayerRepository(db_session))
+    game_service = GameService(game_repository, player_repository)
+    return await game_service.get_legal_movements(gameID, playerID)
+
+
+@router.get("/{gameID}/hint", status_code=200)
+async def get_hint(gameID: int, playerID: int, db_session: Session = Depends(get_db)) -> Optional[Hint]:
+    game_repository = AsyncRepository(GameRepository(db_session))
+    player_repository = AsyncRepository(PlayerRepository(db_session))
+    game_service = GameService(game_repository, player_repository)
+    return await game_service.get_hint(gameID, playerID)
+
+
 @router.put(path="/{gameID}/leave", status_code=200)
 async def leave_game(gameID: int, playerID: PlayerID, db_session: Session = Depends(get_db)) -> None:
-    game_repository = GameRepository(db_session)
-    player_repository = PlayerRepository(db_session)
-    room_repository = RoomRepository(db_session)
+    game_repository = AsyncRepository(GameRepository(db_session))
+    player_repository = AsyncRepository(PlayerRepository(db_session))
+    room_repository = AsyncRepository(RoomRepository(db_session))
 
-    game_service = GameService(game_repository, player_repository, room_repository)
+    game_service = GameService(
+        game_repository, player_repository, room_repository, turn_timers, SQLAlchemyUnitOfWork(db_session)
+    )
 
     await game_service.leave_game(gameID, playerID.playerID)
 
 
 @router.delete(path="/{gameID}/movement", status_code=200)
 async def delete_partial_movement(gameID: int, playerID: int, db_session: Session = Depends(get_db)) -> None:
-    game_repository = GameRepository(db_session)
-    player_repository = PlayerRepository(db_session)
-    game_service = GameService(game_repository, player_repository)
+    game_repository = AsyncRepository(GameRepository(db_session))
+    player_repository = AsyncRepository(PlayerRepository(db_session))
+    game_service = GameService(game_repository, player_repository, unit_of_work=SQLAlchemyUnitOfWork(db_session))
     await game_service.delete_partial_movement(gameID, playerID)
 
 
@@ -88,11 +127,13 @@ async def play_figure(
     request: FigureCardRequest,
     db_session: Session = Depends(get_db),
 ) -> None:
-    game_repository = GameRepository(db_session)
-    player_repository = PlayerRepository(db_session)
-    room_repository = RoomRepository(db_session)
+    game_repository = AsyncRepository(GameRepository(db_session))
+    player_repository = AsyncRepository(PlayerRepository(db_session))
+    room_repository = AsyncRepository(RoomRepository(db_session))
 
-    game_service = GameService(game_repository, player_repository, room_repository)
+    game_service = GameService(
+        game_repository, player_repository, room_repository, turn_timers, SQLAlchemyUnitOfWork(db_session)
+    )
 
     await game_service.play_figure(gameID, request.playerID, request.cardID, request.figure)
 
@@ -103,10 +144,12 @@ async def block_figure(
     request: BlockCardRequest,
     db_session: Session = Depends(get_db),
 ) -> None:
-    game_repository = GameRepository(db_session)
-    player_repository = PlayerRepository(db_session)
-    room_repository = RoomRepository(db_session)
+    game_repository = AsyncRepository(GameRepository(db_session))
+    player_repository = AsyncRepository(PlayerRepository(db_session))
+    room_repository = AsyncRepository(RoomRepository(db_session))
 
-    game_service = GameService(game_repository, player_repository, room_repository)
+    game_service = GameService(
+        game_repository, player_repository, room_repository, turn_timers, SQLAlchemyUnitOfWork(db_session)
+    )
 
     await game_service.block_figure(gameID, request.playerID, request.targetID, request.cardID, request.figure)
@@ -0,0 +1,392 @@
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+
+from sqlalchemy import and_, event, or_, select, update
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, ColumnClause
+
+from src.games.config import GAME_STATE_CACHE_IDLE_SECONDS
+from src.games.infrastructure.models import FigureCard as FigureCardDB
+from src.games.infrastructure.models import Game as GameDB
+from src.games.infrastructure.models import MovementCard as MovementCardDB
+from src.players.infrastructure.models import Player as PlayerDB
+from src.rooms.infrastructure.models import PlayerRoom as PlayerRoomDB
+from src.shared.bus import RECONNECTED_TOPIC, BroadcastBus, InMemoryBus, bus
+
+
+class Seat(NamedTuple):
+    playerID: int
+    username: str
+    position: int
+    isActive: bool
+
+
+class CachedFigureCard(NamedTuple):
+    cardID: int
+    type: str
+    playerID: int
+    isPlayable: bool
+    isBlocked: bool
+    wasBlocked: bool
+
+
+class CachedMovementCard(NamedTuple):
+    cardID: int
+    type: str
+    playerID: int
+
+
+def decode_movements(last_movements: Any) -> List[dict]:
+    """Decodifica la columna lastMovements, que se guarda como un string JSON"""
+    if not last_movements:
+        return []
+    if isinstance(last_movements, str):
+        return json.loads(last_movements)
+    return list(last_movements)
+
+
+class GameState:
+    """Estado decodificado de una partida: tablero, movimientos parciales, asientos y manos"""
+
+    def __init__(
+        self,
+        game: GameDB,
+        seats: List[Seat],
+        figure_cards: List[CachedFigureCard],
+        movement_cards: List[CachedMovementCard],
+        version: int = 0,
+    ):
+        self.gameID: int = game.gameID
+        self.roomID: int = game.roomID
+        self.board: Optional[str] = game.board
+        self.lastMovements: List[dict] = decode_movements(game.lastMovements)
+        self.prohibitedColor: Optional[str] = game.prohibitedColor
+        self.posEnabledToPlay: int = game.posEnabledToPlay
+        self.timestamp_next_turn: Optional[datetime] = game.timestamp_next_turn
+        self.stateVersion: int = game.stateVersion or 0
+        self.seats = seats
+        self.figure_cards = figure_cards
+        self.movement_cards = movement_cards
+        self.version = version
+        self.stale = False
+        self.last_access = time.monotonic()
+
+    def partial_cells(self) -> Set[tuple]:
+        cells = set()
+        for movement in self.lastMovements:
+            cells.add((movement["origin"]["posX"], movement["origin"]["posY"]))
+            cells.add((movement["destination"]["posX"], movement["destination"]["posY"]))
+        return cells
+
+    def partial_cards(self) -> Set[int]:
+        return {movement["CardID"] for movement in self.lastMovements}
+
+    def seat(self, playerID: int) -> Optional[Seat]:
+        return next((seat for seat in self.seats if seat.playerID == playerID), None)
+
+    def figure_hand(self, playerID: int) -> List[CachedFigureCard]:
+        return [card for card in self.figure_cards if card.playerID == playerID]
+
+    def movement_hand(self, playerID: int) -> List[CachedMovementCard]:
+        return [card for card in self.movement_cards if card.playerID == playerID]
+
+    def matches(self, game: GameDB) -> bool:
+        """Indica si la fila de la partida coincide con el estado guardado"""
+        return (
+            self.board == game.board
+            and self.lastMovements == decode_movements(game.lastMovements)
+            and self.prohibitedColor == game.prohibitedColor
+            and self.posEnabledToPlay == game.posEnabledToPlay
+            and self.timestamp_next_turn == game.timestamp_next_turn
+        )
+
+
+class GameStateCache:
+    """Cache a nivel de proceso del estado de cada partida.
+    Los métodos del repositorio que modifican la partida actualizan el estado antes de confirmar
+    la transacción (write-through) e incrementan su versión. Cualquier otra escritura sobre
+    las tablas de la partida lo invalida, y se vuelve a cargar en la siguiente lectura.
+    Al confirmar, las partidas escritas se publican en el bus para que los demás workers las invaliden.
+    Cada transacción incrementa además la columna stateVersion de las partidas que escribe, que también es
+    la versión de los estados enviados a los clientes. Con varios workers el aviso puede llegar tarde, así que
+    la primera lectura de cada partida en una transacción compara esa columna con la versión guardada antes
+    de confiar en el estado.
+    """
+
+    entries: Dict[int, GameState]
+
+    def __init__(self, max_idle: float = GAME_STATE_CACHE_IDLE_SECONDS, bus: Optional[BroadcastBus] = None):
+        self.entries = {}
+        self.max_idle = max_idle
+        self.last_sweep = time.monotonic()
+        self.bus = bus if bus is not None else InMemoryBus()
+        # Con un único worker las invalidaciones se aplican en el momento y no hace falta comparar versiones
+        self.shared = not isinstance(self.bus, InMemoryBus)
+        self.bus.subscribe("game_states.invalidate", self.on_invalidate)
+        self.bus.subscribe(RECONNECTED_TOPIC, self.on_reconnected)
+
+    def clean_up(self):
+        """Limpia todas las partidas guardadas"""
+        self.entries.clear()
+
+    def get(self, db_session: Session, gameID: int) -> Optional[GameState]:
+        """Devuelve el estado de la partida, cargándolo de la base de datos si no está guardado
+
+        Args:
+            db_session (Session): Sesión con la que cargar la partida
+            gameID (int): ID del juego
+        """
+        self.evict_idle()
+        state = self.entries.get(gameID)
+        if state is not None and not state.stale and self.shared:
+            self.verify(db_session, state)
+        if state is not None and not state.stale:
+            state.last_access = time.monotonic()
+            return state
+
+        version = state.version + 1 if state is not None else 0
+        state = self.load(db_session, gameID, version)
+        if state is None:
+            self.entries.pop(gameID, None)
+        else:
+            self.entries[gameID] = state
+        return state
+
+    def verify(self, db_session: Session, state: GameState) -> None:
+        """Invalida el estado si otro worker confirmó cambios en la partida que todavía no fueron avisados por el bus.
+        Consulta la versión guardada una vez por partida en cada transacción.
+
+        Args:
+            db_session (Session): Sesión de la transacción en curso
+            state (GameState): Estado guardado de la partida
+        """
+        verified = db_session.info.setdefault("game_states_verified", set())
+        if state.gameID in verified:
+            return
+        stored = db_session.execute(select(GameDB.stateVersion).where(GameDB.gameID == state.gameID)).scalar()
+        if stored != state.stateVersion:
+            state.stale = True
+        verified.add(state.gameID)
+
+    def load(self, db_session: Session, gameID: int, version: int = 0) -> Optional[GameState]:
+        """Carga la partida con dos consultas: la fila de la partida junto a sus asientos y cartas de figura
+        en un único join, y las cartas de movimiento en mano
+
+        Args:
+            db_session (Session): Sesión con la que cargar la partida
+            gameID (int): ID del juego
+            version (int): Versión con la que se guarda el estado
+        """
+        rows = (
+            db_session.query(GameDB, PlayerRoomDB, PlayerDB.username, FigureCardDB)
+            .select_from(GameDB)
+            .outerjoin(PlayerRoomDB, PlayerRoomDB.roomID == GameDB.roomID)
+            .outerjoin(PlayerDB, PlayerDB.playerID == PlayerRoomDB.playerID)
+            .outerjoin(
+                FigureCardDB,
+                and_(FigureCardDB.gameID == GameDB.gameID, FigureCardDB.playerID == PlayerRoomDB.playerID),
+            )
+            .filter(GameDB.gameID == gameID)
+            .all()
+        )
+        if not rows:
+            return None
+
+        game = rows[0][0]
+        seats: Dict[int, Seat] = {}
+        figure_cards: List[CachedFigureCard] = []
+        for _, player_room, username, card in rows:
+            if player_room is None:
+                continue
+            if player_room.playerID not in seats:
+                seats[player_room.playerID] = Seat(
+                    player_room.playerID, username, player_room.position, player_room.isActive
+                )
+            if card is not None:
+                figure_cards.append(
+                    CachedFigureCard(
+                        card.cardID, card.type, card.playerID, card.isPlayable, card.isBlocked, card.wasBlocked
+                    )
+                )
+        figure_cards.sort(key=lambda card: card.cardID)
+
+        movement_cards = [
+            CachedMovementCard(card.cardID, card.type, card.playerID)
+            for card in db_session.query(MovementCardDB)
+            .filter(MovementCardDB.gameID == gameID, MovementCardDB.playerID.is_not(None))
+            .order_by(MovementCardDB.cardID)
+        ]
+        return GameState(game, list(seats.values()), figure_cards, movement_cards, version)
+
+    def update(self, game: GameDB) -> None:
+        """Actualiza el estado guardado con los valores de la fila de la partida (write-through)
+
+        Args:
+            game (GameDB): Fila de la partida, con los cambios aún sin confirmar
+        """
+        state = self.entries.get(game.gameID)
+        if state is None or state.stale:
+            return
+        state.board = game.board
+        state.lastMovements = decode_movements(game.lastMovements)
+        state.prohibitedColor = game.prohibitedColor
+        state.posEnabledToPlay = game.posEnabledToPlay
+        state.timestamp_next_turn = game.timestamp_next_turn
+        state.version += 1
+
+    def invalidate(self, gameID: int) -> None:
+        state = self.entries.get(gameID)
+        if state is not None:
+            state.stale = True
+
+    def invalidate_room(self, roomID: int) -> None:
+        for state in self.entries.values():
+            if state.roomID == roomID:
+                state.stale = True
+
+    def invalidate_all(self) -> None:
+        for state in self.entries.values():
+            state.stale = True
+
+    def evict(self, gameID: int) -> None:
+        self.entries.pop(gameID, None)
+
+    def evict_idle(self) -> None:
+        """Elimina las partidas que no fueron accedidas en max_idle segundos"""
+        now = time.monotonic()
+        if now - self.last_sweep < self.max_idle:
+            return
+        self.last_sweep = now
+        for gameID in [gameID for gameID, state in self.entries.items() if now - state.last_access > self.max_idle]:
+            self.entries.pop(gameID)
+
+    def on_flush(self, session: Session) -> None:
+        """Invalida las partidas afectadas por cambios que no pasaron por el write-through"""
+        written = self._written(session)
+        for instance in (*session.new, *session.dirty, *session.deleted):
+            if isinstance(instance, GameDB):
+                written["games"].add(instance.gameID)
+                state = self.entries.get(instance.gameID)
+                if state is not None and (instance in session.deleted or not state.matches(instance)):
+                    state.stale = True
+            elif isinstance(instance, (FigureCardDB, MovementCardDB)):
+                written["games"].add(instance.gameID)
+                self.invalidate(instance.gameID)
+            elif isinstance(instance, PlayerRoomDB):
+                written["rooms"].add(instance.roomID)
+                self.invalidate_room(instance.roomID)
+
+    def on_rollback(self, session: Session) -> None:
+        """Invalida las partidas escritas en la transacción descartada, ya que el write-through
+        actualizó su estado con cambios que nunca se confirmaron"""
+        written = self._written(session)
+        for gameID in written["games"]:
+            self.invalidate(gameID)
+        for roomID in written["rooms"]:
+            self.invalidate_room(roomID)
+        session.info.pop("game_states_written", None)
+
+    def on_before_commit(self, session: Session) -> None:
+        """Incrementa la versión guardada de las partidas escritas en la transacción. El estado de este worker adopta
+        la nueva versión solo si estaba al día con la anterior; si no, otro worker escribió antes y se invalida.
+        Las versiones se incrementan una sola vez por transacción aunque haya más de un cache escuchando la sesión.
+        """
+        if "game_states_versions" not in session.info:
+            session.flush()
+            written = session.info.get("game_states_written")
+            if not written or not (written["games"] or written["rooms"]):
+                return
+            games = GameDB.__table__
+            session.info["game_states_versions"] = session.connection().execute(
+                update(games)
+                .where(or_(games.c.gameID.in_(written["games"]), games.c.roomID.in_(written["rooms"])))
+                .values(stateVersion=games.c.stateVersion + 1)
+                .returning(games.c.gameID, games.c.stateVersion)
+            ).all()
+        for gameID, version in session.info["game_states_versions"]:
+            state = self.entries.get(gameID)
+            if state is None or state.stale:
+                continue
+            if version == state.stateVersion + 1:
+                state.stateVersion = version
+            else:
+                state.stale = True
+
+    def on_transaction_end(self, session: Session) -> None:
+        session.info.pop("game_states_verified", None)
+        session.info.pop("game_states_versions", None)
+
+    def on_commit(self, session: Session) -> None:
+        """Avisa a los demás workers qué partidas cambiaron en la transacción confirmada"""
+        written = session.info.pop("game_states_written", None)
+        if written and (written["games"] or written["rooms"]):
+            self.bus.publish_threadsafe(
+                "game_states.invalidate",
+                {"games": sorted(written["games"]), "rooms": sorted(written["rooms"]), "origin": self.bus.origin},
+            )
+
+    async def on_invalidate(self, message: dict) -> None:
+        """Invalida las partidas que otro worker modificó"""
+        if message["origin"] == self.bus.origin:
+            return
+        for gameID in message["games"]:
+            self.invalidate(gameID)
+        for roomID in message["rooms"]:
+            self.invalidate_room(roomID)
+
+    async def on_reconnected(self, _: Any) -> None:
+        """Invalida todas las partidas, ya que se pudieron perder avisos mientras el bus estuvo desconectado"""
+        self.invalidate_all()
+
+    @staticmethod
+    def _written(session: Session) -> Dict[str, Set[int]]:
+        return session.info.setdefault("game_states_written", {"games": set(), "rooms": set()})
+
+    def on_bulk_execute(self, orm_execute_state: ORMExecuteState) -> None:
+        """Invalida las partidas afectadas por un UPDATE o DELETE masivo"""
+        if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+            return
+        mapper = orm_execute_state.bind_mapper
+        if mapper is None or mapper.class_ not in (GameDB, FigureCardDB, MovementCardDB, PlayerRoomDB):
+            return
+
+        key = "roomID" if mapper.class_ is PlayerRoomDB else "gameID"
+        ids = self._filtered_ids(orm_execute_state.statement.whereclause, key)
+        if ids is None:
+            ids = list(self.entries) if key == "gameID" else [state.roomID for state in self.entries.values()]
+        written = self._written(orm_execute_state.session)
+        if key == "roomID":
+            written["rooms"].update(ids)
+            for roomID in ids:
+                self.invalidate_room(roomID)
+        else:
+            written["games"].update(ids)
+            for gameID in ids:
+                self.invalidate(gameID)
+
+    @staticmethod
+    def _filtered_ids(whereclause, key: str) -> Optional[List[int]]:
+        if whereclause is None:
+            return None
+        ids = [
+            element.right.effective_value
+            for element in visitors.iterate(whereclause)
+            if isinstance(element, BinaryExpression)
+            and isinstance(element.left, ColumnClause)
+            and element.left.key == key
+            and isinstance(element.right, BindParameter)
+        ]
+        return ids or None
+
+
+game_states = GameStateCache(bus=bus)
+
+event.listen(Session, "after_flush", lambda session, _: game_states.on_flush(session))
+event.listen(Session, "do_orm_execute", game_states.on_bulk_execute)
+event.listen(Session, "before_commit", game_states.on_before_commit)
+event.listen(Session, "after_commit", game_states.on_commit)
+event.listen(Session, "after_transaction_end", lambda session, _: game_states.on_transaction_end(session))
+event.listen(Session, "after_soft_rollback", lambda session, _: game_states.on_rollback(session))
@@ -0,0 +1,116 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi.websockets import WebSocket
+
+from src.games.config import CHAT_BURST, CHAT_RATE_PER_SECOND
+
+# Envía a la partida los mensajes juntados en una vuelta del event loop
+ChatPublisher = Callable[[int, List[Any]], Awaitable[None]]
+
+
+class TokenBucket:
+    """Cubeta de fichas de una conexión: cada mensaje consume una y se recuperan `rate` por segundo,
+    hasta un máximo de `burst`
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "updated", "throttled")
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.throttled = False
+
+    def take(self) -> bool:
+        """Consume una ficha si hay alguna disponible"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+def is_chat_payload(payload: Any) -> bool:
+    """Indica si el cuerpo es un mensaje de chat: un texto, o un objeto con el nombre del jugador y el texto"""
+    if isinstance(payload, str):
+        return bool(payload)
+    return (
+        isinstance(payload, dict)
+        and payload.keys() == {"username", "text"}
+        and isinstance(payload["username"], str)
+        and isinstance(payload["text"], str)
+        and bool(payload["text"])
+    )
+
+
+class ChatRelay:
+    """Etapa por la que pasan los mensajes de chat antes de reenviarse a la partida.
+    Descarta los mensajes con formato inválido y limita cuántos puede enviar cada conexión con una cubeta de fichas.
+    Los mensajes aceptados en una misma vuelta del event loop se envían juntos, en un único mensaje por destinatario.
+    """
+
+    buckets: Dict[WebSocket, TokenBucket]
+    pending: Dict[int, List[Any]]
+
+    def __init__(self, publish: ChatPublisher, rate: float = CHAT_RATE_PER_SECOND, burst: int = CHAT_BURST):
+        self.publish = publish
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+        self.pending = {}
+        self.flushing: Optional[asyncio.Task] = None
+
+    def clean_up(self):
+        """Olvida las cubetas y descarta los mensajes pendientes"""
+        if self.flushing is not None:
+            self.flushing.cancel()
+            self.flushing = None
+        self.buckets.clear()
+        self.pending.clear()
+
+    def forget(self, websocket: WebSocket) -> None:
+        """Quita la cubeta de una conexión cerrada"""
+        self.buckets.pop(websocket, None)
+
+    def submit(self, websocket: WebSocket, gameID: int, payload: Any) -> Optional[str]:
+        """Acepta un mensaje para la partida, o indica por qué se rechazó
+
+        Args:
+            websocket (WebSocket): Conexión que envió el mensaje
+            gameID (int): ID del juego
+            payload (Any): Cuerpo del mensaje
+
+        Returns:
+            Optional[str]: Motivo del rechazo a informar al cliente, o None si se aceptó. Mientras la conexión
+                siga sin fichas se informa una sola vez, para no responder a cada mensaje de una ráfaga.
+        """
+        if not is_chat_payload(payload):
+            return "invalid"
+
+        bucket = self.buckets.get(websocket)
+        if bucket is None:
+            bucket = self.buckets[websocket] = TokenBucket(self.rate, self.burst)
+        if not bucket.take():
+            if bucket.throttled:
+                return None
+            bucket.throttled = True
+            return "rate_limit"
+        bucket.throttled = False
+
+        self.pending.setdefault(gameID, []).append(payload)
+        loop = asyncio.get_running_loop()
+        if self.flushing is None or self.flushing.get_loop() is not loop:
+            self.flushing = loop.create_task(self.flush())
+        return None
+
+    async def flush(self) -> None:
+        """Envía los mensajes pendientes de cada partida"""
+        pending, self.pending = self.pending, {}
+        self.flushing = None
+        for gameID, messages in pending.items():
+            await self.publish(gameID, messages)
@@ -0,0 +1,68 @@
+from typing import Dict
+
+from src.games.domain.figures import FigureIndex
+
+
+class FigureIndexRegistry:
+    """Mantiene en memoria el conjunto de figuras formadas de cada partida.
+    Cada índice recuerda el tablero sobre el que fue calculado; si el tablero guardado no coincide
+    (por ejemplo, luego de reiniciar el proceso) se recalcula completo.
+    """
+
+    indexes: Dict[int, FigureIndex]
+
+    def __init__(self):
+        self.indexes = {}
+
+    def clean_up(self):
+        """Limpia todos los índices"""
+        self.indexes.clear()
+
+    def create(self, gameID: int, board: str) -> FigureIndex:
+        """Calcula desde cero las figuras de una partida
+
+        Args:
+            gameID (int): ID del juego
+            board (str): Tablero de la partida
+        """
+        index = FigureIndex(board)
+        self.indexes[gameID] = index
+        return index
+
+    def get(self, gameID: int, board: str) -> FigureIndex:
+        """Devuelve el índice de la partida, recalculándolo si no corresponde al tablero actual
+
+        Args:
+            gameID (int): ID del juego
+            board (str): Tablero actual de la partida
+        """
+        index = self.indexes.get(gameID)
+        if index is None or index.board != board:
+            return self.create(gameID, board)
+        return index
+
+    def swap(self, gameID: int, board: str, first: int, second: int) -> None:
+        """Aplica el intercambio de dos casillas al índice de la partida
+
+        Args:
+            gameID (int): ID del juego
+            board (str): Tablero de la partida antes del intercambio
+            first (int): Índice de la primera casilla
+            second (int): Índice de la segunda casilla
+        """
+        index = self.indexes.get(gameID)
+        if index is None or index.board != board:
+            self.indexes.pop(gameID, None)
+            return
+        index.swap(first, second)
+
+    def discard(self, gameID: int) -> None:
+        """Elimina el índice de la partida
+
+        Args:
+            gameID (int): ID del juego
+        """
+        self.indexes.pop(gameID, None)
+
+
+figure_indexes = FigureIndexRegistry()
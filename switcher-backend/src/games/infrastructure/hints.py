@@ -0,0 +1,48 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from src.games.config import HINT_SEARCH_WORKERS, HINT_TIME_BUDGET_SECONDS
+from src.games.domain.figures import BOARD_CELLS, cell_index
+from src.games.domain.hints import find_hint
+from src.games.domain.models import BoardPiece, FigureCard, Hint, MovementCard
+
+
+class HintSearcher:
+    """Busca pistas de jugada en un pool de hilos acotado.
+    Cada búsqueda puede ocupar la CPU hasta agotar su tiempo, por lo que nunca corre en el event loop ni en el hilo
+    de base de datos.
+    """
+
+    def __init__(self, workers: int = HINT_SEARCH_WORKERS, budget: float = HINT_TIME_BUDGET_SECONDS):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hint")
+        self.budget = budget
+
+    async def search(
+        self,
+        board: List[BoardPiece],
+        prohibitedColor: Optional[str],
+        movement_cards: List[MovementCard],
+        figure_cards: List[FigureCard],
+    ) -> Optional[Hint]:
+        """Busca movimientos parciales que formen una figura de la mano
+
+        Args:
+            board (List[BoardPiece]): Fichas del tablero
+            prohibitedColor (Optional[str]): Color prohibido
+            movement_cards (List[MovementCard]): Cartas de movimiento del jugador
+            figure_cards (List[FigureCard]): Cartas de figura jugables del jugador
+        """
+        colors = [""] * BOARD_CELLS
+        for piece in board:
+            colors[cell_index(piece.posX, piece.posY)] = piece.color
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            functools.partial(find_hint, colors, prohibitedColor, movement_cards, figure_cards, budget=self.budget),
+        )
+
+
+hint_searcher = HintSearcher()
@@ -0,0 +1,78 @@
+from typing import List
+
+from sqlalchemy import Engine, inspect, text
+from sqlalchemy.schema import CreateColumn
+
+from src.database import Base
+from src.games.domain.board import BoardCodec
+
+
+def migrate_board_storage(engine: Engine) -> int:
+    """Convierte los tableros guardados como JSON de {posX, posY, color} a la representación compacta
+
+    Args:
+        engine (Engine): Motor de la base de datos a migrar
+
+    Returns:
+        int: Cantidad de partidas migradas
+    """
+    migrated = 0
+    with engine.begin() as connection:
+        rows = connection.execute(text("SELECT gameID, board FROM games WHERE board IS NOT NULL")).all()
+        for gameID, board in rows:
+            if BoardCodec.is_compact(board):
+                continue
+            connection.execute(
+                text("UPDATE games SET board = :board WHERE gameID = :gameID"),
+                {"board": BoardCodec.from_legacy(board), "gameID": gameID},
+            )
+            migrated += 1
+    return migrated
+
+
+def create_missing_indexes(engine: Engine) -> List[str]:
+    """Crea los índices declarados en los modelos que faltan en una base de datos existente,
+    ya que create_all no modifica las tablas que ya fueron creadas
+
+    Args:
+        engine (Engine): Motor de la base de datos a migrar
+
+    Returns:
+        List[str]: Nombres de los índices creados
+    """
+    inspector = inspect(engine)
+    created = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=engine)
+                created.append(index.name)
+    return created
+
+
+def add_missing_columns(engine: Engine) -> List[str]:
+    """Agrega las columnas declaradas en los modelos que faltan en una base de datos existente,
+    ya que create_all no modifica las tablas que ya fueron creadas
+
+    Args:
+        engine (Engine): Motor de la base de datos a migrar
+
+    Returns:
+        List[str]: Columnas agregadas, como tabla.columna
+    """
+    inspector = inspect(engine)
+    added = []
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    definition = CreateColumn(column).compile(dialect=engine.dialect)
+                    connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {definition}"))
+                    added.append(f"{table.name}.{column.name}")
+    return added
@@ -1,4 +1,4 @@
-from sqlalchemy import JSON, Boolean, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import JSON, Boolean, Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from src.database import Base
@@ -9,12 +9,15 @@ class Game(Base):
 
     gameID = Column(Integer, primary_key=True)
     roomID = Column(ForeignKey("rooms.roomID"), nullable=False, unique=True)
-    board = Column(JSON)
+    board = Column(String(36))
     lastMovements = Column(JSON, nullable=True)
     prohibitedColor = Column(String, nullable=True)
     room = relationship("Room", back_populates="game")
     posEnabledToPlay = Column(Integer, default=1)
     timestamp_next_turn = Column(DateTime, nullable=True)
+    # Se incrementa al confirmar cambios en la partida, sus cartas o los jugadores de su sala. Es la versión de los
+    # estados enviados a los clientes, y con varios workers cada uno la compara con su GameStateCache
+    stateVersion = Column(Integer, nullable=False, default=0, server_default="0")
 
     figureDeck = relationship("FigureCard", back_populates="game")
     movementDeck = relationship("MovementCard", back_populates="game")
@@ -38,6 +41,11 @@ class FigureCard(Base):
     player = relationship("Player", back_populates="cardsFigure")
     game = relationship("Game", back_populates="figureDeck")
 
+    # Mano de un jugador en una partida, filtrada por isPlayable/isBlocked; incluye todas las columnas
+    __table_args__ = (
+        Index("ix_figure_cards_game_player", "gameID", "playerID", "isPlayable", "isBlocked", "wasBlocked", "type"),
+    )
+
     def __repr__(self):
         return f"<FigureCard(cardID={self.cardID}, type={self.type}, isBlocked={self.isBlocked})>"
 
@@ -55,5 +63,8 @@ class MovementCard(Base):
     player = relationship("Player", back_populates="movementCards")
     game = relationship("Game", back_populates="movementDeck")
 
+    # Mano de un jugador, o mazo de la partida (playerID IS NULL) filtrado por isDiscarded; incluye todas las columnas
+    __table_args__ = (Index("ix_movement_cards_game_player", "gameID", "playerID", "isDiscarded", "type"),)
+
     def __repr__(self):
         return f"<MovementCard(cardID={self.cardID}, type={self.type}, isDiscarded={self.isDiscarded})>"
@@ -3,17 +3,14 @@ import random
 from datetime import datetime, timedelta
 from typing import List, Optional, Tuple
 
-import numpy as np
 from fastapi.websockets import WebSocket
-from scipy.signal import convolve2d
 from sqlalchemy.orm import Session
 from sqlalchemy.sql.expression import func
 
+from src.database import after_commit, commit, open_read_session, run_db, writes
 from src.games.config import (
     BLUE_CARDS,
     BLUE_CARDS_AMOUNT,
-    COLORS,
-    FIGURE_CARDS_FORM,
     FIGURE_CARDS_NAMES,
     MOVEMENT_CARDS,
     MOVEMENT_CARDS_AMOUNT,
@@ -21,6 +18,8 @@ from src.games.config import (
     WHITE_CARDS,
     WHITE_CARDS_AMOUNT,
 )
+from src.games.domain.board import BoardCodec
+from src.games.domain.figures import BOARD_CELLS, FigurePlacement, cell_index, find_figures
 from src.games.domain.models import (
     BoardPiece,
     BoardPiecePosition,
@@ -28,6 +27,7 @@ from src.games.domain.models import (
     Game,
     GameID,
     GamePublicInfo,
+    Hint,
     MovementCard,
     PlayerPublicInfo,
     Position,
@@ -37,31 +37,36 @@ from src.games.domain.models import (
     MovementCard as MovementCardDomain,
 )
 from src.games.domain.repository import GameRepository, GameRepositoryWS
+from src.games.infrastructure.cache import GameState, decode_movements, game_states
+from src.games.infrastructure.figure_index import figure_indexes
+from src.games.infrastructure.hints import hint_searcher
 from src.games.infrastructure.models import FigureCard as FigureCardDB
 from src.games.infrastructure.models import Game as GameDB
 from src.games.infrastructure.models import MovementCard as MovementCardDB
+from src.games.infrastructure.status import GameStatus, game_status_history
 from src.games.infrastructure.websocket import MessageType, ws_manager_game
 from src.players.infrastructure.models import Player as PlayerDB
 from src.rooms.infrastructure.models import PlayerRoom as PlayerRoomDB
 from src.rooms.infrastructure.models import Room as RoomDB
-from src.rooms.infrastructure.repository import SQLAlchemyRepository as RoomRepository
 
 
 class SQLAlchemyRepository(GameRepository):
     def __init__(self, db_session: Session):
         self.db_session = db_session
 
+    @writes
     def create(self, roomID: int, new_board: list) -> GameID:
-        board_json = json.dumps(new_board)
-
-        new_game = GameDB(board=board_json, lastMovements={}, prohibitedColor=None, roomID=roomID)
+        new_game = GameDB(board=BoardCodec.encode(new_board), lastMovements={}, prohibitedColor=None, roomID=roomID)
 
         self.db_session.add(new_game)
-        self.db_session.commit()
+        commit(self.db_session)
         self.db_session.refresh(new_game)
 
+        figure_indexes.create(new_game.gameID, new_game.board)
+
         return GameID(gameID=new_game.gameID)
 
+    @writes
     def create_figure_cards(self, gameID: int) -> None:
         players = self.get_players(gameID)
         amount_players_index = len(players) - 2
@@ -91,8 +96,9 @@ class SQLAlchemyRepository(GameRepository):
                 new_cards.append(new_card)
 
         self.db_session.add_all(new_cards)
-        self.db_session.commit()
+        commit(self.db_session)
 
+    @writes
     def create_movement_cards(self, gameID: int) -> None:
         players = self.get_players(gameID)
 
@@ -110,31 +116,29 @@ class SQLAlchemyRepository(GameRepository):
                 new_cards[index * 3 + i].playerID = player.playerID
 
         self.db_session.add_all(new_cards)
-        self.db_session.commit()
+        commit(self.db_session)
 
+    @writes
     def skip(self, gameID: int) -> int:
+        state = self.get_state(gameID)
         game = self.db_session.get(GameDB, gameID)
-        game_players = self.get_players(gameID)
-        if game is None:
-            raise ValueError(f"Game with ID {gameID} not found")
         current_position = game.posEnabledToPlay
 
-        if current_position == len(game_players):
+        if current_position == len(state.seats):
             game.posEnabledToPlay = 1
         else:
             game.posEnabledToPlay = current_position + 1
 
-        self.db_session.commit()
+        self.commit_game(game)
 
         # Caso en el que el jugador que ahora tiene el turno no está activo
-        for player in game_players:
-            if player.position == game.posEnabledToPlay and not player.isActive:
+        for player in state.seats:
+            if player.position == state.posEnabledToPlay and not player.isActive:
                 return self.skip(gameID)
 
-        self.db_session.commit()
-
-        return game.posEnabledToPlay
+        return state.posEnabledToPlay
 
+    @writes
     def rebuild_movement_deck(self, gameID: int) -> None:
         movement_cards = (
             self.db_session.query(MovementCardDB)
@@ -145,8 +149,9 @@ class SQLAlchemyRepository(GameRepository):
         for card in movement_cards:
             card.isDiscarded = False
 
-        self.db_session.commit()
+        commit(self.db_session)
 
+    @writes
     def replacement_movement_card(self, gameID: int, playerID: int) -> None:
         playable_cards = self.db_session.query(MovementCardDB).filter(
             MovementCardDB.gameID == gameID, MovementCardDB.playerID == playerID
@@ -180,8 +185,9 @@ class SQLAlchemyRepository(GameRepository):
             for card in available_cards:
                 card.playerID = playerID
 
-        self.db_session.commit()
+        commit(self.db_session)
 
+    @writes
     def replacement_figure_card(self, gameID: int, playerID: int) -> None:
         figure_cards = self.db_session.query(FigureCardDB).filter(
             FigureCardDB.gameID == gameID,
@@ -206,74 +212,83 @@ class SQLAlchemyRepository(GameRepository):
         for card in available_cards:
             card.isPlayable = True
 
-        self.db_session.commit()
+        commit(self.db_session)
 
+    @writes
     def delete(self, gameID: int) -> None:
         game = self.db_session.get(GameDB, gameID)
         self.db_session.delete(game)
-        self.db_session.commit()
+        commit(self.db_session)
+        game_states.evict(gameID)
+        figure_indexes.discard(gameID)
+        game_status_history.discard(gameID)
+
+    def get_state(self, gameID: int) -> GameState:
+        state = game_states.get(self.db_session, gameID)
+        if state is None:
+            raise ValueError(f"Game with ID {gameID} not found")
+        return state
+
+    @writes
+    def commit_game(self, game: GameDB) -> None:
+        game_states.update(game)
+        commit(self.db_session)
 
     def get(self, gameID: int) -> Optional[Game]:
-        game = self.db_session.get(GameDB, gameID)
+        state = game_states.get(self.db_session, gameID)
 
-        if game is None:
+        if state is None:
             return None
 
-        room_repository = RoomRepository(self.db_session)
-        room_repository.get_players(game.roomID)
         return Game(
-            gameID=game.gameID,
+            gameID=state.gameID,
             board=self.get_board(gameID),
-            prohibitedColor=game.prohibitedColor,
-            posEnabledToPlay=game.posEnabledToPlay,
+            prohibitedColor=state.prohibitedColor,
+            posEnabledToPlay=state.posEnabledToPlay,
             players=self.get_players(gameID),
         )
 
     def get_board(self, gameID: int) -> List[BoardPiece]:
-        game = self.db_session.get(GameDB, gameID)
-        if game is None:
-            raise ValueError(f"Game with ID {gameID} not found")
-        board_json = json.loads(game.board)
+        state = self.get_state(gameID)
+        partial_cells = state.partial_cells()
         board: List[BoardPiece] = []
-        for piece_db in board_json:
-            is_partial = self.is_piece_partial(gameID, piece_db["posX"], piece_db["posY"])
+        for piece_db in BoardCodec.decode(state.board):
+            is_partial = (piece_db["posX"], piece_db["posY"]) in partial_cells
             piece = BoardPiece(
                 posX=piece_db["posX"], posY=piece_db["posY"], color=piece_db["color"], isPartial=is_partial
             )
             board.append(piece)
         return board
 
-    def board_piece_to_dict(self, piece):
-        return {"posX": piece.posX, "posY": piece.posY, "color": piece.color}
-
+    @writes
     def play_movement(
         self, gameID: int, card_id: int, originX: int, originY: int, destinationX: int, destinationY: int
     ) -> None:
         game = self.db_session.get(GameDB, gameID)
         if game is None:
             raise ValueError(f"Game with ID {gameID} not found")
-        board = self.get_board(gameID)
-        origin_piece = next(piece for piece in board if piece.posX == originX and piece.posY == originY)
-        destination_piece = next(piece for piece in board if piece.posX == destinationX and piece.posY == destinationY)
-        aux = origin_piece.color
-        origin_piece.color = destination_piece.color
-        destination_piece.color = aux
+        board = BoardCodec.swap(game.board, originX, originY, destinationX, destinationY)
+        figure_indexes.swap(gameID, game.board, cell_index(originX, originY), cell_index(destinationX, destinationY))
 
-        last_movements = json.loads(game.lastMovements) if game.lastMovements else []
+        last_movements = decode_movements(game.lastMovements)
 
         last_movements.append(
             {
                 "CardID": card_id,
-                "origin": self.board_piece_to_dict(origin_piece),
-                "destination": self.board_piece_to_dict(destination_piece),
+                "origin": {"posX": originX, "posY": originY, "color": BoardCodec.color_at(board, originX, originY)},
+                "destination": {
+                    "posX": destinationX,
+                    "posY": destinationY,
+                    "color": BoardCodec.color_at(board, destinationX, destinationY),
+                },
                 "Order": len(last_movements) + 1,
             }
         )
 
         game.lastMovements = json.dumps(last_movements)
 
-        game.board = json.dumps([self.board_piece_to_dict(piece) for piece in board])
-        self.db_session.commit()
+        game.board = board
+        self.commit_game(game)
 
     def has_three_cards(self, gameID: int, playerID: int) -> bool:
         cards = (
@@ -284,40 +299,27 @@ class SQLAlchemyRepository(GameRepository):
         return len(cards) == 3
 
     def partial_movement_exists(self, gameID: int) -> bool:
-        game = self.db_session.get(GameDB, gameID)
-        if game is None:
-            raise ValueError(f"Game with ID {gameID} not found")
-        return len(json.loads(game.lastMovements)) > 0
+        return len(self.get_state(gameID).lastMovements) > 0
 
+    @writes
     def delete_partial_movement(self, gameID: int) -> None:
         game = self.db_session.get(GameDB, gameID)
         if game is None:
             raise ValueError(f"Game with ID {gameID} not found")
 
-        last_movements = json.loads(game.lastMovements) if game.lastMovements else []
+        last_movements = decode_movements(game.lastMovements)
         if len(last_movements) == 0:
             return
 
         last_movement = last_movements[-1]
         last_movement_origin = last_movement["origin"]
         last_movement_destination = last_movement["destination"]
-        board = self.get_board(gameID)
-        origin_piece = next(
-            piece
-            for piece in board
-            if piece.posX == last_movement_origin["posX"] and piece.posY == last_movement_origin["posY"]
-        )
-        destination_piece = next(
-            piece
-            for piece in board
-            if piece.posX == last_movement_destination["posX"] and piece.posY == last_movement_destination["posY"]
-        )
-        aux = origin_piece.color
-        origin_piece.color = destination_piece.color
-        destination_piece.color = aux
+        origin = (last_movement_origin["posX"], last_movement_origin["posY"])
+        destination = (last_movement_destination["posX"], last_movement_destination["posY"])
+        figure_indexes.swap(gameID, game.board, cell_index(*origin), cell_index(*destination))
         game.lastMovements = json.dumps(last_movements[:-1])
-        game.board = json.dumps([self.board_piece_to_dict(piece) for piece in board])
-        self.db_session.commit()
+        game.board = BoardCodec.swap(game.board, *origin, *destination)
+        self.commit_game(game)
 
     def has_movement_card(self, playerID: int, cardID: int) -> bool:
         card = self.db_session.get(MovementCardDB, cardID)
@@ -330,40 +332,32 @@ class SQLAlchemyRepository(GameRepository):
         return card is not None
 
     def is_player_turn(self, playerID: int, gameID: int) -> bool:
-        game = self.db_session.get(GameDB, gameID)
-        players = self.get_players(gameID)
-        player = next(player for player in players if player.playerID == playerID)
-        return player.position == game.posEnabledToPlay
+        state = self.get_state(gameID)
+        seat = state.seat(playerID)
+        return seat is not None and seat.position == state.posEnabledToPlay
 
     def is_piece_partial(self, gameID: int, posX: int, posY: int) -> bool:
-        game = self.db_session.get(GameDB, gameID)
-        last_movements = json.loads(game.lastMovements) if game.lastMovements else []
-        for movement in last_movements:
-            if movement["origin"]["posX"] == posX and movement["origin"]["posY"] == posY:
-                return True
-            if movement["destination"]["posX"] == posX and movement["destination"]["posY"] == posY:
-                return True
-        return False
+        return (posX, posY) in self.get_state(gameID).partial_cells()
 
     def get_players(self, gameID: int) -> List[PlayerPublicInfo]:
-        game = self.db_session.get(GameDB, gameID)
-        if game is None:
-            raise ValueError(f"Game with ID {gameID} not found")
-        roomID = game.roomID
+        """Devuelve los jugadores de la partida con sus cartas de figura, a partir del estado cargado
+        por GameStateCache.load (una consulta para asientos y cartas de figura)
 
-        db_players = self.db_session.query(PlayerRoomDB).filter(PlayerRoomDB.roomID == roomID).all()
+        Args:
+            gameID (int): ID del juego
+        """
+        state = self.get_state(gameID)
         players = []
 
-        for player in db_players:
-            username = self.db_session.get(PlayerDB, player.playerID).username
-            amount_non_playable, playable_cards_figure = self.get_player_figure_cards(gameID, player.playerID)
+        for seat in state.seats:
+            amount_non_playable, playable_cards_figure = self.get_player_figure_cards(gameID, seat.playerID)
 
             players.append(
                 PlayerPublicInfo(
-                    playerID=player.playerID,
-                    username=username,
-                    position=player.position,
-                    isActive=player.isActive,
+                    playerID=seat.playerID,
+                    username=seat.username,
+                    position=seat.position,
+                    isActive=seat.isActive,
                     sizeDeckFigure=amount_non_playable,
                     cardsFigure=playable_cards_figure,
                 )
@@ -371,10 +365,8 @@ class SQLAlchemyRepository(GameRepository):
         return players
 
     def get_player_figure_cards(self, gameID: int, playerID: int) -> Tuple[int, List[FigureCard]]:
-        figure_cards = self.db_session.query(FigureCardDB).filter(
-            FigureCardDB.gameID == gameID, FigureCardDB.playerID == playerID
-        )
-        amount_non_playable = figure_cards.filter(FigureCardDB.isPlayable.is_(False)).count()
+        figure_cards = self.get_state(gameID).figure_hand(playerID)
+        amount_non_playable = len([card for card in figure_cards if not card.isPlayable])
 
         playable_cards: List[FigureCard] = []
         for card in figure_cards:
@@ -384,7 +376,7 @@ class SQLAlchemyRepository(GameRepository):
                         type=card.type,
                         cardID=card.cardID,
                         isBlocked=card.isBlocked,
-                        gameID=card.gameID,
+                        gameID=gameID,
                         playerID=card.playerID,
                     )
                 )
@@ -392,188 +384,116 @@ class SQLAlchemyRepository(GameRepository):
         return amount_non_playable, playable_cards
 
     def get_player_movement_cards(self, gameID: int, playerID: int) -> List[MovementCard]:
-        cards_db = self.db_session.query(MovementCardDB).filter(
-            MovementCardDB.gameID == gameID, MovementCardDB.playerID == playerID
-        )
+        state = self.get_state(gameID)
+        partial_cards = state.partial_cards()
         cards: List[MovementCard] = []
-        for card in cards_db:
-            isUsed = self.was_card_used_in_partial_movement(gameID, card.cardID)
-            cards.append(MovementCard(type=card.type, cardID=card.cardID, isUsed=isUsed))
+        for card in state.movement_hand(playerID):
+            cards.append(MovementCard(type=card.type, cardID=card.cardID, isUsed=card.cardID in partial_cards))
 
         return cards
 
+    async def find_hint(
+        self,
+        board: List[BoardPiece],
+        prohibitedColor: Optional[str],
+        movement_cards: List[MovementCard],
+        figure_cards: List[FigureCard],
+    ) -> Optional[Hint]:
+        return await hint_searcher.search(board, prohibitedColor, movement_cards, figure_cards)
+
+    @writes
     def clean_partial_movements(self, gameID: int) -> None:
         game = self.db_session.get(GameDB, gameID)
-        last_movements = json.loads(game.lastMovements) if game.lastMovements else []
-        board = self.get_board(gameID)
+        last_movements = decode_movements(game.lastMovements)
+        board = game.board
         last_movements.sort(key=lambda x: x["Order"], reverse=True)
         for movement in last_movements:
-            origin = movement["origin"]
-            destination = movement["destination"]
-            origin_piece = next(
-                piece for piece in board if piece.posX == origin["posX"] and piece.posY == origin["posY"]
-            )
-            destination_piece = next(
-                piece for piece in board if piece.posX == destination["posX"] and piece.posY == destination["posY"]
-            )
-            aux = origin_piece.color
-            origin_piece.color = destination_piece.color
-            destination_piece.color = aux
-        game.board = json.dumps([self.board_piece_to_dict(piece) for piece in board])
+            origin = (movement["origin"]["posX"], movement["origin"]["posY"])
+            destination = (movement["destination"]["posX"], movement["destination"]["posY"])
+            figure_indexes.swap(gameID, board, cell_index(*origin), cell_index(*destination))
+            board = BoardCodec.swap(board, *origin, *destination)
+        game.board = board
         game.lastMovements = json.dumps([])
-        self.db_session.commit()
+        self.commit_game(game)
 
+    @writes
     def set_partial_movements_to_empty(self, gameID: int) -> None:
         game = self.db_session.get(GameDB, gameID)
         game.lastMovements = json.dumps([])
-        self.db_session.commit()
+        self.commit_game(game)
 
     def was_card_used_in_partial_movement(self, gameID: int, cardID: int) -> bool:
-        game = self.db_session.get(GameDB, gameID)
-        last_movements = json.loads(game.lastMovements) if game.lastMovements else []
-        for movement in last_movements:
-            if movement["CardID"] == cardID:
-                return True
-        return False
+        return cardID in self.get_state(gameID).partial_cards()
 
     def is_player_in_game(self, playerID, gameID):
-        players = self.get_players(gameID)
-        return playerID in [player.playerID for player in players]
+        return self.get_state(gameID).seat(playerID) is not None
+
+    def get_room_id(self, gameID: int) -> int:
+        return self.get_state(gameID).roomID
 
     def get_current_turn(self, gameID: int) -> int:
-        game = self.get(gameID)
-        if game is None:
-            raise ValueError(f"Game with ID {gameID} not found")
-        return game.posEnabledToPlay
+        return self.get_state(gameID).posEnabledToPlay
 
     def get_position_player(self, gameID, playerID):
-        game = self.db_session.get(GameDB, gameID)
-        if game is None:
-            raise ValueError(f"Game with ID {gameID} not found")
-        player_position = (
-            self.db_session.query(PlayerRoomDB)
-            .filter(PlayerRoomDB.playerID == playerID, PlayerRoomDB.roomID == game.roomID)
-            .one_or_none()
-            .position
-        )
-        return player_position
+        return self.get_state(gameID).seat(playerID).position
 
     def get_public_info(self, gameID: int, playerID: int) -> GamePublicInfo:
+        state = self.get_state(gameID)
+        if state.seat(playerID) is None and self.db_session.get(PlayerDB, playerID) is None:
+            raise ValueError(f"Player with ID {playerID} not found")
+
+        return self.build_public_info(gameID)
+
+    def build_public_info(self, gameID: int) -> GamePublicInfo:
         game = self.get(gameID)
         if game is None:
             raise ValueError(f"Game with ID {gameID} not found")
 
-        player = self.db_session.get(PlayerDB, playerID)
-        if player is None:
-            raise ValueError(f"Player with ID {playerID} not found")
-
-        timestamp = self.db_session.get(GameDB, gameID).timestamp_next_turn
+        timestamp = self.get_state(gameID).timestamp_next_turn
         if timestamp is None:
             timestamp = datetime.now()
 
         return GamePublicInfo(
             gameID=game.gameID,
             board=game.board,
-            figuresToUse=self.get_available_figures(game.prohibitedColor, self.get_board(gameID)),
+            figuresToUse=self.get_game_figures(gameID, game.prohibitedColor),
             prohibitedColor=game.prohibitedColor,
             posEnabledToPlay=game.posEnabledToPlay,
             players=game.players,
             timer=timedelta.total_seconds(timestamp - datetime.now()),
         )
 
-    def add_movement_cards_to_public_info(self, gameID: int, playerID: int, game: GamePublicInfo):
-        game_json = game.model_dump()
+    def get_game_status(self, gameID: int) -> GameStatus:
+        game_json = self.build_public_info(gameID).model_dump()
 
+        hands = {}
         for player in game_json["players"]:
-            player["sizeDeckFigure"], _ = self.get_player_figure_cards(gameID, player["playerID"])
-            if player["playerID"] == playerID:
-                player["cardsMovement"] = []
-                for card in self.get_player_movement_cards(gameID, playerID):
-                    player["cardsMovement"].append(card.model_dump())
-            else:
-                cards_db = self.db_session.query(MovementCardDB).filter(
-                    MovementCardDB.gameID == gameID, MovementCardDB.playerID == player["playerID"]
-                )
-                cards = []
-                for card in cards_db:
-                    isUsed = self.was_card_used_in_partial_movement(gameID, card.cardID)
-                    if isUsed:
-                        cards.append(MovementCard(type=card.type, cardID=card.cardID, isUsed=isUsed).model_dump())
-                    else:
-                        cards.append(None)
-
-                player["cardsMovement"] = cards
+            hand = [card.model_dump() for card in self.get_player_movement_cards(gameID, player["playerID"])]
+            hands[player["playerID"]] = hand
+            player["cardsMovement"] = GameStatus.mask_hand(hand)
 
-        return game_json
+        return GameStatus(game_json, hands, self.get_state(gameID).stateVersion)
 
     def get_available_figures(
         self, prohibitedColor: Optional[str], board: List[BoardPiece]
     ) -> List[List[BoardPiecePosition]]:
-        board_matrix = np.empty((6, 6), dtype=object)
-
+        colors = [""] * BOARD_CELLS
         for piece in board:
-            board_matrix[piece.posY][piece.posX] = piece.color
-
-        prohibitedColor = prohibitedColor or ""
-
-        color_layers = self.create_color_layers(board_matrix, prohibitedColor)
-
-        all_figures = []
-        rotated_figures = {
-            figure_type: [np.rot90(shape, k) for k in range(4)] for figure_type, shape in FIGURE_CARDS_FORM.items()
-        }
-
-        seen_figures = set()
-
-        for color, layer in color_layers.items():
-            for figure_type, rotations in rotated_figures.items():
-                for rotated_figure in rotations:
-                    figures_found = self.match_figure_in_layer(rotated_figure, layer)
-
-                    for figure in figures_found:
-                        figure_tuple = tuple((pos.posX, pos.posY) for pos in figure)
-
-                        if figure_tuple not in seen_figures:
-                            seen_figures.add(figure_tuple)
-                            all_figures.append(figure)
-
-        return all_figures
-
-    def create_color_layers(self, board_matrix: np.ndarray, prohibitedColor: str) -> dict:
-        return {color: (board_matrix == color).astype(int) for color in COLORS if color != prohibitedColor}
-
-    def match_figure_in_layer(self, shape: np.ndarray, layer: np.ndarray) -> List[List[BoardPiecePosition]]:
-        matched_figures = []
-        shape_height, shape_width = shape.shape
-
-        result = convolve2d(layer, shape[::-1, ::-1], mode="valid")
+            colors[cell_index(piece.posX, piece.posY)] = piece.color
 
-        for y, x in zip(*np.where(result == shape.sum())):
-            matched_positions = [
-                BoardPiecePosition(posX=x + shape_x, posY=y + shape_y)
-                for shape_y in range(shape_height)
-                for shape_x in range(shape_width)
-                if shape[shape_y, shape_x] == 1
-            ]
+        return self.figures_to_positions(find_figures(colors, prohibitedColor))
 
-            if self.check_border_validity(matched_positions, layer):
-                matched_figures.append(matched_positions)
+    def get_game_figures(self, gameID: int, prohibitedColor: Optional[str]) -> List[List[BoardPiecePosition]]:
+        figure_index = figure_indexes.get(gameID, self.get_state(gameID).board)
+        return self.figures_to_positions(figure_index.figures(prohibitedColor))
 
-        return matched_figures
-
-    def check_border_validity(self, positions: List[BoardPiecePosition], layer: np.ndarray) -> bool:
-        position_set = {(pos.posX, pos.posY) for pos in positions}
-        for pos in positions:
-            x, y = pos.posX, pos.posY
-            adjacent_positions = [(x + dx, y + dy) for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]]
-
-            for nx, ny in adjacent_positions:
-                if 0 <= nx < 6 and 0 <= ny < 6 and (nx, ny) not in position_set:
-                    if layer[ny, nx] == layer[y, x]:
-                        return False
-        return True
+    def figures_to_positions(self, figures: List[FigurePlacement]) -> List[List[BoardPiecePosition]]:
+        return [[BoardPiecePosition(posX=posX, posY=posY) for posX, posY in figure.positions] for figure in figures]
 
+    @writes
     def set_player_inactive(self, playerID: int, gameID: int) -> None:
+        state = self.get_state(gameID)
+        position = state.seat(playerID).position
         game = self.db_session.get(GameDB, gameID)
         self.db_session.query(PlayerRoomDB).filter(
             PlayerRoomDB.playerID == playerID, PlayerRoomDB.roomID == game.roomID
@@ -590,28 +510,24 @@ class SQLAlchemyRepository(GameRepository):
             card.isDiscarded = True
             card.playerID = None
 
-        if game.posEnabledToPlay == self.get_position_player(gameID, playerID):
-            if game.posEnabledToPlay == len(self.get_players(gameID)):
+        if game.posEnabledToPlay == position:
+            if game.posEnabledToPlay == len(state.seats):
                 game.posEnabledToPlay = 1
             else:
                 game.posEnabledToPlay += 1
 
-        self.db_session.commit()
+        commit(self.db_session)
 
     def is_player_active(self, playerID: int, gameID: int) -> bool:
-        roomID = self.db_session.get(GameDB, gameID).roomID
-        player = (
-            self.db_session.query(PlayerRoomDB)
-            .filter(PlayerRoomDB.playerID == playerID, PlayerRoomDB.roomID == roomID)
-            .one_or_none()
-        )
-        return player is not None and player.isActive
+        seat = self.get_state(gameID).seat(playerID)
+        return seat is not None and seat.isActive
 
     def get_active_players(self, gameID: int) -> List[PlayerPublicInfo]:
         players = self.get_players(gameID)
-        active_players = [player for player in players if self.is_player_active(player.playerID, gameID)]
+        active_players = [player for player in players if player.isActive]
         return active_players
 
+    @writes
     def delete_and_clean(self, gameID: int) -> None:
         game = self.db_session.get(GameDB, gameID)
         if game is None:
@@ -622,8 +538,12 @@ class SQLAlchemyRepository(GameRepository):
         room = game.room
         self.db_session.delete(game)
         self.db_session.delete(room)
-        self.db_session.commit()
+        commit(self.db_session)
+        game_states.evict(gameID)
+        figure_indexes.discard(gameID)
+        game_status_history.discard(gameID)
 
+    @writes
     def play_figure(self, gameID: int, figureID: int, figure: List[BoardPiecePosition]) -> None:
         figure_card = self.db_session.query(FigureCardDB).filter_by(cardID=figureID).first()
 
@@ -631,18 +551,16 @@ class SQLAlchemyRepository(GameRepository):
             self.db_session.delete(figure_card)
             color = self.get_color_from_position(gameID, figure[0].posX, figure[0].posY)
             self.change_color_prohibited(gameID, color)
-            self.db_session.commit()
+            commit(self.db_session)
 
     def get_color_from_position(self, gameID: int, posX: int, posY: int) -> str:
-        game = self.db_session.get(GameDB, gameID)
-        board = json.loads(game.board)
-        piece = next(piece for piece in board if piece["posX"] == posX and piece["posY"] == posY)
-        return piece["color"]
+        return BoardCodec.color_at(self.get_state(gameID).board, posX, posY)
 
+    @writes
     def change_color_prohibited(self, gameID: int, color: str) -> None:
         game = self.db_session.get(GameDB, gameID)
         game.prohibitedColor = color
-        self.db_session.commit()
+        self.commit_game(game)
 
     def get_figure_card(self, figureCardID: int) -> Optional[FigureCard]:
         card = self.db_session.get(FigureCardDB, figureCardID)
@@ -652,14 +570,13 @@ class SQLAlchemyRepository(GameRepository):
             type=card.type, cardID=card.cardID, isBlocked=card.isBlocked, gameID=card.gameID, playerID=card.playerID
         )
 
+    @writes
     def desvinculate_partial_movement_cards(self, gameID):
-        game = self.db_session.get(GameDB, gameID)
-        last_movements = json.loads(game.lastMovements) if game.lastMovements else []
-        for movement in last_movements:
+        for movement in self.get_state(gameID).lastMovements:
             card = self.db_session.get(MovementCardDB, movement["CardID"])
             card.playerID = None
             card.isDiscarded = True
-        self.db_session.commit()
+        commit(self.db_session)
 
     def get_movement_card(self, cardID: int) -> MovementCardDomain:
         card = self.db_session.get(MovementCardDB, cardID)
@@ -668,10 +585,7 @@ class SQLAlchemyRepository(GameRepository):
         return MovementCardDomain(type=card.type, cardID=card.cardID, isUsed=card.isDiscarded)
 
     def get_prohibited_color(self, gameID: int) -> str:
-        game = self.db_session.get(GameDB, gameID)
-        if game is None:
-            raise ValueError(f"Game with ID {gameID} not found")
-        return game.prohibitedColor
+        return self.get_state(gameID).prohibitedColor
 
     def figure_card_count(self, gameID: int, playerID: int) -> int:
         return (
@@ -695,6 +609,7 @@ class SQLAlchemyRepository(GameRepository):
             is_last_card = True
         return card.isBlocked and is_last_card
 
+    @writes
     def unblock_managment(self, gameID: int, blockedcardID: int) -> None:
         card = self.db_session.get(FigureCardDB, blockedcardID)
         if card is None:
@@ -712,8 +627,9 @@ class SQLAlchemyRepository(GameRepository):
             card.isBlocked = False
             card.wasBlocked = True
 
-        self.db_session.commit()
+        commit(self.db_session)
 
+    @writes
     def block_managment(self, gameID: int, figureID: int, figure: List[BoardPiecePosition]) -> None:
         card = self.db_session.get(FigureCardDB, figureID)
         cards_from_player = (
@@ -736,11 +652,9 @@ class SQLAlchemyRepository(GameRepository):
             )
             if len(blocked_player_cards) == 0:
                 card.isBlocked = True
-            self.db_session.commit()
 
         color = self.get_color_from_position(gameID, figure[0].posX, figure[0].posY)
         self.change_color_prohibited(gameID, color)
-        self.db_session.commit()
 
     def is_not_blocked(self, cardID: int) -> bool:
         card = self.db_session.get(FigureCardDB, cardID)
@@ -762,23 +676,33 @@ class SQLAlchemyRepository(GameRepository):
         card = self.db_session.get(FigureCardDB, cardID)
         return card.wasBlocked
 
+    @writes
     def set_was_blocked_false(self, cardID: int) -> None:
         card = self.db_session.get(FigureCardDB, cardID)
         card.wasBlocked = False
-        self.db_session.commit()
+        commit(self.db_session)
 
     def get_current_timestamp_next_turn(self, gameID: int) -> datetime:
-        game = self.db_session.get(GameDB, gameID)
-        return game.timestamp_next_turn
+        state = game_states.get(self.db_session, gameID)
+        return state.timestamp_next_turn
 
+    @writes
     def set_timestamp_next_turn(self, gameID: int, timestamp: datetime) -> None:
         game = self.db_session.get(GameDB, gameID)
         game.timestamp_next_turn = timestamp
-        self.db_session.commit()
+        self.commit_game(game)
 
 
 class WebSocketRepository(GameRepositoryWS, SQLAlchemyRepository):
-    async def setup_connection_game(self, playerID: int, gameID: int, websocket: WebSocket) -> None:
+    async def setup_connection_game(
+        self,
+        playerID: int,
+        gameID: int,
+        websocket: WebSocket,
+        patches: bool = False,
+        heartbeat: bool = False,
+        chat_batches: bool = False,
+    ) -> None:
         """Establece la conexión con el websocket de un juego
         y le envia el estado actual de la sala
 
@@ -786,125 +710,170 @@ class WebSocketRepository(GameRepositoryWS, SQLAlchemyRepository):
             playerID (int): ID del jugador
             gameID (int): ID del juego
             websocket (WebSocket): Conexión con el cliente
+            patches (bool): Si el cliente recibe parches versionados del estado en lugar del estado completo
+            heartbeat (bool): Si el cliente responde a los pings del servidor
+            chat_batches (bool): Si el cliente recibe juntos los mensajes de chat de una misma vuelta del event loop
         """
-        await ws_manager_game.connect(playerID, gameID, websocket)
-        game = self.get_public_info(gameID, playerID)
-        game_json = self.add_movement_cards_to_public_info(gameID, playerID, game)
-        await ws_manager_game.send_personal_message(MessageType.STATUS, game_json, websocket)
-        await ws_manager_game.keep_listening(websocket, gameID)
+        await ws_manager_game.connect(playerID, gameID, websocket, patches, heartbeat, chat_batches)
+        try:
+            await run_db(self.get_public_info, gameID, playerID)
+            game_json = await run_db(self.get_status_snapshot, gameID, playerID, patches)
+            await ws_manager_game.send_personal_message(MessageType.STATUS, game_json, websocket)
+
+            # La sesión del handshake se libera mientras la conexión queda abierta
+            await run_db(self.db_session.close)
+            await ws_manager_game.keep_listening(
+                websocket, gameID, lambda: run_db(self.get_status_snapshot_in_new_session, gameID, playerID)
+            )
+        except BaseException:
+            # La conexión termina sin pasar por disconnect, por ejemplo si se cancela la tarea al apagar el servidor
+            ws_manager_game.forget(websocket)
+            raise
+
+    def get_status_snapshot(self, gameID: int, playerID: int, versioned: bool) -> dict:
+        """Construye el estado completo que ve un jugador
+
+        Args:
+            gameID (int): ID del juego
+            playerID (int): ID del jugador
+            versioned (bool): Si se incluye la versión del estado, para los clientes que reciben parches
+        """
+        status = self.get_game_status(gameID)
+        if not versioned:
+            return status.for_player(playerID)
+        return game_status_history.current(gameID, status).snapshot_for_player(playerID)
+
+    def get_status_snapshot_in_new_session(self, gameID: int, playerID: int) -> dict:
+        """Construye el estado completo versionado con una sesión de corta duración,
+        para los pedidos que llegan por el websocket después de liberar la sesión del handshake
+
+        Args:
+            gameID (int): ID del juego
+            playerID (int): ID del jugador
+        """
+        with open_read_session(self.db_session) as db_session:
+            return WebSocketRepository(db_session).get_status_snapshot(gameID, playerID, versioned=True)
+
+    def record_game_status(self, gameID: int) -> Tuple[GameStatus, Optional[GameStatus]]:
+        """Construye el estado actual de la partida y lo guarda como el último enviado
+
+        Args:
+            gameID (int): ID del juego
+
+        Returns:
+            Tuple[GameStatus, Optional[GameStatus]]: Estado actual y estado enviado anteriormente
+        """
+        status = self.get_game_status(gameID)
+        return status, game_status_history.record(gameID, status)
+
+    def get_username(self, playerID: int) -> str:
+        return self.db_session.get(PlayerDB, playerID).username
 
     async def broadcast_status_game(self, gameID: int) -> None:
-        """Envia el estado actual de la sala a todos los jugadores
+        """Envia el estado actual de la sala a todos los jugadores.
+        Los clientes que lo pidieron reciben solo un parche respecto al último estado enviado.
 
         Args:
             gameID (int): ID del juego
         """
-        players = self.get_players(gameID)
-        for player in players:
-            game = self.get_public_info(gameID, player.playerID)
-            game_json = self.add_movement_cards_to_public_info(gameID, player.playerID, game)
-            await ws_manager_game.send_personal_message_by_id(MessageType.STATUS, game_json, player.playerID, gameID)
+        status, previous = await run_db(self.record_game_status, gameID)
+        await ws_manager_game.broadcast_status(gameID, status, previous)
 
     async def broadcast_end_game(self, gameID: int, winnerID: int) -> None:
-        """Envia un mensaje de fin de juego a todos los jugadores
+        """Envia un mensaje de fin de juego a todos los jugadores, una vez confirmados los cambios
 
         Args:
             gameID (int): ID del juego
             winnerID (int): ID del jugador ganador
         """
-        players = self.get_players(gameID)
-        winner = Winner(winnerID=winnerID, username=self.db_session.get(PlayerDB, winnerID).username)
+        players = await run_db(self.get_players, gameID)
+        winner = Winner(winnerID=winnerID, username=await run_db(self.get_username, winnerID))
         winner_json = winner.model_dump()
         for player in players:
-            await ws_manager_game.send_personal_message_by_id(MessageType.END, winner_json, player.playerID, gameID)
+            await after_commit(
+                self.db_session,
+                ws_manager_game.send_personal_message_by_id,
+                MessageType.END,
+                winner_json,
+                player.playerID,
+                gameID,
+            )
 
     async def send_log_play_movement_card(self, gameID: int, playerID: int, cardID: int) -> None:
-        card = self.get_movement_card(cardID)
+        card = await run_db(self.get_movement_card, cardID)
         card_name = MOVEMENT_CARDS_NAMES[card.type]
-        player = self.db_session.get(PlayerDB, playerID)
-        player_name = player.username
+        player_name = await run_db(self.get_username, playerID)
 
         message = f"{player_name} ha jugado la carta de movimiento '{card_name}'"
 
         data = {"username": "⚙️ Sistema ⚙️", "text": message}
 
-        await ws_manager_game.broadcast(MessageType.MSG, data, gameID)
+        await after_commit(self.db_session, ws_manager_game.broadcast, MessageType.MSG, data, gameID)
 
     async def send_log_cancel_movement_card(self, gameID: int, playerID: int) -> None:
-        game = self.db_session.get(GameDB, gameID)
-
-        if game is None:
-            raise ValueError(f"Game with ID {gameID} not found")
-
-        last_movements = json.loads(game.lastMovements) if game.lastMovements else []
+        state = await run_db(self.get_state, gameID)
+        last_movements = state.lastMovements
 
         if len(last_movements) == 0:
             return
 
-        card = self.get_movement_card(last_movements[-1]["CardID"])
+        card = await run_db(self.get_movement_card, last_movements[-1]["CardID"])
         card_name = MOVEMENT_CARDS_NAMES[card.type]
-        player = self.db_session.get(PlayerDB, playerID)
-        player_name = player.username
+        player_name = await run_db(self.get_username, playerID)
 
         message = f"{player_name} ha cancelado el movimiento realizado por la carta '{card_name}'"
 
         data = {"username": "⚙️ Sistema ⚙️", "text": message}
 
-        await ws_manager_game.broadcast(MessageType.MSG, data, gameID)
+        await after_commit(self.db_session, ws_manager_game.broadcast, MessageType.MSG, data, gameID)
 
     async def remove_player(self, playerID: int, gameID: int) -> None:
-        """Remueve al jugador de la lista de conexiones activas
+        """Remueve al jugador de la lista de conexiones activas, una vez confirmados los cambios
 
         Args:
             playerID (int): ID del jugador
             gameID (int): ID del juego
         """
-        await ws_manager_game.disconnect_by_id(playerID, gameID)
+        await after_commit(self.db_session, ws_manager_game.disconnect_by_id, playerID, gameID)
 
     async def send_log_player_leave_game(self, gameID: int, playerID: int) -> None:
-        player = self.db_session.get(PlayerDB, playerID)
-        player_name = player.username
+        player_name = await run_db(self.get_username, playerID)
 
         message = f"{player_name} ha abandonado la partida"
 
         data = {"username": "⚙️ Sistema ⚙️", "text": message}
 
-        await ws_manager_game.broadcast(MessageType.MSG, data, gameID)
+        await after_commit(self.db_session, ws_manager_game.broadcast, MessageType.MSG, data, gameID)
 
     async def send_log_play_figure(self, gameID: int, playerID: int, figureID: int) -> None:
-        card = self.get_figure_card(figureID)
+        card = await run_db(self.get_figure_card, figureID)
         if card is None:
             raise ValueError(f"Card with ID {figureID} not found")
         card_name = FIGURE_CARDS_NAMES[card.type]
-        player = self.db_session.get(PlayerDB, playerID)
-        player_name = player.username
+        player_name = await run_db(self.get_username, playerID)
 
         message = f"{player_name} ha jugado la carta de figura '{card_name}'"
 
         data = {"username": "⚙️ Sistema ⚙️", "text": message}
 
-        await ws_manager_game.broadcast(MessageType.MSG, data, gameID)
+        await after_commit(self.db_session, ws_manager_game.broadcast, MessageType.MSG, data, gameID)
 
     async def send_log_block_figure(self, gameID: int, playerID: int, targetID: int, figureID: int) -> None:
-        card = self.get_figure_card(figureID)
+        card = await run_db(self.get_figure_card, figureID)
         if card is None:
             raise ValueError(f"Card with ID {figureID} not found")
         card_name = FIGURE_CARDS_NAMES[card.type]
-        player = self.db_session.get(PlayerDB, playerID)
-        player_name = player.username
-
-        target_player = self.db_session.get(PlayerDB, targetID)
-        target_player_name = target_player.username
+        player_name = await run_db(self.get_username, playerID)
+        target_player_name = await run_db(self.get_username, targetID)
 
         message = f"{player_name} ha bloqueado la carta de figura '{card_name}' del jugador {target_player_name}"
 
         data = {"username": "⚙️ Sistema ⚙️", "text": message}
 
-        await ws_manager_game.broadcast(MessageType.MSG, data, gameID)
+        await after_commit(self.db_session, ws_manager_game.broadcast, MessageType.MSG, data, gameID)
 
     async def send_log_turn_skip(self, gameID: int, playerID: int, auto: bool) -> None:
-        player = self.db_session.get(PlayerDB, playerID)
-        player_name = player.username
+        player_name = await run_db(self.get_username, playerID)
 
         message = f"{player_name} ha pasado su turno"
 
@@ -913,4 +882,4 @@ class WebSocketRepository(GameRepositoryWS, SQLAlchemyRepository):
 
         data = {"username": "⚙️ Sistema ⚙️", "text": message}
 
-        await ws_manager_game.broadcast(MessageType.MSG, data, gameID)
+        await after_commit(self.db_session, ws_manager_game.broadcast, MessageType.MSG, data, gameID)
@@ -0,0 +1,143 @@
+from typing import Dict, List, Optional, Tuple
+
+
+def figure_key(figure: List[dict]) -> Tuple[Tuple[int, int], ...]:
+    return tuple((piece["posX"], piece["posY"]) for piece in figure)
+
+
+class GameStatus:
+    """Estado público de una partida, construido una sola vez por cambio.
+    La base contiene la información compartida por todos los jugadores, con las manos de movimiento
+    enmascaradas (solo se muestran las cartas usadas en movimientos parciales). Cada jugador recibe la base
+    con su propia mano completa superpuesta.
+    """
+
+    def __init__(self, base: dict, hands: Dict[int, List[dict]], version: int = 0):
+        self.base = base
+        self.hands = hands
+        self.version = version
+
+    def for_player(self, playerID: int) -> dict:
+        """Devuelve el estado que ve un jugador, sin copiar las partes compartidas
+
+        Args:
+            playerID (int): ID del jugador
+        """
+        players = [
+            {**player, "cardsMovement": self.hands[playerID]} if player["playerID"] == playerID else player
+            for player in self.base["players"]
+        ]
+        return {**self.base, "players": players}
+
+    def snapshot_for_player(self, playerID: int) -> dict:
+        """Estado completo que ve un jugador, con la versión a partir de la cual se aplican los parches
+
+        Args:
+            playerID (int): ID del jugador
+        """
+        return {**self.for_player(playerID), "version": self.version}
+
+    def patch_for_player(self, previous: "GameStatus", playerID: int) -> dict:
+        """Diferencia entre el estado anterior y este, tal como la ve un jugador.
+        Solo incluye las casillas, jugadores y figuras que cambiaron; el cliente debe pedir el estado completo
+        si baseVersion no coincide con la última versión que recibió.
+
+        Args:
+            previous (GameStatus): Último estado enviado
+            playerID (int): ID del jugador
+        """
+        old, new = previous.for_player(playerID), self.for_player(playerID)
+        patch = {"version": self.version, "baseVersion": previous.version, "timer": new["timer"]}
+
+        board = [piece for old_piece, piece in zip(old["board"], new["board"]) if old_piece != piece]
+        if board:
+            patch["board"] = board
+
+        for key in ("posEnabledToPlay", "prohibitedColor"):
+            if old[key] != new[key]:
+                patch[key] = new[key]
+
+        old_players = {player["playerID"]: player for player in old["players"]}
+        players = [player for player in new["players"] if old_players.get(player["playerID"]) != player]
+        if players:
+            patch["players"] = players
+
+        old_figures = {figure_key(figure) for figure in old["figuresToUse"]}
+        new_figures = {figure_key(figure) for figure in new["figuresToUse"]}
+        added = [figure for figure in new["figuresToUse"] if figure_key(figure) not in old_figures]
+        removed = [figure for figure in old["figuresToUse"] if figure_key(figure) not in new_figures]
+        if added:
+            patch["figuresAdded"] = added
+        if removed:
+            patch["figuresRemoved"] = removed
+
+        return patch
+
+    def to_dict(self) -> dict:
+        """Estado serializable a JSON, para enviarlo a los demás workers"""
+        return {"base": self.base, "hands": list(self.hands.items()), "version": self.version}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "GameStatus":
+        return cls(data["base"], {playerID: hand for playerID, hand in data["hands"]}, data["version"])
+
+    @staticmethod
+    def mask_hand(hand: List[dict]) -> List[Optional[dict]]:
+        return [card if card["isUsed"] else None for card in hand]
+
+
+class GameStatusHistory:
+    """Último estado enviado de cada partida. La versión de cada estado es la columna stateVersion de la partida,
+    que se incrementa en la base con cada cambio confirmado: todos los workers asignan la misma versión al mismo
+    estado, y una partida que se vuelve a cargar nunca repite una versión ya enviada.
+    """
+
+    statuses: Dict[int, GameStatus]
+
+    def __init__(self):
+        self.statuses = {}
+
+    def clean_up(self):
+        """Limpia todos los estados guardados"""
+        self.statuses.clear()
+
+    def record(self, gameID: int, status: GameStatus) -> Optional[GameStatus]:
+        """Guarda el estado como el último enviado
+
+        Args:
+            gameID (int): ID del juego
+            status (GameStatus): Estado a enviar, con la versión de la partida
+
+        Returns:
+            Optional[GameStatus]: Estado enviado anteriormente, o None si no hay uno contra el que calcular parches
+        """
+        previous = self.statuses.get(gameID)
+        self.statuses[gameID] = status
+        return previous
+
+    def store(self, gameID: int, status: GameStatus) -> None:
+        """Guarda como último enviado un estado recibido de otro worker, salvo que ya se tenga uno más nuevo
+
+        Args:
+            gameID (int): ID del juego
+            status (GameStatus): Estado enviado
+        """
+        previous = self.statuses.get(gameID)
+        if previous is None or previous.version <= status.version:
+            self.statuses[gameID] = status
+
+    def current(self, gameID: int, status: GameStatus) -> GameStatus:
+        """Guarda un estado que se envía completo, para calcular los próximos parches a partir de él
+
+        Args:
+            gameID (int): ID del juego
+            status (GameStatus): Estado a enviar
+        """
+        self.store(gameID, status)
+        return status
+
+    def discard(self, gameID: int) -> None:
+        self.statuses.pop(gameID, None)
+
+
+game_status_history = GameStatusHistory()
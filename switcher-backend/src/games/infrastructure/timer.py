@@ -0,0 +1,149 @@
+import asyncio
+import datetime
+import heapq
+import itertools
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from src.database import AsyncRepository, SessionLocal, SQLAlchemyUnitOfWork, run_db
+from src.games.application.service import GameService
+from src.games.domain.repository import TurnScheduler
+from src.games.infrastructure.repository import WebSocketRepository as GameRepository
+from src.players.infrastructure.repository import SQLAlchemyRepository as PlayerRepository
+from src.rooms.infrastructure.repository import WebSocketRepository as RoomRepository
+
+
+class TurnTimerService(TurnScheduler):
+    """Temporizador de turnos de todas las partidas del proceso.
+    Guarda los vencimientos (en tiempo monótono) en un heap y mantiene un único callback del event loop
+    programado para el más próximo, por lo que no consume CPU ni consultas entre vencimientos.
+    Reprogramar o cancelar el turno de una partida invalida su entrada anterior del heap.
+    """
+
+    heap: List[Tuple[float, int, int]]
+    deadlines: Dict[int, Tuple[float, int]]
+
+    def __init__(self, on_expire: Callable[[int], Awaitable[None]]):
+        self.on_expire = on_expire
+        self.heap = []
+        self.deadlines = {}
+        self.sequence = itertools.count()
+        self.handle: Optional[asyncio.TimerHandle] = None
+        self.handle_deadline: Optional[float] = None
+        self.handle_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def clean_up(self):
+        """Cancela todos los temporizadores"""
+        self.heap.clear()
+        self.deadlines.clear()
+        self._disarm()
+
+    def schedule(self, gameID: int, seconds: float) -> None:
+        """Programa el fin del turno actual de la partida, reemplazando el anterior
+
+        Args:
+            gameID (int): ID del juego
+            seconds (float): Segundos hasta que termine el turno
+        """
+        deadline = time.monotonic() + seconds
+        sequence = next(self.sequence)
+        self.deadlines[gameID] = (deadline, sequence)
+        heapq.heappush(self.heap, (deadline, sequence, gameID))
+        self._arm(asyncio.get_running_loop())
+
+    def cancel(self, gameID: int) -> None:
+        """Cancela el temporizador de la partida
+
+        Args:
+            gameID (int): ID del juego
+        """
+        self.deadlines.pop(gameID, None)
+        if len(self.heap) > 2 * len(self.deadlines) + 64:
+            self._compact()
+
+    def deadline(self, gameID: int) -> Optional[float]:
+        entry = self.deadlines.get(gameID)
+        return entry[0] if entry is not None else None
+
+    def _is_current(self, entry: Tuple[float, int, int]) -> bool:
+        deadline, sequence, gameID = entry
+        return self.deadlines.get(gameID) == (deadline, sequence)
+
+    def _compact(self) -> None:
+        self.heap = [entry for entry in self.heap if self._is_current(entry)]
+        heapq.heapify(self.heap)
+
+    def _disarm(self) -> None:
+        if self.handle is not None:
+            self.handle.cancel()
+        self.handle = None
+        self.handle_deadline = None
+        self.handle_loop = None
+
+    def _arm(self, loop: asyncio.AbstractEventLoop) -> None:
+        while self.heap and not self._is_current(self.heap[0]):
+            heapq.heappop(self.heap)
+        if not self.heap:
+            self._disarm()
+            return
+
+        deadline = self.heap[0][0]
+        if self.handle_loop is loop and not loop.is_closed() and self.handle_deadline == deadline:
+            return
+        self._disarm()
+        self.handle = loop.call_later(max(0.0, deadline - time.monotonic()), self._expire, loop)
+        self.handle_deadline = deadline
+        self.handle_loop = loop
+
+    def _expire(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.handle = None
+        self.handle_deadline = None
+        now = time.monotonic()
+        while self.heap and self.heap[0][0] <= now:
+            entry = heapq.heappop(self.heap)
+            if self._is_current(entry):
+                gameID = entry[2]
+                del self.deadlines[gameID]
+                loop.create_task(self.on_expire(gameID))
+        self._arm(loop)
+
+
+async def skip_expired_turn(gameID: int) -> None:
+    """Pasa el turno del jugador que lo tiene cuando vence el temporizador.
+    Abre una sesión propia que se cierra al terminar, en lugar de mantener la del request que inició el turno.
+
+    Args:
+        gameID (int): ID del juego
+    """
+    db_session = SessionLocal()
+    try:
+        game_repository = AsyncRepository(GameRepository(db_session))
+        game = await game_repository.get(gameID)
+        if game is None:
+            return
+        # Con varios workers, el turno pudo haberse reiniciado en otro proceso; la base tiene el vencimiento vigente.
+        # También puede faltar poco si el reloj del sistema se atrasó: se vuelve a programar para ese vencimiento
+        deadline = await game_repository.get_current_timestamp_next_turn(gameID)
+        now = datetime.datetime.now()
+        if deadline is not None and deadline > now:
+            turn_timers.schedule(gameID, (deadline - now).total_seconds())
+            return
+        playerID = next(player.playerID for player in game.players if player.position == game.posEnabledToPlay)
+
+        player_repository = AsyncRepository(PlayerRepository(db_session))
+        room_repository = AsyncRepository(RoomRepository(db_session))
+
+        game_service = GameService(
+            game_repository, player_repository, room_repository, turn_timers, SQLAlchemyUnitOfWork(db_session)
+        )
+        await game_service.skip_turn(playerID, gameID, auto=True)
+    except (HTTPException, StopIteration, ValueError):
+        # La partida terminó o cambió mientras vencía el turno
+        pass
+    finally:
+        await run_db(db_session.close)
+
+
+turn_timers = TurnTimerService(skip_expired_turn)
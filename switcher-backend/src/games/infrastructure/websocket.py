@@ -1,26 +1,72 @@
 from enum import Enum
-from typing import Dict, List
+from typing import Any, Awaitable, Callable, List, Optional, Set
 
-from fastapi.websockets import WebSocket, WebSocketDisconnect, WebSocketState
+import orjson
+from fastapi.websockets import WebSocket, WebSocketDisconnect
+
+from src.games.config import CHAT_MAX_MESSAGE_BYTES
+from src.games.infrastructure.chat import ChatRelay
+from src.games.infrastructure.status import GameStatus, game_status_history
+from src.shared.bus import BroadcastBus, InMemoryBus, bus
+from src.shared.websocket import ConnectionHub, encode_frame, heartbeats, outbound_queues
 
 
 class MessageType(str, Enum):
     STATUS = "status"
+    PATCH = "patch"
     END = "end"
     MSG = "msg"
+    MSG_BATCH = "msg_batch"
+    MSG_REJECTED = "msg_rejected"
 
 
 class ConnectionManagerGame:
-    active_connections: Dict[int, Dict[int, WebSocket]]
+    """Conexiones de los jugadores a las partidas en este worker.
+    Los mensajes dirigidos a una partida o a un jugador se publican en el bus, y cada worker los entrega
+    a las conexiones que tiene abiertas.
+    """
+
+    active_connections: ConnectionHub
+    patch_connections: Set[WebSocket]
+    chat_batch_connections: Set[WebSocket]
 
-    def __init__(self):
-        self.active_connections = {}
+    def __init__(self, bus: Optional[BroadcastBus] = None):
+        self.active_connections = ConnectionHub()
+        self.patch_connections = set()
+        self.chat_batch_connections = set()
+        self.chat = ChatRelay(self.broadcast_chat)
+        self.bus = bus if bus is not None else InMemoryBus()
+        self.bus.subscribe("game.broadcast", self.on_broadcast)
+        self.bus.subscribe("game.send", self.on_send)
+        self.bus.subscribe("game.disconnect", self.on_disconnect)
+        self.bus.subscribe("game.status", self.on_status)
+        self.bus.subscribe("game.chat", self.on_chat)
 
     def clean_up(self):
         """Limpia la lista de conexiones activas"""
-        self.active_connections.clear()
+        self.active_connections.clean_up()
+        self.patch_connections.clear()
+        self.chat_batch_connections.clear()
+        self.chat.clean_up()
+
+    def wants_patches(self, playerID: int, gameID: int) -> bool:
+        """Indica si la conexión del jugador recibe parches del estado en lugar del estado completo
 
-    async def connect(self, playerID: int, gameID: int, websocket: WebSocket):
+        Args:
+            playerID (int): ID del jugador
+            gameID (int): ID del juego
+        """
+        return self.active_connections.get(gameID, playerID) in self.patch_connections
+
+    async def connect(
+        self,
+        playerID: int,
+        gameID: int,
+        websocket: WebSocket,
+        patches: bool = False,
+        heartbeat: bool = False,
+        chat_batches: bool = False,
+    ):
         """Acepta la conexión con el cliente y la almacena.
         En caso de que ese jugador ya esté conectado a ese juego, se cierra la conexión anterior.
 
@@ -28,47 +74,84 @@ class ConnectionManagerGame:
             playerID (int): ID del jugador
             gameID (int): ID del juego
             websocket (WebSocket): Conexión con el cliente
+            patches (bool): Si el cliente recibe parches versionados del estado
+            heartbeat (bool): Si el cliente responde a los pings del servidor
+            chat_batches (bool): Si el cliente recibe juntos, en un mensaje msg_batch, los mensajes de chat de una
+                misma vuelta del event loop
         """
         await websocket.accept()
-        if gameID in self.active_connections:
-            if playerID in self.active_connections[gameID]:
-                await self.active_connections[gameID][playerID].close(4005, "Conexión abierta en otra pestaña")
-        if gameID not in self.active_connections:
-            self.active_connections[gameID] = {}
-        self.active_connections[gameID][playerID] = websocket
-
-    async def keep_listening(self, websocket: WebSocket, gameID: int):
+        outbound_queues.open(websocket)
+        previous = self.active_connections.subscribe(gameID, websocket, playerID)
+        if previous is not None:
+            self.patch_connections.discard(previous)
+            self.chat_batch_connections.discard(previous)
+            heartbeats.untrack(previous)
+            await outbound_queues.close(previous, 4005, "Conexión abierta en otra pestaña")
+        if patches:
+            self.patch_connections.add(websocket)
+        if heartbeat:
+            heartbeats.track(websocket)
+        if chat_batches:
+            self.chat_batch_connections.add(websocket)
+
+    async def keep_listening(
+        self, websocket: WebSocket, gameID: int, snapshot: Optional[Callable[[], Awaitable[dict]]] = None
+    ):
         """Mantiene la conexión abierta con el cliente por tiempo indefinido
 
         Args:
             websocket (WebSocket): Conexión con el cliente
+            gameID (int): ID del juego
+            snapshot (Optional[Callable[[], Awaitable[dict]]]): Construye el estado completo que pide el cliente
+                al detectar un salto de versión
         """
         try:
             while True:
-                data = await websocket.receive_json()
-                if data["type"] == "msg":
-                    await self.broadcast(MessageType.MSG, data["payload"], gameID)
+                text = await heartbeats.receive(websocket, websocket.receive_text)
+                if len(text) > CHAT_MAX_MESSAGE_BYTES or len(text.encode()) > CHAT_MAX_MESSAGE_BYTES:
+                    await self.send_personal_message(MessageType.MSG_REJECTED, {"reason": "too_large"}, websocket)
+                    continue
+                try:
+                    data = orjson.loads(text)
+                except orjson.JSONDecodeError:
+                    data = None
+                type = data.get("type") if isinstance(data, dict) else None
 
-        except WebSocketDisconnect:
-            await self.disconnect(websocket)
+                if type == "msg":
+                    reason = self.chat.submit(websocket, gameID, data.get("payload"))
+                    if reason is not None:
+                        await self.send_personal_message(MessageType.MSG_REJECTED, {"reason": reason}, websocket)
+                elif type == "snapshot" and snapshot is not None:
+                    await self.send_personal_message(MessageType.STATUS, await snapshot(), websocket)
+                elif type is None:
+                    await self.send_personal_message(MessageType.MSG_REJECTED, {"reason": "invalid"}, websocket)
 
-    async def disconnect(self, websocket: WebSocket):
+        except WebSocketDisconnect as e:
+            await self.disconnect(websocket, e.code, e.reason)
+
+    async def disconnect(self, websocket: WebSocket, code: int = 1000, reason: Optional[str] = None):
         """Remueve al cliente de la lista de conexiones activas y cierra la conexión en caso de que no esté cerrada
 
+        Args:
+            websocket (WebSocket): Conexión con el cliente
+            code (int): Código de cierre
+            reason (Optional[str]): Motivo del cierre
+        """
+        await outbound_queues.close(websocket, code, reason)
+        self.forget(websocket)
+
+    def forget(self, websocket: WebSocket):
+        """Quita la conexión de todos los registros, descartando los mensajes pendientes
+
         Args:
             websocket (WebSocket): Conexión con el cliente
         """
-        if websocket.client_state != WebSocketState.DISCONNECTED:
-            await websocket.close()
-        active_connections = self.active_connections.copy()
-        for gameID in active_connections:
-            if websocket in active_connections[gameID].values():
-                playerID = list(active_connections[gameID].keys())[
-                    list(active_connections[gameID].values()).index(websocket)
-                ]
-                self.active_connections[gameID].pop(playerID)
-                if not self.active_connections[gameID]:
-                    self.active_connections.pop(gameID)
+        outbound_queues.discard(websocket)
+        self.patch_connections.discard(websocket)
+        self.chat_batch_connections.discard(websocket)
+        heartbeats.untrack(websocket)
+        self.chat.forget(websocket)
+        self.active_connections.unsubscribe(websocket)
 
     async def disconnect_by_id(self, playerID: int, gameID: int):
         """Remueve al cliente de la lista de conexiones activas y cierra la conexión en caso de que no esté cerrada
@@ -77,14 +160,12 @@ class ConnectionManagerGame:
             playerID (int): ID del jugador
             gameID (int): ID del juego
         """
-        if gameID in self.active_connections:
-            if playerID in self.active_connections[gameID]:
-                websocket = self.active_connections[gameID][playerID]
-                if websocket.client_state != WebSocketState.DISCONNECTED:
-                    await websocket.close()
-                self.active_connections[gameID].pop(playerID)
-                if not self.active_connections[gameID]:
-                    self.active_connections.pop(gameID)
+        await self.bus.publish("game.disconnect", {"playerID": playerID, "gameID": gameID})
+
+    async def on_disconnect(self, message: dict):
+        websocket = self.active_connections.get(message["gameID"], message["playerID"])
+        if websocket is not None:
+            await self.disconnect(websocket)
 
     async def send_personal_message(self, type: MessageType, payload: str, websocket: WebSocket):
         """Envía un mensaje personalizado al cliente
@@ -94,8 +175,8 @@ class ConnectionManagerGame:
             payload (str): Cuerpo del mensaje
             websocket (WebSocket): Conexión con el cliente
         """
-        message = {"type": type, "payload": payload}
-        await websocket.send_json(message)
+        frame = encode_frame(type, payload)
+        outbound_queues.send(websocket, frame)
 
     async def send_personal_message_by_id(self, type: MessageType, payload: str, playerID: int, gameID: int):
         """Envía un mensaje personalizado al cliente
@@ -106,10 +187,12 @@ class ConnectionManagerGame:
             playerID (int): ID del jugador
             gameID (int): ID del juego
         """
-        message = {"type": type, "payload": payload}
-        if gameID in self.active_connections:
-            if playerID in self.active_connections[gameID]:
-                await self.active_connections[gameID][playerID].send_json(message)
+        await self.bus.publish("game.send", {"type": type, "payload": payload, "playerID": playerID, "gameID": gameID})
+
+    async def on_send(self, message: dict):
+        websocket = self.active_connections.get(message["gameID"], message["playerID"])
+        if websocket is not None:
+            outbound_queues.send(websocket, encode_frame(message["type"], message["payload"]))
 
     async def broadcast(self, type: MessageType, payload: dict, gameID: int):
         """Envía un mensaje a todos los clientes conectados al juego
@@ -119,10 +202,79 @@ class ConnectionManagerGame:
             payload (dict): Cuerpo del mensaje
             gameID (int): ID del juego
         """
-        message = {"type": type, "payload": payload}
-        if gameID in self.active_connections:
-            for connection in self.active_connections[gameID].values():
-                await connection.send_json(message)
+        await self.bus.publish("game.broadcast", {"type": type, "payload": payload, "gameID": gameID})
+
+    async def broadcast_chat(self, gameID: int, messages: List[Any]):
+        """Publica juntos los mensajes de chat aceptados en una vuelta del event loop.
+        Los clientes que lo pidieron los reciben en un único mensaje msg_batch; el resto, un mensaje msg por cada uno.
+
+        Args:
+            gameID (int): ID del juego
+            messages (List[Any]): Mensajes aceptados, en orden de llegada
+        """
+        await self.bus.publish("game.chat", {"gameID": gameID, "messages": messages})
+
+    async def on_chat(self, message: dict):
+        connections = self.active_connections.members(message["gameID"])
+        if not connections:
+            return
+        messages = message["messages"]
+        frames = [encode_frame(MessageType.MSG, payload) for payload in messages]
+        batch_frame = encode_frame(MessageType.MSG_BATCH, messages) if len(messages) > 1 else None
+        for connection in connections:
+            if batch_frame is not None and connection in self.chat_batch_connections:
+                outbound_queues.send(connection, batch_frame)
+                continue
+            for frame in frames:
+                outbound_queues.send(connection, frame)
+
+    async def on_broadcast(self, message: dict):
+        connections = self.active_connections.members(message["gameID"])
+        if connections:
+            frame = encode_frame(message["type"], message["payload"])
+            for connection in connections:
+                outbound_queues.send(connection, frame)
+
+    async def broadcast_status(self, gameID: int, status: GameStatus, previous: Optional[GameStatus]):
+        """Envía el estado de la partida a cada jugador, con su propia mano.
+        Los clientes que lo pidieron reciben solo un parche respecto al último estado enviado.
+
+        Args:
+            gameID (int): ID del juego
+            status (GameStatus): Estado actual
+            previous (Optional[GameStatus]): Último estado enviado, o None si no hay uno contra el que calcular
+                parches
+        """
+        await self.bus.publish(
+            "game.status",
+            {
+                "gameID": gameID,
+                "status": status.to_dict(),
+                "previous": previous.to_dict() if previous is not None else None,
+                "origin": self.bus.origin,
+            },
+        )
+
+    async def on_status(self, message: dict):
+        gameID = message["gameID"]
+        status = GameStatus.from_dict(message["status"])
+        previous = GameStatus.from_dict(message["previous"]) if message["previous"] is not None else None
+        if message["origin"] != self.bus.origin:
+            # Los snapshots que pidan los clientes de este worker parten del mismo estado
+            game_status_history.store(gameID, status)
+
+        for player in status.base["players"]:
+            playerID = player["playerID"]
+            websocket = self.active_connections.get(gameID, playerID)
+            if websocket is None:
+                continue
+            if websocket not in self.patch_connections:
+                frame = encode_frame(MessageType.STATUS, status.for_player(playerID))
+            elif previous is None:
+                frame = encode_frame(MessageType.STATUS, status.snapshot_for_player(playerID))
+            else:
+                frame = encode_frame(MessageType.PATCH, status.patch_for_player(previous, playerID))
+            outbound_queues.send(websocket, frame)
 
 
-ws_manager_game = ConnectionManagerGame()
+ws_manager_game = ConnectionManagerGame(bus)
@@ -0,0 +1,49 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.database import AsyncRepository
+
+
+class SlowRepository:
+    def __init__(self):
+        self.threads = []
+
+    def get(self, gameID):
+        self.threads.append(threading.current_thread().name)
+        time.sleep(0.2)
+        return gameID
+
+    async def broadcast_status_game(self, gameID):
+        self.threads.append(threading.current_thread().name)
+        return gameID
+
+
+@pytest.mark.asyncio
+async def test_event_loop_not_blocked_by_repository_call():
+    repository = SlowRepository()
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(ticker())
+    result = await AsyncRepository(repository).get(1)
+    task.cancel()
+
+    assert result == 1
+    assert ticks >= 10
+    assert repository.threads[0].startswith("database")
+
+
+@pytest.mark.asyncio
+async def test_async_methods_run_on_event_loop():
+    repository = SlowRepository()
+
+    assert await AsyncRepository(repository).broadcast_status_game(1) == 1
+    assert repository.threads == [threading.current_thread().name]
@@ -0,0 +1,132 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+
+from src.games.infrastructure.cache import GameStateCache
+from src.games.test.test_ws_fanout import FakeWebSocket, settle
+from src.rooms.infrastructure.websocket import ConnectionManagerRoom
+from src.shared.broker import Broker
+from src.shared.bus import UnixSocketBus
+from src.shared.websocket import outbound_queues
+
+
+@pytest_asyncio.fixture
+async def buses(tmp_path):
+    path = str(tmp_path / "bus.sock")
+    broker = Broker()
+    server = await broker.serve(path)
+    workers = [UnixSocketBus(path), UnixSocketBus(path)]
+    for worker in workers:
+        await worker.start()
+    yield workers
+    for worker in workers:
+        await worker.stop()
+    await wait_for(lambda: not broker.writers)
+    server.close()
+    await server.wait_closed()
+    outbound_queues.clean_up()
+
+
+async def wait_for(condition, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+    await settle()
+
+
+@pytest.mark.asyncio
+async def test_broadcast_reaches_connections_of_other_worker(buses):
+    first, second = ConnectionManagerRoom(buses[0]), ConnectionManagerRoom(buses[1])
+    local, remote = FakeWebSocket(), FakeWebSocket()
+    outbound_queues.open(local)
+    outbound_queues.open(remote)
+    first.active_connections.subscribe(1, local, 1)
+    second.active_connections.subscribe(1, remote, 2)
+
+    for number in range(5):
+        await first.broadcast("status", number, 1)
+    await first.send_personal_message_by_id("personal", "solo", 2, 1)
+
+    await wait_for(lambda: len(remote.sent) == 6)
+    assert remote.sent == [{"type": "status", "payload": number} for number in range(5)] + [
+        {"type": "personal", "payload": "solo"}
+    ]
+    assert local.sent == [{"type": "status", "payload": number} for number in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_commit_invalidates_game_state_in_other_worker(buses):
+    writer, reader = GameStateCache(bus=buses[0]), GameStateCache(bus=buses[1])
+    writer.entries[1] = SimpleNamespace(roomID=10, stale=False)
+    reader.entries[1] = SimpleNamespace(roomID=10, stale=False)
+    reader.entries[2] = SimpleNamespace(roomID=20, stale=False)
+
+    session = SimpleNamespace(info={"game_states_written": {"games": {1}, "rooms": set()}})
+    writer.on_commit(session)
+
+    await wait_for(lambda: reader.entries[1].stale)
+    assert not writer.entries[1].stale
+    assert not reader.entries[2].stale
+
+
+@pytest.mark.asyncio
+async def test_bad_messages_do_not_stop_delivery(buses):
+    publisher, subscriber = buses
+    received = []
+
+    async def fail(message):
+        raise RuntimeError("handler roto")
+
+    async def record(message):
+        received.append(message)
+
+    subscriber.subscribe("fail", fail)
+    subscriber.subscribe("record", record)
+
+    publisher.writer.write(b"no es json\n")
+    await publisher.publish("fail", 1)
+    await publisher.publish("record", 2)
+
+    await wait_for(lambda: received == [2])
+    assert not subscriber.reader_task.done()
+
+
+@pytest.mark.asyncio
+async def test_bus_reconnects_after_broker_restart(tmp_path):
+    path = str(tmp_path / "bus.sock")
+    broker = Broker()
+    server = await broker.serve(path)
+    worker = UnixSocketBus(path, reconnect_delay=0.01)
+    await worker.start()
+    cache = GameStateCache(bus=worker)
+    cache.entries[1] = SimpleNamespace(roomID=10, stale=False)
+    received = []
+
+    async def record(message):
+        received.append(message)
+
+    worker.subscribe("record", record)
+    await wait_for(lambda: broker.writers)
+
+    server.close()
+    for writer in list(broker.writers):
+        writer.close()
+    await server.wait_closed()
+    await wait_for(lambda: worker.writer is None)
+    await worker.publish("record", "perdido")
+
+    broker = Broker()
+    server = await broker.serve(path)
+    await wait_for(lambda: broker.writers)
+    assert cache.entries[1].stale
+
+    await worker.publish("record", "entregado")
+    await wait_for(lambda: received == ["entregado"])
+
+    await worker.stop()
+    await wait_for(lambda: not broker.writers)
+    server.close()
+    await server.wait_closed()
@@ -0,0 +1,65 @@
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from src.games.config import COLORS
+from src.games.domain.figures import BOARD_CELLS, FIGURE_PLACEMENTS, FigureIndex, border_is_valid, find_figures
+from src.games.infrastructure.figure_index import FigureIndexRegistry
+
+boards = st.permutations(COLORS * 9)
+swaps = st.lists(
+    st.tuples(st.integers(0, BOARD_CELLS - 1), st.integers(0, BOARD_CELLS - 1)),
+    max_size=30,
+)
+
+
+@settings(max_examples=200, deadline=None)
+@given(board=boards, swap_sequence=swaps)
+def test_incremental_figures_match_full_scan(board, swap_sequence):
+    colors = list(board)
+    figure_index = FigureIndex(colors)
+
+    for first, second in swap_sequence:
+        colors[first], colors[second] = colors[second], colors[first]
+        figure_index.swap(first, second)
+
+        assert figure_index.board == "".join(colors)
+        for prohibited_color in [None, *COLORS]:
+            assert figure_index.figures(prohibited_color) == find_figures(colors, prohibited_color)
+
+
+@settings(max_examples=50, deadline=None)
+@given(board=boards, swap_sequence=swaps)
+def test_undo_restores_figures(board, swap_sequence):
+    figure_index = FigureIndex(board)
+    expected = figure_index.figures()
+
+    for first, second in swap_sequence:
+        figure_index.swap(first, second)
+    for first, second in reversed(swap_sequence):
+        figure_index.swap(first, second)
+
+    assert figure_index.board == "".join(board)
+    assert figure_index.figures() == expected
+
+
+def test_registry_rebuilds_stale_index():
+    registry = FigureIndexRegistry()
+    board = "".join(COLORS * 9)
+    registry.create(1, board)
+
+    other_board = board[::-1]
+    registry.swap(1, other_board, 0, 1)
+    assert 1 not in registry.indexes
+
+    assert registry.get(1, other_board).figures() == find_figures(other_board)
+
+
+@settings(max_examples=100, deadline=None)
+@given(board=boards)
+def test_border_is_valid_agrees_with_placement_borders(board):
+    colors = list(board)
+    for placement in FIGURE_PLACEMENTS:
+        color = colors[(placement.cells & -placement.cells).bit_length() - 1]
+        same_color_border = any(placement.border >> cell & 1 and colors[cell] == color for cell in range(BOARD_CELLS))
+        if all(colors[cell] == color for cell in range(BOARD_CELLS) if placement.cells >> cell & 1):
+            assert border_is_valid(colors, placement.positions) == (not same_color_border)
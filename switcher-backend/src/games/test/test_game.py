@@ -3,6 +3,7 @@ import json
 import pytest
 
 from src.conftest import override_get_db
+from src.games.domain.board import BoardCodec
 from src.games.infrastructure.models import FigureCard as FigureCardDB
 from src.games.infrastructure.models import Game as GameDB
 from src.games.infrastructure.models import MovementCard as MovementCardDB
@@ -228,7 +229,7 @@ def test_skip_turn(client, test_db):
     game = GameDB(
         gameID=1,
         roomID=room.roomID,
-        board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)]),
+        board="R" * 36,
         posEnabledToPlay=1,
     )
 
@@ -263,7 +264,7 @@ def test_skip_turn_ws(client, test_db):
     game = GameDB(
         gameID=1,
         roomID=room.roomID,
-        board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)]),
+        board="R" * 36,
         posEnabledToPlay=1,
     )
 
@@ -307,7 +308,7 @@ def test_skip_turn_not_player_in_game(client, test_db):
     game = GameDB(
         gameID=1,
         roomID=room.roomID,
-        board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)]),
+        board="R" * 36,
         posEnabledToPlay=1,
     )
 
@@ -341,7 +342,7 @@ def test_skip_turn_not_player_turn(client, test_db):
     game = GameDB(
         gameID=1,
         roomID=room.roomID,
-        board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)]),
+        board="R" * 36,
         posEnabledToPlay=2,
     )
 
@@ -376,7 +377,7 @@ def test_skip_turn_not_game_exists(client, test_db):
     game = GameDB(
         gameID=1,
         roomID=room.roomID,
-        board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)]),
+        board="R" * 36,
         posEnabledToPlay=2,
     )
 
@@ -410,7 +411,7 @@ def test_skip_turn_not_player_exists(client, test_db):
     game = GameDB(
         gameID=1,
         roomID=room.roomID,
-        board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)]),
+        board="R" * 36,
         posEnabledToPlay=2,
     )
 
@@ -444,7 +445,7 @@ def test_skip_turn_not_game_started(client, test_db):
     game = GameDB(
         gameID=1,
         roomID=room.roomID,
-        board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)]),
+        board="R" * 36,
         posEnabledToPlay=2,
     )
 
@@ -478,7 +479,7 @@ def test_skip_turn_full_round(client, test_db):
     game = GameDB(
         gameID=1,
         roomID=room.roomID,
-        board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)]),
+        board="R" * 36,
         posEnabledToPlay=1,
     )
 
@@ -521,7 +522,7 @@ def test_skip_turn_give_cards_figure(client, test_db):
             RoomDB(roomID=1, roomName="test room", minPlayers=2, maxPlayers=4, hostID=1),
             PlayerRoomDB(playerID=1, roomID=1, position=1),
             PlayerRoomDB(playerID=2, roomID=1, position=2),
-            GameDB(roomID=1, board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)])),
+            GameDB(roomID=1, board="R" * 36),
         ]
     )
 
@@ -556,7 +557,7 @@ def test_skip_turn_not_give_cards_figure_because_player_has_blocked_cards(client
             RoomDB(roomID=1, roomName="test room", minPlayers=2, maxPlayers=4, hostID=1),
             PlayerRoomDB(playerID=1, roomID=1, position=1),
             PlayerRoomDB(playerID=2, roomID=1, position=2),
-            GameDB(roomID=1, board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)])),
+            GameDB(roomID=1, board="R" * 36),
         ]
     )
 
@@ -594,7 +595,7 @@ def test_skip_can_give_less_than_3_cards_figure(client, test_db):
             RoomDB(roomID=1, roomName="test room", minPlayers=2, maxPlayers=4, hostID=1),
             PlayerRoomDB(playerID=1, roomID=1, position=1),
             PlayerRoomDB(playerID=2, roomID=1, position=2),
-            GameDB(roomID=1, board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)])),
+            GameDB(roomID=1, board="R" * 36),
         ]
     )
 
@@ -626,7 +627,7 @@ def test_skip_turn_give_cards_movement(client, test_db):
             RoomDB(roomID=1, roomName="test room", minPlayers=2, maxPlayers=4, hostID=1),
             PlayerRoomDB(playerID=1, roomID=1, position=1),
             PlayerRoomDB(playerID=2, roomID=1, position=2),
-            GameDB(roomID=1, board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)])),
+            GameDB(roomID=1, board="R" * 36),
         ]
     )
 
@@ -661,7 +662,7 @@ def test_skip_turn_give_cards_movement_rebuild_deck(client, test_db):
             RoomDB(roomID=1, roomName="test room", minPlayers=2, maxPlayers=4, hostID=1),
             PlayerRoomDB(playerID=1, roomID=1, position=1),
             PlayerRoomDB(playerID=2, roomID=1, position=2),
-            GameDB(roomID=1, board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)])),
+            GameDB(roomID=1, board="R" * 36),
         ]
     )
 
@@ -739,7 +740,7 @@ def test_create_game_board(client, test_db):
     response = client.post(f"/games/{room.roomID}", json={"playerID": players[0].playerID})
 
     game = db.get(GameDB, 1)
-    board = json.loads(game.board)
+    board = BoardCodec.decode(game.board)
 
     color_count = {}
     for cell in board:
@@ -806,7 +807,7 @@ def test_play__correct_mov1_card(client, test_db):
             PlayerRoomDB(playerID=2, roomID=1, position=2),
             GameDB(
                 roomID=1,
-                board=json.dumps(
+                board=BoardCodec.encode(
                     [
                         {
                             "posX": x,
@@ -825,7 +826,7 @@ def test_play__correct_mov1_card(client, test_db):
     db.commit()
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 0 and item["posY"] == 0)
     destination = next(item for item in board if item["posX"] == 2 and item["posY"] == 2)
     assert origin["color"] == "R"
@@ -838,7 +839,7 @@ def test_play__correct_mov1_card(client, test_db):
     assert response.status_code == 201
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 0 and item["posY"] == 0)
     destination = next(item for item in board if item["posX"] == 2 and item["posY"] == 2)
     assert origin["color"] == "B"
@@ -856,7 +857,7 @@ def test_play__incorrect_mov1_card(client, test_db):
             PlayerRoomDB(playerID=2, roomID=1, position=2),
             GameDB(
                 roomID=1,
-                board=json.dumps(
+                board=BoardCodec.encode(
                     [
                         {
                             "posX": x,
@@ -875,7 +876,7 @@ def test_play__incorrect_mov1_card(client, test_db):
     db.commit()
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 0 and item["posY"] == 0)
     destination = next(item for item in board if item["posX"] == 2 and item["posY"] == 2)
     assert origin["color"] == "R"
@@ -889,7 +890,7 @@ def test_play__incorrect_mov1_card(client, test_db):
     assert response.json() == {"detail": "Movimiento inválido."}
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 0 and item["posY"] == 0)
     destination = next(item for item in board if item["posX"] == 2 and item["posY"] == 2)
     assert origin["color"] == "R"
@@ -907,7 +908,7 @@ def test_play_correct_mov2_card(client, test_db):
             PlayerRoomDB(playerID=2, roomID=1, position=2),
             GameDB(
                 roomID=1,
-                board=json.dumps(
+                board=BoardCodec.encode(
                     [
                         {
                             "posX": x,
@@ -926,7 +927,7 @@ def test_play_correct_mov2_card(client, test_db):
     db.commit()
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 0 and item["posY"] == 0)
     destination = next(item for item in board if item["posX"] == 0 and item["posY"] == 2)
     assert origin["color"] == "R"
@@ -939,7 +940,7 @@ def test_play_correct_mov2_card(client, test_db):
     assert response.status_code == 201
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 0 and item["posY"] == 0)
     destination = next(item for item in board if item["posX"] == 0 and item["posY"] == 2)
     assert origin["color"] == "B"
@@ -957,7 +958,7 @@ def test_play_incorrect_mov2_card(client, test_db):
             PlayerRoomDB(playerID=2, roomID=1, position=2),
             GameDB(
                 roomID=1,
-                board=json.dumps(
+                board=BoardCodec.encode(
                     [
                         {
                             "posX": x,
@@ -976,7 +977,7 @@ def test_play_incorrect_mov2_card(client, test_db):
     db.commit()
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 0 and item["posY"] == 0)
     destination = next(item for item in board if item["posX"] == 0 and item["posY"] == 2)
     assert origin["color"] == "R"
@@ -990,7 +991,7 @@ def test_play_incorrect_mov2_card(client, test_db):
     assert response.json() == {"detail": "Movimiento inválido."}
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 0 and item["posY"] == 0)
     destination = next(item for item in board if item["posX"] == 0 and item["posY"] == 2)
     assert origin["color"] == "R"
@@ -1008,7 +1009,7 @@ def test_play_correct_mov3_card(client, test_db):
             PlayerRoomDB(playerID=2, roomID=1, position=2),
             GameDB(
                 roomID=1,
-                board=json.dumps(
+                board=BoardCodec.encode(
                     [
                         {
                             "posX": x,
@@ -1026,7 +1027,7 @@ def test_play_correct_mov3_card(client, test_db):
     db.commit()
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 0 and item["posY"] == 0)
     destination = next(item for item in board if item["posX"] == 0 and item["posY"] == 1)
     assert origin["color"] == "R"
@@ -1039,7 +1040,7 @@ def test_play_correct_mov3_card(client, test_db):
     assert response.status_code == 201
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 0 and item["posY"] == 0)
     destination = next(item for item in board if item["posX"] == 0 and item["posY"] == 1)
     assert origin["color"] == "B"
@@ -1057,7 +1058,7 @@ def test_play_incorrect_mov3_card(client, test_db):
             PlayerRoomDB(playerID=2, roomID=1, position=2),
             GameDB(
                 roomID=1,
-                board=json.dumps(
+                board=BoardCodec.encode(
                     [
                         {
                             "posX": x,
@@ -1075,7 +1076,7 @@ def test_play_incorrect_mov3_card(client, test_db):
     db.commit()
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 0 and item["posY"] == 0)
     destination = next(item for item in board if item["posX"] == 0 and item["posY"] == 1)
     assert origin["color"] == "R"
@@ -1089,7 +1090,7 @@ def test_play_incorrect_mov3_card(client, test_db):
     assert response.json() == {"detail": "Movimiento inválido."}
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 0 and item["posY"] == 0)
     destination = next(item for item in board if item["posX"] == 0 and item["posY"] == 1)
     assert origin["color"] == "R"
@@ -1107,7 +1108,7 @@ def test_play_correct_mov4_card(client, test_db):
             PlayerRoomDB(playerID=2, roomID=1, position=2),
             GameDB(
                 roomID=1,
-                board=json.dumps(
+                board=BoardCodec.encode(
                     [
                         {
                             "posX": x,
@@ -1125,7 +1126,7 @@ def test_play_correct_mov4_card(client, test_db):
     db.commit()
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 0 and item["posY"] == 0)
     destination = next(item for item in board if item["posX"] == 1 and item["posY"] == 1)
     assert origin["color"] == "R"
@@ -1138,7 +1139,7 @@ def test_play_correct_mov4_card(client, test_db):
     assert response.status_code == 201
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 0 and item["posY"] == 0)
     destination = next(item for item in board if item["posX"] == 1 and item["posY"] == 1)
     assert origin["color"] == "B"
@@ -1156,7 +1157,7 @@ def test_play_incorrect_mov4_card(client, test_db):
             PlayerRoomDB(playerID=2, roomID=1, position=2),
             GameDB(
                 roomID=1,
-                board=json.dumps(
+                board=BoardCodec.encode(
                     [
                         {
                             "posX": x,
@@ -1174,7 +1175,7 @@ def test_play_incorrect_mov4_card(client, test_db):
     db.commit()
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 0 and item["posY"] == 0)
     destination = next(item for item in board if item["posX"] == 1 and item["posY"] == 1)
     assert origin["color"] == "R"
@@ -1188,7 +1189,7 @@ def test_play_incorrect_mov4_card(client, test_db):
     assert response.json() == {"detail": "Movimiento inválido."}
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 0 and item["posY"] == 0)
     destination = next(item for item in board if item["posX"] == 1 and item["posY"] == 1)
     assert origin["color"] == "R"
@@ -1206,7 +1207,7 @@ def test_play_correct_mov5_card_down(client, test_db):
             PlayerRoomDB(playerID=2, roomID=1, position=2),
             GameDB(
                 roomID=1,
-                board=json.dumps(
+                board=BoardCodec.encode(
                     [
                         {
                             "posX": x,
@@ -1224,7 +1225,7 @@ def test_play_correct_mov5_card_down(client, test_db):
     db.commit()
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 0 and item["posY"] == 2)
     destination = next(item for item in board if item["posX"] == 2 and item["posY"] == 1)
     assert origin["color"] == "R"
@@ -1237,7 +1238,7 @@ def test_play_correct_mov5_card_down(client, test_db):
     assert response.status_code == 201
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 0 and item["posY"] == 2)
     destination = next(item for item in board if item["posX"] == 2 and item["posY"] == 1)
     assert origin["color"] == "B"
@@ -1255,7 +1256,7 @@ def test_play_correct_mov5_card_up(client, test_db):
             PlayerRoomDB(playerID=2, roomID=1, position=2),
             GameDB(
                 roomID=1,
-                board=json.dumps(
+                board=BoardCodec.encode(
                     [
                         {
                             "posX": x,
@@ -1273,7 +1274,7 @@ def test_play_correct_mov5_card_up(client, test_db):
     db.commit()
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 2 and item["posY"] == 1)
     destination = next(item for item in board if item["posX"] == 0 and item["posY"] == 2)
     assert origin["color"] == "R"
@@ -1286,7 +1287,7 @@ def test_play_correct_mov5_card_up(client, test_db):
     assert response.status_code == 201
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 2 and item["posY"] == 1)
     destination = next(item for item in board if item["posX"] == 0 and item["posY"] == 2)
     assert origin["color"] == "B"
@@ -1304,7 +1305,7 @@ def test_play_correct_mov6_card_up(client, test_db):
             PlayerRoomDB(playerID=2, roomID=1, position=2),
             GameDB(
                 roomID=1,
-                board=json.dumps(
+                board=BoardCodec.encode(
                     [
                         {
                             "posX": x,
@@ -1322,7 +1323,7 @@ def test_play_correct_mov6_card_up(client, test_db):
     db.commit()
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 2 and item["posY"] == 1)
     destination = next(item for item in board if item["posX"] == 0 and item["posY"] == 0)
     assert origin["color"] == "R"
@@ -1335,7 +1336,7 @@ def test_play_correct_mov6_card_up(client, test_db):
     assert response.status_code == 201
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 2 and item["posY"] == 1)
     destination = next(item for item in board if item["posX"] == 0 and item["posY"] == 0)
     assert origin["color"] == "B"
@@ -1353,7 +1354,7 @@ def test_play_correct_mov6_card_down(client, test_db):
             PlayerRoomDB(playerID=2, roomID=1, position=2),
             GameDB(
                 roomID=1,
-                board=json.dumps(
+                board=BoardCodec.encode(
                     [
                         {
                             "posX": x,
@@ -1371,7 +1372,7 @@ def test_play_correct_mov6_card_down(client, test_db):
     db.commit()
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 0 and item["posY"] == 0)
     destination = next(item for item in board if item["posX"] == 2 and item["posY"] == 1)
     assert origin["color"] == "R"
@@ -1384,7 +1385,7 @@ def test_play_correct_mov6_card_down(client, test_db):
     assert response.status_code == 201
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 0 and item["posY"] == 0)
     destination = next(item for item in board if item["posX"] == 2 and item["posY"] == 1)
     assert origin["color"] == "B"
@@ -1402,7 +1403,7 @@ def test_play_correct_mov7_card(client, test_db):
             PlayerRoomDB(playerID=2, roomID=1, position=2),
             GameDB(
                 roomID=1,
-                board=json.dumps(
+                board=BoardCodec.encode(
                     [
                         {
                             "posX": x,
@@ -1420,7 +1421,7 @@ def test_play_correct_mov7_card(client, test_db):
     db.commit()
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 3 and item["posY"] == 1)
     destination = next(item for item in board if item["posX"] == 0 and item["posY"] == 1)
     assert origin["color"] == "R"
@@ -1433,7 +1434,7 @@ def test_play_correct_mov7_card(client, test_db):
     assert response.status_code == 201
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posX"] == 3 and item["posY"] == 1)
     destination = next(item for item in board if item["posX"] == 0 and item["posY"] == 1)
     assert origin["color"] == "B"
@@ -1451,7 +1452,7 @@ def test_player_did_not_has_movement_card(client, test_db):
             PlayerRoomDB(playerID=2, roomID=1, position=2),
             GameDB(
                 roomID=1,
-                board=json.dumps(
+                board=BoardCodec.encode(
                     [
                         {
                             "posX": x,
@@ -1488,7 +1489,7 @@ def test_play_horizontal_mov06(client, test_db):
             PlayerRoomDB(playerID=2, roomID=1, position=2),
             GameDB(
                 roomID=1,
-                board=json.dumps(
+                board=BoardCodec.encode(
                     [
                         {
                             "posX": x,
@@ -1506,7 +1507,7 @@ def test_play_horizontal_mov06(client, test_db):
     db.commit()
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posY"] == 1 and item["posX"] == 0)
     destination = next(item for item in board if item["posY"] == 2 and item["posX"] == 2)
     assert origin["color"] == "R"
@@ -1519,7 +1520,7 @@ def test_play_horizontal_mov06(client, test_db):
     assert response.status_code == 201
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posY"] == 1 and item["posX"] == 0)
     destination = next(item for item in board if item["posY"] == 2 and item["posX"] == 2)
     assert origin["color"] == "B"
@@ -1537,7 +1538,7 @@ def test_play_horizontal_mov05(client, test_db):
             PlayerRoomDB(playerID=2, roomID=1, position=2),
             GameDB(
                 roomID=1,
-                board=json.dumps(
+                board=BoardCodec.encode(
                     [
                         {
                             "posX": x,
@@ -1555,7 +1556,7 @@ def test_play_horizontal_mov05(client, test_db):
     db.commit()
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posY"] == 1 and item["posX"] == 0)
     destination = next(item for item in board if item["posY"] == 0 and item["posX"] == 2)
     assert origin["color"] == "R"
@@ -1568,7 +1569,7 @@ def test_play_horizontal_mov05(client, test_db):
     assert response.status_code == 201
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posY"] == 1 and item["posX"] == 0)
     destination = next(item for item in board if item["posY"] == 0 and item["posX"] == 2)
     assert origin["color"] == "B"
@@ -1586,7 +1587,7 @@ def test_cancel_movement(client, test_db):
             PlayerRoomDB(playerID=2, roomID=1, position=2),
             GameDB(
                 roomID=1,
-                board=json.dumps(
+                board=BoardCodec.encode(
                     [
                         {
                             "posX": x,
@@ -1604,7 +1605,7 @@ def test_cancel_movement(client, test_db):
     db.commit()
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posY"] == 1 and item["posX"] == 0)
     destination = next(item for item in board if item["posY"] == 0 and item["posX"] == 2)
     assert origin["color"] == "R"
@@ -1622,5 +1623,45 @@ def test_cancel_movement(client, test_db):
     assert response.status_code == 200
 
     board = db.get(GameDB, 1).board
-    board = json.loads(board)
+    board = BoardCodec.decode(board)
     origin = next(item for item in board if item["posY"] == 1 and item["posX"] == 0)
+
+
+def test_board_codec_swap():
+    board = BoardCodec.encode(
+        [{"posX": x, "posY": y, "color": "R" if (x, y) == (1, 4) else "G"} for x in range(6) for y in range(6)]
+    )
+    assert len(board) == 36
+
+    swapped = BoardCodec.swap(board, 1, 4, 5, 0)
+    assert BoardCodec.color_at(swapped, 1, 4) == "G"
+    assert BoardCodec.color_at(swapped, 5, 0) == "R"
+    assert BoardCodec.swap(swapped, 5, 0, 1, 4) == board
+
+
+def test_migrate_legacy_board(test_db):
+    from sqlalchemy import text
+
+    from src.conftest import engine
+    from src.games.infrastructure.migrations import migrate_board_storage
+
+    legacy_board = [{"posX": x, "posY": y, "color": "RGBY"[(x + y) % 4]} for x in range(6) for y in range(6)]
+    test_db.add_all(
+        [
+            PlayerDB(playerID=1, username="test user"),
+            RoomDB(roomID=1, roomName="test room", minPlayers=2, maxPlayers=4, hostID=1),
+        ]
+    )
+    test_db.commit()
+    test_db.execute(
+        text("INSERT INTO games (gameID, roomID, board) VALUES (1, 1, :board)"),
+        {"board": json.dumps(json.dumps(legacy_board))},
+    )
+    test_db.commit()
+
+    assert migrate_board_storage(engine) == 1
+    assert migrate_board_storage(engine) == 0
+
+    board = test_db.get(GameDB, 1).board
+    assert board == BoardCodec.encode(legacy_board)
+    assert BoardCodec.decode(board) == legacy_board
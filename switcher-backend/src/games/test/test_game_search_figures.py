@@ -1,4 +1,5 @@
 import json
+import random
 from typing import List
 
 import numpy as np
@@ -402,3 +403,66 @@ def test_get_one_figure_prohibited_color(game_logic: SQLAlchemyRepository):
             BoardPiecePosition(posX=5, posY=4),
         ],
     ]
+
+
+def reference_available_figures(prohibited_color: str, board: List[BoardPiece]) -> List[List[BoardPiecePosition]]:
+    """Búsqueda por convolución usada antes de la tabla de ubicaciones"""
+    from scipy.signal import convolve2d
+
+    from src.games.config import COLORS, FIGURE_CARDS_FORM
+
+    board_matrix = np.empty((6, 6), dtype=object)
+    for piece in board:
+        board_matrix[piece.posY][piece.posX] = piece.color
+
+    figures = []
+    seen = set()
+    for color in COLORS:
+        if color == prohibited_color:
+            continue
+        layer = (board_matrix == color).astype(int)
+        for form in FIGURE_CARDS_FORM.values():
+            for k in range(4):
+                shape = np.rot90(form, k)
+                result = convolve2d(layer, shape[::-1, ::-1], mode="valid")
+                for y, x in zip(*np.where(result == shape.sum())):
+                    positions = [
+                        (x + shape_x, y + shape_y)
+                        for shape_y in range(shape.shape[0])
+                        for shape_x in range(shape.shape[1])
+                        if shape[shape_y, shape_x] == 1
+                    ]
+                    position_set = set(positions)
+                    valid = all(
+                        not (0 <= px + dx < 6 and 0 <= py + dy < 6)
+                        or (px + dx, py + dy) in position_set
+                        or layer[py + dy, px + dx] == 0
+                        for px, py in positions
+                        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]
+                    )
+                    if valid and tuple(positions) not in seen:
+                        seen.add(tuple(positions))
+                        figures.append([BoardPiecePosition(posX=px, posY=py) for px, py in positions])
+    return figures
+
+
+def test_placement_table_has_no_duplicates():
+    from src.games.domain.figures import FIGURE_PLACEMENTS
+
+    masks = [placement.cells for placement in FIGURE_PLACEMENTS]
+    assert len(masks) == len(set(masks))
+    assert all(placement.cells & placement.border == 0 for placement in FIGURE_PLACEMENTS)
+
+
+def test_available_figures_matches_reference(game_logic: SQLAlchemyRepository):
+    rng = random.Random(2024)
+    for _ in range(200):
+        colors = [rng.choice(["R", "G", "B", "Y"]) for _ in range(36)]
+        board_pieces = [
+            BoardPiece(posX=i, posY=j, color=colors[i * 6 + j], isPartial=False) for i in range(6) for j in range(6)
+        ]
+        prohibited_color = rng.choice(["R", "G", "B", "Y", None])
+
+        assert game_logic.get_available_figures(prohibited_color, board_pieces) == reference_available_figures(
+            prohibited_color, board_pieces
+        )
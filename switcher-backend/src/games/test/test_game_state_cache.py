@@ -0,0 +1,198 @@
+import json
+
+from sqlalchemy import event, text
+
+from src.conftest import engine, override_get_db
+from src.games.infrastructure.cache import GameStateCache, game_states
+from src.games.infrastructure.models import Game as GameDB
+from src.games.infrastructure.repository import SQLAlchemyRepository
+from src.rooms.infrastructure.models import PlayerRoom as PlayerRoomDB
+from src.shared.bus import UnixSocketBus
+
+
+def test_cached_reads_do_not_query(test_db, game_factory, query_counter):
+    db = next(override_get_db())
+    gameID, playerIDs = game_factory(db)
+    repository = SQLAlchemyRepository(db)
+    repository.get(gameID)
+
+    with query_counter() as counter:
+        game = repository.get(gameID)
+        repository.is_player_turn(playerIDs[0], gameID)
+        repository.get_player_movement_cards(gameID, playerIDs[0])
+        repository.get_color_from_position(gameID, 0, 0)
+
+    assert counter.count == 0
+    assert [player.username for player in game.players] == ["player1", "player2"]
+    assert game.players[0].cardsFigure[0].type == "fig01"
+
+
+def test_players_load_in_two_queries(test_db, game_factory, query_counter):
+    db = next(override_get_db())
+    gameID, playerIDs = game_factory(db, amount_players=4)
+    repository = SQLAlchemyRepository(db)
+    game_states.clean_up()
+
+    with query_counter() as load_counter:
+        game = repository.get(gameID)
+    with query_counter() as skip_counter:
+        repository.skip(gameID)
+        active_players = repository.get_active_players(gameID)
+
+    assert load_counter.count <= 2
+    # Lectura de la fila de la partida, UPDATE del turno y UPDATE de la versión de la partida
+    assert skip_counter.count <= 3
+    assert [player.playerID for player in game.players] == playerIDs
+    assert all(player.sizeDeckFigure == 1 and len(player.cardsFigure) == 1 for player in game.players)
+    assert len(active_players) == 4
+    assert repository.is_player_in_game(playerIDs[3], gameID)
+
+
+def test_write_through_updates_state(test_db, game_factory):
+    db = next(override_get_db())
+    gameID, playerIDs = game_factory(db)
+    repository = SQLAlchemyRepository(db)
+    cardID = repository.get_player_movement_cards(gameID, playerIDs[0])[0].cardID
+    version = game_states.get(db, gameID).version
+
+    repository.play_movement(gameID, cardID, 0, 0, 0, 1)
+
+    state = game_states.get(db, gameID)
+    assert state.version == version + 1
+    assert not state.stale
+    assert state.board == db.get(GameDB, gameID).board
+    assert repository.is_piece_partial(gameID, 0, 1)
+    assert repository.was_card_used_in_partial_movement(gameID, cardID)
+
+
+def test_external_write_invalidates_state(test_db, game_factory):
+    db = next(override_get_db())
+    gameID, playerIDs = game_factory(db)
+    repository = SQLAlchemyRepository(db)
+    assert repository.get_current_turn(gameID) == 1
+
+    other_db = next(override_get_db())
+    other_db.get(GameDB, gameID).posEnabledToPlay = 2
+    other_db.query(PlayerRoomDB).filter(PlayerRoomDB.playerID == playerIDs[1]).update({"isActive": False})
+    other_db.commit()
+
+    assert repository.get_current_turn(gameID) == 2
+    assert not repository.is_player_active(playerIDs[1], gameID)
+
+
+def test_other_worker_write_is_detected_before_its_bus_message(test_db, game_factory, tmp_path):
+    db = next(override_get_db())
+    gameID, _ = game_factory(db)
+    # Buses sin iniciar: los avisos de invalidación nunca llegan al otro worker
+    first = GameStateCache(bus=UnixSocketBus(str(tmp_path / "bus.sock")))
+    second = GameStateCache(bus=UnixSocketBus(str(tmp_path / "bus.sock")))
+    first_db, second_db = next(override_get_db()), next(override_get_db())
+    event.listen(first_db, "before_commit", first.on_before_commit)
+    event.listen(second_db, "before_commit", second.on_before_commit)
+    first_state = first.get(first_db, gameID)
+    stale_state = second.get(second_db, gameID)
+    second_db.commit()
+
+    game = first_db.get(GameDB, gameID)
+    game.posEnabledToPlay = 2
+    first.update(game)
+    first_db.commit()
+
+    assert first.get(first_db, gameID) is first_state
+    assert not first_state.stale
+    state = second.get(second_db, gameID)
+    assert state is not stale_state
+    assert state.posEnabledToPlay == 2
+    second_db.commit()
+
+    game = first_db.get(GameDB, gameID)
+    game.prohibitedColor = "R"
+    first.update(game)
+    first_db.commit()
+
+    # Una escritura sin leer antes la partida detecta al confirmar que su estado quedó atrás
+    game = second_db.get(GameDB, gameID)
+    game.posEnabledToPlay = 1
+    second.update(game)
+    second_db.commit()
+    assert second.entries[gameID].stale
+    assert second.get(second_db, gameID).prohibitedColor == "R"
+
+
+def test_partial_movements_are_written_from_the_game_row(test_db, game_factory):
+    db = next(override_get_db())
+    gameID, playerIDs = game_factory(db)
+    repository = SQLAlchemyRepository(db)
+    cardID = repository.get_player_movement_cards(gameID, playerIDs[0])[0].cardID
+    board = db.get(GameDB, gameID).board
+    repository.play_movement(gameID, cardID, 0, 0, 0, 1)
+
+    # Otro worker deshace el movimiento parcial sin que este se entere
+    with engine.begin() as connection:
+        connection.execute(
+            text("UPDATE games SET board = :board, lastMovements = '[]' WHERE gameID = :gameID"),
+            {"board": board, "gameID": gameID},
+        )
+    db.expire_all()
+    repository.play_movement(gameID, cardID, 0, 0, 0, 1)
+
+    last_movements = json.loads(db.get(GameDB, gameID).lastMovements)
+    assert [movement["Order"] for movement in last_movements] == [1]
+
+    repository.delete_partial_movement(gameID)
+    assert db.get(GameDB, gameID).board == board
+
+
+def test_deleted_game_is_evicted(test_db, game_factory):
+    db = next(override_get_db())
+    gameID, _ = game_factory(db)
+    repository = SQLAlchemyRepository(db)
+    repository.get(gameID)
+
+    repository.delete_and_clean(gameID)
+
+    assert gameID not in game_states.entries
+    assert repository.get(gameID) is None
+
+
+def test_game_status_overlays_own_hand(test_db, game_factory):
+    db = next(override_get_db())
+    gameID, playerIDs = game_factory(db, amount_players=3)
+    repository = SQLAlchemyRepository(db)
+    cardID = repository.get_player_movement_cards(gameID, playerIDs[1])[0].cardID
+    repository.play_movement(gameID, cardID, 0, 0, 0, 1)
+
+    status = repository.get_game_status(gameID)
+    views = {playerID: status.for_player(playerID) for playerID in playerIDs}
+
+    for playerID, view in views.items():
+        for player in view["players"]:
+            hand = player["cardsMovement"]
+            if player["playerID"] == playerID:
+                assert hand == [card.model_dump() for card in repository.get_player_movement_cards(gameID, playerID)]
+            elif player["playerID"] == playerIDs[1]:
+                assert hand == [{"type": "mov01", "cardID": cardID, "isUsed": True}]
+            else:
+                assert hand == [None]
+        assert view["board"] is status.base["board"]
+    assert [player["cardsMovement"] for player in status.base["players"]] == [
+        [None],
+        [{"type": "mov01", "cardID": cardID, "isUsed": True}],
+        [None],
+    ]
+
+
+def test_game_status_version_is_the_stored_state_version(test_db, game_factory):
+    db = next(override_get_db())
+    gameID, _ = game_factory(db)
+    repository = SQLAlchemyRepository(db)
+    before = repository.get_game_status(gameID)
+
+    repository.skip(gameID)
+    after = repository.get_game_status(gameID)
+    stored = db.execute(text("SELECT stateVersion FROM games WHERE gameID = :gameID"), {"gameID": gameID}).scalar()
+
+    assert after.version == stored > before.version
+    # Otro worker carga la partida de la base y asigna la misma versión al mismo estado
+    game_states.clean_up()
+    assert repository.get_game_status(gameID).version == stored
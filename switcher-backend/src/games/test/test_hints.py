@@ -0,0 +1,114 @@
+import random
+import time
+
+from src.conftest import override_get_db
+from src.games.config import BLUE_CARDS, COLORS, MOVEMENT_CARDS, WHITE_CARDS
+from src.games.domain.figures import cell_index, find_figures
+from src.games.domain.hints import HintSearch, find_hint
+from src.games.domain.models import FigureCard, MovementCard
+from src.games.domain.movements import is_legal_move
+from src.games.infrastructure.models import MovementCard as MovementCardDB
+
+
+def random_hand(rng: random.Random):
+    movement_cards = [MovementCard(type=rng.choice(MOVEMENT_CARDS), cardID=i, isUsed=False) for i in range(3)]
+    figure_cards = [
+        FigureCard(type=rng.choice(WHITE_CARDS + BLUE_CARDS), cardID=10 + i, isBlocked=False, gameID=1, playerID=1)
+        for i in range(rng.randint(1, 3))
+    ]
+    return movement_cards, figure_cards
+
+
+def test_hint_moves_form_a_figure_of_the_hand():
+    rng = random.Random(7)
+    for _ in range(100):
+        colors = [color for color in COLORS for _ in range(9)]
+        rng.shuffle(colors)
+        prohibitedColor = rng.choice(COLORS)
+        movement_cards, figure_cards = random_hand(rng)
+
+        hint = find_hint(colors, prohibitedColor, movement_cards, figure_cards, budget=10)
+        if hint is None:
+            continue
+
+        cards = {card.cardID: card.type for card in movement_cards}
+        assert len({movement.cardID for movement in hint.movements}) == len(hint.movements)
+        for movement in hint.movements:
+            origin, destination = movement.origin, movement.destination
+            assert is_legal_move(cards[movement.cardID], origin.posX, origin.posY, destination.posX, destination.posY)
+            first, second = cell_index(origin.posX, origin.posY), cell_index(destination.posX, destination.posY)
+            colors[first], colors[second] = colors[second], colors[first]
+
+        figure_type = next(card.type for card in figure_cards if card.cardID == hint.figureCardID)
+        figure = [(position.posX, position.posY) for position in hint.figure]
+        assert any(
+            placement.figureType == figure_type and list(placement.positions) == figure
+            for placement in find_figures(colors, prohibitedColor)
+        )
+
+
+def test_hint_is_the_shortest_and_skips_used_or_blocked_cards():
+    board = list("RGBY" * 9)
+    movement_cards = [
+        MovementCard(type="mov01", cardID=1, isUsed=False),
+        MovementCard(type="mov03", cardID=2, isUsed=False),
+        MovementCard(type="mov07", cardID=3, isUsed=False),
+    ]
+    figure_cards = [FigureCard(type="fige06", cardID=10, isBlocked=False, gameID=1, playerID=1)]
+
+    hint = find_hint(board, "R", movement_cards, figure_cards)
+    assert len(hint.movements) == 2
+    assert hint.figureCardID == 10
+
+    movement_cards[0].isUsed = True
+    movement_cards[2].isUsed = True
+    assert find_hint(board, "R", movement_cards, figure_cards) is None
+
+    figure_cards[0].isBlocked = True
+    assert find_hint(board, "R", movement_cards, figure_cards) is None
+
+
+def test_hint_search_stays_within_budget():
+    rng = random.Random(11)
+    slowest = 0.0
+    for _ in range(200):
+        colors = [color for color in COLORS for _ in range(9)]
+        rng.shuffle(colors)
+        movement_cards, figure_cards = random_hand(rng)
+
+        search = HintSearch(colors, rng.choice(COLORS), movement_cards, figure_cards, budget=0.05)
+        start = time.perf_counter()
+        search.run()
+        slowest = max(slowest, time.perf_counter() - start)
+
+    assert slowest < 0.1
+
+
+def test_get_hint_plays_a_figure(client, test_db, game_factory):
+    db = next(override_get_db())
+    gameID, playerIDs = game_factory(db)
+    db.add_all(
+        [
+            MovementCardDB(gameID=gameID, playerID=playerIDs[0], type="mov03"),
+            MovementCardDB(gameID=gameID, playerID=playerIDs[0], type="mov07"),
+        ]
+    )
+    db.commit()
+
+    response = client.get(f"/games/{gameID}/hint", params={"playerID": playerIDs[1]})
+    assert response.status_code == 403
+
+    response = client.get(f"/games/{gameID}/hint", params={"playerID": playerIDs[0]})
+    assert response.status_code == 200
+    hint = response.json()
+    assert len(hint["movements"]) == 2
+
+    for movement in hint["movements"]:
+        response = client.post(f"/games/{gameID}/movement", json={"playerID": playerIDs[0], **movement})
+        assert response.status_code == 201
+
+    response = client.post(
+        f"/games/{gameID}/figure",
+        json={"playerID": playerIDs[0], "cardID": hint["figureCardID"], "figure": hint["figure"]},
+    )
+    assert response.status_code == 201
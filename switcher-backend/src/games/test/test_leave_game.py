@@ -1,5 +1,3 @@
-import json
-
 from src.conftest import override_get_db
 from src.games.infrastructure.models import FigureCard as FigureCardDB
 from src.games.infrastructure.models import Game as GameDB
@@ -18,7 +16,7 @@ def test_leave_game_player_not_exists(client, test_db):
             RoomDB(roomID=1, roomName="test room", minPlayers=2, maxPlayers=4, hostID=1),
             PlayerRoomDB(playerID=1, roomID=1, position=1),
             PlayerRoomDB(playerID=2, roomID=1, position=2),
-            GameDB(roomID=1, board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)])),
+            GameDB(roomID=1, board="R" * 36),
         ]
     )
 
@@ -41,7 +39,7 @@ def test_leave_game_game_not_exists(client, test_db):
             PlayerRoomDB(playerID=2, roomID=1, position=2),
             GameDB(
                 roomID=1,
-                board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)]),
+                board="R" * 36,
                 posEnabledToPlay=2,
             ),
         ]
@@ -67,7 +65,7 @@ def test_leave_game_player_not_in_game(client, test_db):
             PlayerRoomDB(playerID=2, roomID=1, position=2),
             GameDB(
                 roomID=1,
-                board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)]),
+                board="R" * 36,
                 posEnabledToPlay=2,
             ),
         ]
@@ -94,7 +92,7 @@ def test_leave_game(client, test_db):
             PlayerRoomDB(playerID=3, roomID=1, position=3),
             GameDB(
                 roomID=1,
-                board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)]),
+                board="R" * 36,
                 posEnabledToPlay=1,
             ),
             FigureCardDB(gameID=1, type="fig01", isPlayable=False, playerID=1),
@@ -139,7 +137,7 @@ def test_leave_game_with_2_players_removes_game(client, test_db):
             PlayerRoomDB(playerID=2, roomID=1, position=2),
             GameDB(
                 roomID=1,
-                board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)]),
+                board="R" * 36,
                 posEnabledToPlay=1,
             ),
             FigureCardDB(gameID=1, type="fig01", isPlayable=False, playerID=1),
@@ -180,7 +178,7 @@ def test_leave_game_with_2_players_send_ws_end_game(client, test_db):
             PlayerRoomDB(playerID=2, roomID=1, position=2),
             GameDB(
                 roomID=1,
-                board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)]),
+                board="R" * 36,
                 posEnabledToPlay=1,
             ),
             FigureCardDB(gameID=1, type="fig01", isPlayable=False, playerID=1),
@@ -0,0 +1,54 @@
+from src.conftest import override_get_db
+from src.games.domain.movements import MOVE_TABLE, is_legal_move, legal_destinations
+from src.games.infrastructure.models import MovementCard as MovementCardDB
+
+
+def test_move_table_destinations():
+    assert legal_destinations("mov01", 0, 0) == [(2, 2)]
+    assert legal_destinations("mov02", 2, 2) == [(0, 2), (2, 0), (2, 4), (4, 2)]
+    assert legal_destinations("mov03", 0, 5) == [(0, 4), (1, 5)]
+    assert legal_destinations("mov04", 5, 5) == [(4, 4)]
+    assert legal_destinations("mov05", 2, 2) == [(0, 3), (1, 0), (3, 4), (4, 1)]
+    assert legal_destinations("mov06", 2, 2) == [(0, 1), (1, 4), (3, 0), (4, 3)]
+    assert legal_destinations("mov07", 2, 3) == [(0, 3), (2, 0), (2, 5), (5, 3)]
+
+    assert is_legal_move("mov05", 0, 0, 1, 2)
+    assert not is_legal_move("mov06", 0, 0, 1, 2)
+    assert all(len(masks) == 36 and all(mask < 1 << 36 for mask in masks) for masks in MOVE_TABLE.values())
+
+
+def test_get_legal_movements_for_hand(client, test_db, game_factory):
+    db = next(override_get_db())
+    gameID, playerIDs = game_factory(db)
+    db.add(MovementCardDB(gameID=gameID, playerID=playerIDs[0], type="mov07"))
+    db.commit()
+
+    response = client.get(f"/games/{gameID}/movement", params={"playerID": playerIDs[0]})
+
+    assert response.status_code == 200
+    hand = response.json()
+    assert [card["type"] for card in hand] == ["mov01", "mov07"]
+    assert all(len(card["movements"]) == 36 for card in hand)
+    assert hand[0]["movements"][0] == {"origin": {"posX": 0, "posY": 0}, "destinations": [{"posX": 2, "posY": 2}]}
+
+    response = client.post(
+        f"/games/{gameID}/movement",
+        json={
+            "playerID": playerIDs[0],
+            "cardID": hand[0]["cardID"],
+            "origin": {"posX": 0, "posY": 0},
+            "destination": {"posX": 2, "posY": 2},
+        },
+    )
+    assert response.status_code == 201
+    response = client.get(f"/games/{gameID}/movement", params={"playerID": playerIDs[0]})
+    assert [card["type"] for card in response.json()] == ["mov07"]
+
+
+def test_get_legal_movements_player_not_in_game(client, test_db, game_factory):
+    db = next(override_get_db())
+    gameID, _ = game_factory(db)
+
+    response = client.get(f"/games/{gameID}/movement", params={"playerID": 99})
+
+    assert response.status_code == 403
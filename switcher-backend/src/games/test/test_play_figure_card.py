@@ -1,10 +1,10 @@
-import json
 from typing import List
 
 import numpy as np
 import pytest
 
 from src.conftest import override_get_db
+from src.games.domain.board import BoardCodec
 from src.games.domain.models import BoardPiece, BoardPiecePosition
 from src.games.infrastructure.models import FigureCard as FigureCardDB
 from src.games.infrastructure.models import Game as GameDB
@@ -49,7 +49,7 @@ def create_player_room(test_db, create_players):
 def create_game(test_db, create_room):
     game = GameDB(
         roomID=create_room.roomID,
-        board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)]),
+        board="R" * 36,
         prohibitedColor="Y",
         posEnabledToPlay=1,
     )
@@ -73,7 +73,7 @@ def create_figure_card(test_db):
 
 @pytest.fixture
 def create_board_version_1():
-    return json.dumps(
+    return BoardCodec.encode(
         [
             {"posX": 0, "posY": 0, "color": "R", "isPartial": False},
             {"posX": 0, "posY": 1, "color": "R", "isPartial": False},
@@ -117,7 +117,7 @@ def create_board_version_1():
 
 @pytest.fixture
 def create_board_version_2():
-    return json.dumps(
+    return BoardCodec.encode(
         [
             {"posX": 0, "posY": 0, "color": "R", "isPartial": False},
             {"posX": 0, "posY": 1, "color": "R", "isPartial": False},
@@ -161,7 +161,7 @@ def create_board_version_2():
 
 @pytest.fixture
 def create_board_version_3():
-    return json.dumps(
+    return BoardCodec.encode(
         [
             {"posX": 0, "posY": 0, "color": "Y", "isPartial": False},
             {"posX": 0, "posY": 1, "color": "Y", "isPartial": False},
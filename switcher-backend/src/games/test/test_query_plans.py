@@ -0,0 +1,88 @@
+import re
+
+from sqlalchemy import event, text
+
+from src.conftest import engine, override_get_db
+from src.games.infrastructure.cache import game_states
+from src.games.infrastructure.migrations import add_missing_columns, create_missing_indexes
+from src.games.infrastructure.models import Game as GameDB
+from src.games.infrastructure.repository import SQLAlchemyRepository as GameRepository
+from src.rooms.infrastructure.repository import SQLAlchemyRepository as RoomRepository
+
+HOT_TABLES = ("figure_cards", "movement_cards", "player_room")
+FULL_SCAN = re.compile(rf"^SCAN ({'|'.join(HOT_TABLES)})\b")
+
+
+class StatementRecorder:
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            self.statements.append((statement, parameters))
+
+    def __enter__(self):
+        event.listen(engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *args):
+        event.remove(engine, "before_cursor_execute", self)
+
+
+def full_scans(statements):
+    scans = []
+    with engine.connect() as connection:
+        for statement, parameters in statements:
+            plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            scans += [(row[-1], statement) for row in plan if FULL_SCAN.match(row[-1])]
+    return scans
+
+
+def test_hot_queries_use_indexes(test_db, game_factory):
+    db = next(override_get_db())
+    gameID, playerIDs = game_factory(db, amount_players=3)
+    game_repository = GameRepository(db)
+    room_repository = RoomRepository(db)
+    game_states.clean_up()
+    cardID = game_repository.get_player_movement_cards(gameID, playerIDs[1])[0].cardID
+    figureID = next(card.cardID for card in game_repository.get_players(gameID)[0].cardsFigure)
+    roomID = db.get(GameDB, gameID).roomID
+
+    with StatementRecorder() as recorder:
+        game_states.clean_up()
+        game_repository.get(gameID)
+        game_repository.replacement_movement_card(gameID, playerIDs[0])
+        game_repository.replacement_figure_card(gameID, playerIDs[0])
+        game_repository.rebuild_movement_deck(gameID)
+        game_repository.figure_card_count(gameID, playerIDs[0])
+        game_repository.get_blocked_card(gameID, playerIDs[0])
+        game_repository.is_blocked_and_last_card(gameID, figureID)
+        game_repository.unblock_managment(gameID, figureID)
+        game_repository.has_three_cards(gameID, playerIDs[0])
+        game_repository.play_movement(gameID, cardID, 0, 0, 0, 1)
+        room_repository.get_first_turn(roomID)
+        room_repository.get_turn(roomID, 2)
+        room_repository.is_player_in_room(playerIDs[0], roomID)
+        room_repository.get_all_rooms()
+        game_repository.set_player_inactive(playerIDs[2], gameID)
+        game_repository.delete_and_clean(gameID)
+
+    assert len(recorder.statements) > 10
+    assert full_scans(recorder.statements) == []
+
+
+def test_create_missing_indexes(test_db):
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_figure_cards_game_player"))
+        connection.execute(text("DROP INDEX ix_player_room_room_position"))
+
+    assert sorted(create_missing_indexes(engine)) == ["ix_figure_cards_game_player", "ix_player_room_room_position"]
+    assert create_missing_indexes(engine) == []
+
+
+def test_add_missing_columns(test_db):
+    with engine.begin() as connection:
+        connection.execute(text("ALTER TABLE games DROP COLUMN stateVersion"))
+
+    assert add_missing_columns(engine) == ["games.stateVersion"]
+    assert add_missing_columns(engine) == []
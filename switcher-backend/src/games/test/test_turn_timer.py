@@ -0,0 +1,92 @@
+import asyncio
+import datetime
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.conftest import TestingSessionLocal
+from src.games.infrastructure import timer
+from src.games.infrastructure.models import Game as GameDB
+from src.games.infrastructure.timer import TurnTimerService, skip_expired_turn, turn_timers
+
+
+def create_timers():
+    expired = []
+
+    async def on_expire(gameID):
+        expired.append(gameID)
+
+    return TurnTimerService(on_expire), expired
+
+
+@pytest.mark.asyncio
+async def test_timers_expire_in_deadline_order():
+    timers, expired = create_timers()
+    timers.schedule(1, 0.06)
+    timers.schedule(2, 0.02)
+    timers.schedule(3, 0.04)
+
+    await asyncio.sleep(0.1)
+
+    assert expired == [2, 3, 1]
+    assert not timers.deadlines
+    assert timers.handle is None
+
+
+@pytest.mark.asyncio
+async def test_reschedule_replaces_previous_deadline():
+    timers, expired = create_timers()
+    timers.schedule(1, 0.02)
+    timers.schedule(1, 0.08)
+
+    await asyncio.sleep(0.05)
+    assert expired == []
+
+    await asyncio.sleep(0.06)
+    assert expired == [1]
+
+
+@pytest.mark.asyncio
+async def test_cancel_timer():
+    timers, expired = create_timers()
+    timers.schedule(1, 0.02)
+    timers.schedule(2, 0.03)
+    timers.cancel(1)
+
+    await asyncio.sleep(0.06)
+
+    assert expired == [2]
+
+
+@pytest.mark.asyncio
+async def test_single_loop_callback_for_many_games():
+    timers, expired = create_timers()
+    for gameID in range(1000):
+        timers.schedule(gameID, 60 + gameID)
+    first_handle = timers.handle
+
+    for gameID in range(500):
+        timers.cancel(gameID)
+
+    assert timers.handle is first_handle
+    assert len(timers.heap) <= 2 * len(timers.deadlines) + 64
+    assert expired == []
+    timers.clean_up()
+    assert timers.handle is None
+
+
+@pytest.mark.asyncio
+async def test_early_expiration_is_rescheduled(test_db, game_factory):
+    db = TestingSessionLocal()
+    gameID, _ = game_factory(db)
+    db.get(GameDB, gameID).timestamp_next_turn = datetime.datetime.now() + datetime.timedelta(seconds=30)
+    db.commit()
+
+    with patch.object(timer, "SessionLocal", TestingSessionLocal):
+        await skip_expired_turn(gameID)
+
+    assert 29 < turn_timers.deadline(gameID) - time.monotonic() <= 30
+    db.refresh(db.get(GameDB, gameID))
+    assert db.get(GameDB, gameID).posEnabledToPlay == 1
+    db.close()
@@ -0,0 +1,129 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.conftest import override_get_db
+from src.database import AsyncRepository, SQLAlchemyUnitOfWork
+from src.games.infrastructure.cache import game_states
+from src.games.infrastructure.models import Game as GameDB
+from src.games.infrastructure.repository import WebSocketRepository as GameRepository
+from src.games.infrastructure.timer import turn_timers
+from src.games.infrastructure.websocket import ws_manager_game
+from src.players.domain.models import PlayerCreationRequest
+from src.players.infrastructure.repository import SQLAlchemyRepository as PlayerRepository
+
+
+class CommitCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, session):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(Session, "after_commit", self)
+        return self
+
+    def __exit__(self, *args):
+        event.remove(Session, "after_commit", self)
+
+
+def test_skip_turn_commits_once(client, test_db, game_factory):
+    db = next(override_get_db())
+    gameID, playerIDs = game_factory(db, amount_players=3)
+
+    with CommitCounter() as commits:
+        response = client.put(f"/games/{gameID}/turn", json={"playerID": playerIDs[0]})
+
+    assert response.status_code == 200
+    assert commits.count == 1
+
+
+def test_play_movement_commits_once(client, test_db, game_factory):
+    db = next(override_get_db())
+    gameID, playerIDs = game_factory(db)
+    cardID = GameRepository(db).get_player_movement_cards(gameID, playerIDs[0])[0].cardID
+
+    with CommitCounter() as commits:
+        response = client.post(
+            f"/games/{gameID}/movement",
+            json={
+                "playerID": playerIDs[0],
+                "cardID": cardID,
+                "origin": {"posX": 0, "posY": 0},
+                "destination": {"posX": 2, "posY": 2},
+            },
+        )
+
+    assert response.status_code == 201
+    assert commits.count == 1
+
+
+def test_failed_use_case_leaves_no_partial_turn(client, test_db, game_factory):
+    db = next(override_get_db())
+    gameID, playerIDs = game_factory(db, amount_players=3)
+    GameRepository(db).get(gameID)
+
+    with patch.object(GameRepository, "replacement_figure_card", side_effect=RuntimeError("falla")):
+        with CommitCounter() as commits:
+            with pytest.raises(RuntimeError):
+                client.put(f"/games/{gameID}/turn", json={"playerID": playerIDs[0]})
+
+    assert commits.count == 0
+    db.expire_all()
+    assert db.get(GameDB, gameID).posEnabledToPlay == 1
+    assert GameRepository(db).get(gameID).posEnabledToPlay == 1
+    assert game_states.get(db, gameID).posEnabledToPlay == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_outside_a_unit_of_work_wait_for_it(test_db):
+    unit_of_work_session = next(override_get_db())
+    other_players = AsyncRepository(PlayerRepository(next(override_get_db())))
+
+    async with SQLAlchemyUnitOfWork(unit_of_work_session):
+        await AsyncRepository(PlayerRepository(unit_of_work_session)).create(PlayerCreationRequest(username="uno"))
+        # Si corriera ahora, esperaría el lock de SQLite que tiene la unidad de trabajo
+        write = asyncio.create_task(other_players.create(PlayerCreationRequest(username="dos")))
+        await asyncio.sleep(0.05)
+        assert not write.done()
+
+    assert (await write).username == "dos"
+
+
+@pytest.mark.asyncio
+async def test_reads_outside_a_unit_of_work_do_not_wait_for_it(test_db):
+    unit_of_work_session = next(override_get_db())
+    other_players = AsyncRepository(PlayerRepository(next(override_get_db())))
+    playerID = (await other_players.create(PlayerCreationRequest(username="uno"))).playerID
+
+    async with SQLAlchemyUnitOfWork(unit_of_work_session):
+        await AsyncRepository(PlayerRepository(unit_of_work_session)).create(PlayerCreationRequest(username="dos"))
+        read = asyncio.create_task(other_players.get(playerID))
+        await asyncio.sleep(0.05)
+        assert read.done()
+
+    assert (await read).username == "uno"
+
+
+def test_side_effects_wait_for_the_commit(client, test_db, game_factory):
+    db = next(override_get_db())
+    gameID, playerIDs = game_factory(db, amount_players=3)
+
+    with (
+        patch.object(ws_manager_game, "broadcast") as broadcast,
+        patch.object(turn_timers, "schedule") as schedule,
+    ):
+        with patch.object(SQLAlchemyUnitOfWork, "finish", side_effect=RuntimeError("falla")):
+            with pytest.raises(RuntimeError):
+                client.put(f"/games/{gameID}/turn", json={"playerID": playerIDs[0]})
+        broadcast.assert_not_called()
+        schedule.assert_not_called()
+
+        response = client.put(f"/games/{gameID}/turn", json={"playerID": playerIDs[0]})
+        assert response.status_code == 200
+        assert broadcast.call_args.args[0] == "msg"
+        schedule.assert_called_once_with(gameID, 120)
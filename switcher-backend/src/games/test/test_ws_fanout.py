@@ -0,0 +1,184 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.websockets import WebSocketState
+
+from src.games.infrastructure.websocket import ConnectionManagerGame
+from src.rooms.infrastructure import websocket as room_websocket
+from src.shared.config import WS_SLOW_CONSUMER_CLOSE_CODE
+from src.shared.websocket import ConnectionHub, ConnectionSender, SlowConsumerPolicy, encode_frame, outbound_queues
+
+
+class FakeWebSocket:
+    def __init__(self, blocked: bool = False):
+        self.client_state = WebSocketState.CONNECTED
+        self.sent = []
+        self.closed_with = None
+        self.unblocked = asyncio.Event()
+        if not blocked:
+            self.unblocked.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data):
+        await self.unblocked.wait()
+        self.sent.append(json.loads(data))
+
+    async def close(self, code=1000, reason=None):
+        self.closed_with = code
+        self.client_state = WebSocketState.DISCONNECTED
+
+
+def status(number):
+    return {"type": "status", "payload": number}
+
+
+def encode(message):
+    return encode_frame(message["type"], message["payload"])
+
+
+async def settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_block_others():
+    slow, fast = FakeWebSocket(blocked=True), FakeWebSocket()
+    senders = [ConnectionSender(slow), ConnectionSender(fast)]
+
+    for sender in senders:
+        sender.send(encode(status(1)))
+    await settle()
+
+    assert fast.sent == [status(1)]
+    assert slow.sent == []
+
+    slow.unblocked.set()
+    await settle()
+    assert slow.sent == [status(1)]
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_status_frames():
+    websocket = FakeWebSocket(blocked=True)
+    sender = ConnectionSender(websocket, max_size=3, policy=SlowConsumerPolicy.DROP_OLDEST)
+    sender.send(encode(status(0)))
+    await settle()
+
+    sender.send(encode(status(1)))
+    sender.send(encode({"type": "msg", "payload": "hola"}))
+    sender.send(encode(status(2)))
+    sender.send(encode(status(3)))
+
+    websocket.unblocked.set()
+    await settle()
+    assert websocket.sent == [status(0), {"type": "msg", "payload": "hola"}, status(2), status(3)]
+    assert sender.dropped == 1
+    assert websocket.closed_with is None
+
+
+@pytest.mark.asyncio
+async def test_close_slow_consumer():
+    websocket = FakeWebSocket(blocked=True)
+    sender = ConnectionSender(websocket, max_size=2, policy=SlowConsumerPolicy.CLOSE)
+    sender.send(encode(status(0)))
+    await settle()
+
+    for number in range(1, 4):
+        sender.send(encode(status(number)))
+
+    websocket.unblocked.set()
+    await settle()
+    assert websocket.sent == [status(0)]
+    assert websocket.closed_with == WS_SLOW_CONSUMER_CLOSE_CODE
+    assert sender.writer.done()
+
+
+@pytest.mark.asyncio
+async def test_broadcast_encodes_frame_once(monkeypatch):
+    encoded = []
+
+    def counting_encode_frame(type, payload):
+        encoded.append(type)
+        return encode_frame(type, payload)
+
+    monkeypatch.setattr(room_websocket, "encode_frame", counting_encode_frame)
+    manager = room_websocket.ConnectionManagerRoomList()
+    websockets = [FakeWebSocket() for _ in range(5)]
+    for websocket in websockets:
+        await manager.connect(websocket)
+
+    await manager.broadcast(room_websocket.MessageType.STATUS, [{"roomID": 1}])
+    await settle()
+
+    assert len(encoded) == 1
+    assert all(websocket.sent == [{"type": "status", "payload": [{"roomID": 1}]}] for websocket in websockets)
+    for websocket in websockets:
+        await manager.disconnect(websocket)
+
+
+def test_hub_indexes_connections_in_both_directions():
+    hub = ConnectionHub()
+    first, second, replacement = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+    hub.subscribe(1, first, 10)
+    hub.subscribe(1, second, 20)
+
+    assert hub.get(1, 10) is first
+    assert hub.members(1) == (first, second)
+    assert hub.subscribe(1, replacement, 10) is first
+    assert first not in hub
+    assert hub.unsubscribe(first) is None
+    assert hub.members(1) == (replacement, second)
+
+    assert hub.unsubscribe(second) == (1, 20)
+    assert hub.unsubscribe(replacement) == (1, 10)
+    assert len(hub) == 0
+    assert not hub.topics
+
+
+@pytest.mark.asyncio
+async def test_mass_disconnect_empties_the_registry():
+    manager = ConnectionManagerGame()
+    websockets = {}
+    for gameID in range(500):
+        for playerID in range(4):
+            websocket = FakeWebSocket()
+            websockets[(gameID, playerID)] = websocket
+            await manager.connect(playerID, gameID, websocket, patches=playerID % 2 == 0)
+
+    assert len(manager.active_connections) == 2000
+    for websocket in websockets.values():
+        websocket.client_state = WebSocketState.DISCONNECTED
+        await manager.disconnect(websocket)
+
+    assert len(manager.active_connections) == 0
+    assert not manager.active_connections.topics
+    assert not manager.patch_connections
+    assert not outbound_queues.senders
+
+    # Un mensaje a una conexión ya cerrada no vuelve a crear su cola de salida
+    outbound_queues.send(websockets[(0, 0)], encode(status(1)))
+    assert not outbound_queues.senders
+
+
+@pytest.mark.asyncio
+async def test_chat_messages_of_one_tick_are_batched_on_request():
+    manager = ConnectionManagerGame()
+    websockets = [FakeWebSocket() for _ in range(3)]
+    for playerID, websocket in enumerate(websockets):
+        await manager.connect(playerID, 1, websocket, chat_batches=playerID > 0)
+
+    for playerID, websocket in enumerate(websockets):
+        assert manager.chat.submit(websocket, 1, f"hola {playerID}") is None
+    await settle()
+
+    # Quien no pidió los mensajes juntos recibe uno por cada mensaje de chat
+    assert websockets[0].sent == [{"type": "msg", "payload": f"hola {playerID}"} for playerID in range(3)]
+    batch = {"type": "msg_batch", "payload": ["hola 0", "hola 1", "hola 2"]}
+    assert all(websocket.sent == [batch] for websocket in websockets[1:])
+    for websocket in websockets:
+        await manager.disconnect(websocket)
+    assert not manager.chat.buckets
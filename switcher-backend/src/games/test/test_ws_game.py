@@ -1,14 +1,16 @@
-import json
+from unittest.mock import patch
 
 import pytest
 from fastapi.websockets import WebSocketDisconnect, WebSocket
 
 from src.conftest import override_get_db
+from src.games.domain.board import BoardCodec
 from src.games.infrastructure.models import Game as GameDB
+from src.games.infrastructure.models import MovementCard as MovementCardDB
 from src.players.infrastructure.models import Player as PlayerDB
 from src.rooms.infrastructure.models import PlayerRoom as PlayerRoom
 from src.rooms.infrastructure.models import Room as RoomDB
-from src.games.infrastructure.websocket import ConnectionManagerGame
+from src.games.infrastructure.websocket import ConnectionManagerGame, ws_manager_game
 
 def test_connect_to_game_websocket_user_not_exist(client, test_db):
     db = next(override_get_db())
@@ -82,7 +84,7 @@ def test_connect_to_game_websocket_player_not_in_game(client, test_db):
             RoomDB(roomID=1, roomName="test room", minPlayers=2, maxPlayers=4, hostID=1),
             PlayerRoom(playerID=1, roomID=1),
             PlayerRoom(playerID=2, roomID=1),
-            GameDB(roomID=1, board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)])),
+            GameDB(roomID=1, board="R" * 36),
         ]
     )
     db.commit()
@@ -106,7 +108,7 @@ def test_connect_to_game_websocket_player_in_game(client, test_db):
             PlayerRoom(playerID=1, roomID=1),
             PlayerRoom(playerID=2, roomID=1),
             PlayerRoom(playerID=3, roomID=1),
-            GameDB(roomID=1, board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)])),
+            GameDB(roomID=1, board="R" * 36),
         ]
     )
     db.commit()
@@ -136,7 +138,7 @@ def test_close_connection_if_player_open_second(client, test_db):
             PlayerRoom(playerID=2, roomID=1),
             GameDB(
                 roomID=1,
-                board=json.dumps(
+                board=BoardCodec.encode(
                     [
                         {"posX": 0, "posY": 0, "color": "G", "isPartial": False},
                         {"posX": 0, "posY": 1, "color": "Y", "isPartial": False},
@@ -199,7 +201,7 @@ def test_send_personal_message(client, test_db):
         PlayerDB(playerID=1, username="test user"),
         RoomDB(roomID=1, roomName="test room", minPlayers=2, maxPlayers=4, hostID=1),
         PlayerRoom(playerID=1, roomID=1),
-        GameDB(roomID=1, board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)])),
+        GameDB(roomID=1, board="R" * 36),
     ])
     db.commit()
     with client.websocket_connect("/games/1/1") as websocket:
@@ -215,7 +217,7 @@ def test_clean_up_connections(client, test_db):
         PlayerDB(playerID=1, username="test user"),
         RoomDB(roomID=1, roomName="test room", minPlayers=2, maxPlayers=4, hostID=1),
         PlayerRoom(playerID=1, roomID=1),
-        GameDB(roomID=1, board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)])),
+        GameDB(roomID=1, board="R" * 36),
     ])
     db.commit()
     with client.websocket_connect("/games/1/1") as websocket:
@@ -232,7 +234,7 @@ def test_broadcast_message(client, test_db):
         RoomDB(roomID=1, roomName="test room", minPlayers=2, maxPlayers=4, hostID=1),
         PlayerRoom(playerID=1, roomID=1),
         PlayerRoom(playerID=2, roomID=1),
-        GameDB(roomID=1, board=json.dumps([{"posX": 0, "posY": 0, "color": "R"} for _ in range(36)])),
+        GameDB(roomID=1, board="R" * 36),
     ])
     db.commit()
 
@@ -251,4 +253,131 @@ def test_broadcast_message(client, test_db):
         data1 = websocket1.receive_json()
         data2 = websocket2.receive_json()
         assert data1 == broadcast_message
-        assert data2 == broadcast_message
\ No newline at end of file
+        assert data2 == broadcast_message
+
+def test_patch_subscribers_receive_versioned_patches(client, test_db):
+    db = next(override_get_db())
+    db.add_all(
+        [
+            PlayerDB(playerID=1, username="test user"),
+            PlayerDB(playerID=2, username="test user 2"),
+            RoomDB(roomID=1, roomName="test room", minPlayers=2, maxPlayers=4, hostID=1),
+            PlayerRoom(playerID=1, roomID=1, position=1),
+            PlayerRoom(playerID=2, roomID=1, position=2),
+            GameDB(
+                roomID=1,
+                board=BoardCodec.encode(
+                    [
+                        {"posX": x, "posY": y, "color": "R" if (x, y) == (0, 0) else "B" if (x, y) == (2, 2) else "G"}
+                        for x in range(6)
+                        for y in range(6)
+                    ]
+                ),
+                posEnabledToPlay=1,
+            ),
+            MovementCardDB(gameID=1, type="mov01", isDiscarded=False, playerID=1),
+        ]
+    )
+    db.commit()
+
+    def receive_status(websocket):
+        while True:
+            message = websocket.receive_json()
+            if message["type"] in ("status", "patch"):
+                return message
+
+    with client.websocket_connect("/games/1/1?patches=true") as patch_websocket:
+        snapshot = patch_websocket.receive_json()
+        with client.websocket_connect("/games/2/1") as status_websocket:
+            status = status_websocket.receive_json()
+            assert snapshot["type"] == status["type"] == "status"
+            assert "version" in snapshot["payload"]
+            assert "version" not in status["payload"]
+
+            response = client.post(
+                "/games/1/movement",
+                json={
+                    "cardID": 1,
+                    "playerID": 1,
+                    "origin": {"posX": 0, "posY": 0},
+                    "destination": {"posX": 2, "posY": 2},
+                },
+            )
+            assert response.status_code == 201
+
+            patch = receive_status(patch_websocket)
+            assert patch["type"] == "patch"
+            assert patch["payload"]["baseVersion"] == snapshot["payload"]["version"]
+            assert patch["payload"]["version"] > snapshot["payload"]["version"]
+            assert [(piece["posX"], piece["posY"], piece["color"]) for piece in patch["payload"]["board"]] == [
+                (0, 0, "B"),
+                (2, 2, "R"),
+            ]
+            assert patch["payload"]["players"][0]["cardsMovement"][0]["isUsed"]
+            assert "figuresToUse" not in patch["payload"]
+
+            status = receive_status(status_websocket)
+            assert status["type"] == "status"
+            assert len(status["payload"]["board"]) == 36
+
+            patch_websocket.send_json({"type": "snapshot"})
+            snapshot = receive_status(patch_websocket)
+            assert snapshot["type"] == "status"
+            assert snapshot["payload"]["version"] == patch["payload"]["version"]
+
+
+def add_game_with_one_player(db):
+    db.add_all([
+        PlayerDB(playerID=1, username="test user"),
+        RoomDB(roomID=1, roomName="test room", minPlayers=2, maxPlayers=4, hostID=1),
+        PlayerRoom(playerID=1, roomID=1),
+        GameDB(roomID=1, board="R" * 36),
+    ])
+    db.commit()
+
+
+def test_chat_rejects_oversized_and_invalid_messages(client, test_db):
+    add_game_with_one_player(next(override_get_db()))
+
+    with client.websocket_connect("/games/1/1") as websocket:
+        websocket.receive_json()
+
+        websocket.send_json({"type": "msg", "payload": "x" * 2000})
+        assert websocket.receive_json() == {"type": "msg_rejected", "payload": {"reason": "too_large"}}
+
+        websocket.send_json({"type": "msg", "payload": {"username": "test user", "text": 3}})
+        assert websocket.receive_json() == {"type": "msg_rejected", "payload": {"reason": "invalid"}}
+
+        websocket.send_text("no es json")
+        assert websocket.receive_json() == {"type": "msg_rejected", "payload": {"reason": "invalid"}}
+
+        message = {"type": "msg", "payload": {"username": "test user", "text": "hola"}}
+        websocket.send_json(message)
+        assert websocket.receive_json() == message
+
+
+def test_chat_throttles_flooding_sender_once(client, test_db):
+    add_game_with_one_player(next(override_get_db()))
+
+    with patch.object(ws_manager_game.chat, "burst", 2), patch.object(ws_manager_game.chat, "rate", 0):
+        with client.websocket_connect("/games/1/1") as websocket:
+            websocket.receive_json()
+
+            for number in range(5):
+                websocket.send_json({"type": "msg", "payload": f"mensaje {number}"})
+
+            messages, rejected = [], []
+            while len(messages) < 2 or not rejected:
+                data = websocket.receive_json()
+                if data["type"] == "msg_rejected":
+                    rejected.append(data["payload"])
+                else:
+                    assert data["type"] == "msg"
+                    messages.append(data["payload"])
+            assert messages == ["mensaje 0", "mensaje 1"]
+            assert rejected == [{"reason": "rate_limit"}]
+
+            # El resto de la ráfaga se descarta sin otro aviso: lo siguiente que llega es el estado pedido
+            websocket.send_json({"type": "snapshot"})
+            assert websocket.receive_json()["type"] == "status"
+
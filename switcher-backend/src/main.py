@@ -7,24 +7,48 @@ from fastapi.responses import RedirectResponse
 
 from src.database import Base, engine
 from src.games.infrastructure.api import router as games_router
+from src.games.infrastructure.migrations import add_missing_columns, create_missing_indexes, migrate_board_storage
+from src.games.infrastructure.timer import turn_timers
 from src.players.infrastructure.api import router as players_router
 from src.rooms.infrastructure.api import router as rooms_router
+from src.rooms.infrastructure.lobby import lobby_broadcaster, lobby_rooms
 from src.rooms.infrastructure.websocket import ws_manager_room, ws_manager_room_list
-
-app = FastAPI(title="Switcher Card Game", description="API for Switcher Card Game")
-
+from src.shared.bus import bus
+from src.shared.config import WS_PING_INTERVAL_SECONDS, WS_PING_TIMEOUT_SECONDS
+from src.shared.websocket import heartbeats, outbound_queues
 
 Base.metadata.create_all(bind=engine)
+add_missing_columns(engine)
+migrate_board_storage(engine)
+create_missing_indexes(engine)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     ws_manager_room_list.clean_up()
     ws_manager_room.clean_up()
+    await bus.start()
+    heartbeats.start()
     yield
+    heartbeats.clean_up()
+    await bus.stop()
     ws_manager_room_list.clean_up()
     ws_manager_room.clean_up()
+    lobby_rooms.clean_up()
+    lobby_broadcaster.clean_up()
+    outbound_queues.clean_up()
+    turn_timers.clean_up()
+
 
+app = FastAPI(title="Switcher Card Game", description="API for Switcher Card Game", lifespan=lifespan)
+
+# Opciones de uvicorn: la implementación "websockets" envía pings del protocolo a todas las conexiones y cierra las
+# que no responden, aunque el cliente no haya pedido el latido de la aplicación
+server_options = {
+    "ws": "websockets",
+    "ws_ping_interval": WS_PING_INTERVAL_SECONDS,
+    "ws_ping_timeout": WS_PING_TIMEOUT_SECONDS,
+}
 
 app.add_middleware(
     CORSMiddleware,
@@ -40,6 +64,11 @@ def redirect_to_documentation():
     return RedirectResponse(url="/docs/")
 
 
+@app.get("/metrics", tags=["Root"])
+def get_metrics():
+    return {"lobby": lobby_broadcaster.metrics(), "websockets": heartbeats.metrics()}
+
+
 app.include_router(players_router, prefix="/players", tags=["players"])
 
 app.include_router(rooms_router, prefix="/rooms", tags=["rooms"])
@@ -49,4 +78,4 @@ app.include_router(games_router, prefix="/games", tags=["games"])
 
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", reload=True, port=8000)
+    uvicorn.run("main:app", host="0.0.0.0", reload=True, port=8000, **server_options)
@@ -6,7 +6,7 @@ class PlayerService:
     def __init__(self, repository: PlayerRepository):
         self.repository = repository
 
-    def create_player(self, player_username: PlayerCreationRequest) -> Player:
-        new_player = self.repository.create(player_username)
+    async def create_player(self, player_username: PlayerCreationRequest) -> Player:
+        new_player = await self.repository.create(player_username)
 
         return new_player
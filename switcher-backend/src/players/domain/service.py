@@ -11,7 +11,7 @@ class RepositoryValidators:
         self.player_repository = player_repository
 
     async def validate_player_exists(self, playerID: int, websocket: Optional[WebSocket] = None):
-        if self.player_repository.get(playerID):
+        if await self.player_repository.get(playerID):
             return
         if websocket is None:
             raise HTTPException(status_code=404, detail="El jugador no existe.")
@@ -2,6 +2,7 @@ from typing import Optional
 
 from sqlalchemy.orm import Session
 
+from src.database import commit, writes
 from src.players.domain.models import Player, PlayerCreationRequest
 from src.players.domain.repository import PlayerRepository
 from src.players.infrastructure.models import Player as PlayerDB
@@ -11,11 +12,12 @@ class SQLAlchemyRepository(PlayerRepository):
     def __init__(self, db_session: Session):
         self.db_session = db_session
 
+    @writes
     def create(self, player_data: PlayerCreationRequest) -> Player:
         new_player = PlayerDB(username=player_data.username)
 
         self.db_session.add(new_player)
-        self.db_session.commit()
+        commit(self.db_session)
         self.db_session.refresh(new_player)
 
         return Player(playerID=new_player.playerID, username=new_player.username)
@@ -28,12 +30,14 @@ class SQLAlchemyRepository(PlayerRepository):
 
         return Player(playerID=player.playerID, username=player.username)
 
+    @writes
     def update(self, player: Player) -> None:
         self.db_session.query(PlayerDB).filter(PlayerDB.playerID == player.playerID).update(
             {"username": player.username}
         )
-        self.db_session.commit()
+        commit(self.db_session)
 
+    @writes
     def delete(self, playerID: int) -> None:
         self.db_session.query(PlayerDB).filter(PlayerDB.playerID == playerID).delete()
-        self.db_session.commit()
+        commit(self.db_session)
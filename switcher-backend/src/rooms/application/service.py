@@ -7,6 +7,7 @@ from src.players.domain.service import RepositoryValidators as PlayerRepositoryV
 from src.rooms.domain.models import RoomCreationRequest, RoomID
 from src.rooms.domain.repository import RoomRepositoryWS
 from src.rooms.domain.service import RepositoryValidators as RoomRepositoryValidators
+from src.shared.unit_of_work import AutoCommit, UnitOfWork
 
 
 class RoomService:
@@ -14,8 +15,10 @@ class RoomService:
         self,
         room_repository: RoomRepositoryWS,
         player_repository: Optional[PlayerRepository] = None,
+        unit_of_work: Optional[UnitOfWork] = None,
     ):
         self.room_repository = room_repository
+        self.unit_of_work = unit_of_work or AutoCommit()
 
         self.room_domain_service = RoomRepositoryValidators(room_repository, player_repository)
         if player_repository is not None:
@@ -23,54 +26,69 @@ class RoomService:
 
     async def create_room(self, room_data: RoomCreationRequest) -> RoomID:
         await self.player_domain_service.validate_player_exists(room_data.playerID)
+        # bcrypt corre fuera de la unidad de trabajo para no retener el candado de escritura
+        encrypted_password = await self.room_repository.encrypt_password(room_data.password)
 
-        saved_room = self.room_repository.create(room_data)
-        self.room_repository.add_player_to_room(playerID=room_data.playerID, roomID=saved_room.roomID)
-        await self.room_repository.broadcast_status_room_list()
+        async with self.unit_of_work:
+            saved_room = await self.room_repository.create(room_data, encrypted_password)
+            await self.room_repository.add_player_to_room(playerID=room_data.playerID, roomID=saved_room.roomID)
+
+        await self.room_repository.broadcast_status_room_list(saved_room.roomID)
 
         return saved_room
 
     async def leave_room(self, roomID: int, playerID: int) -> None:
-        await self.player_domain_service.validate_player_exists(playerID)
-        await self.room_domain_service.validate_room_exists(roomID)
-        await self.room_domain_service.validate_player_in_room(playerID, roomID)
-        await self.room_domain_service.validate_game_not_started(roomID)
+        async with self.unit_of_work:
+            await self.player_domain_service.validate_player_exists(playerID)
+            await self.room_domain_service.validate_room_exists(roomID)
+            await self.room_domain_service.validate_player_in_room(playerID, roomID)
+            await self.room_domain_service.validate_game_not_started(roomID)
+
+            isHost = await self.room_repository.is_owner(playerID, roomID)
 
-        isHost = self.room_repository.is_owner(playerID, roomID)
+            await self.room_repository.remove_player_from_room(playerID=playerID, roomID=roomID)
+            await self.room_repository.disconnect_player(roomID, playerID)
 
-        self.room_repository.remove_player_from_room(playerID=playerID, roomID=roomID)
-        await self.room_repository.disconnect_player(roomID, playerID)
+            if isHost:
+                await self.room_repository.broadcast_room_cancellation(roomID)
+                await self.room_repository.delete_and_clean(roomID)
 
-        if isHost:
-            await self.room_repository.broadcast_room_cancellation(roomID)
-            self.room_repository.delete_and_clean(roomID)
-        else:
+        if not isHost:
             await self.room_repository.broadcast_status_room(roomID)
 
-        await self.room_repository.broadcast_status_room_list()
+        await self.room_repository.broadcast_status_room_list(roomID)
 
     async def join_room(self, roomID: int, playerID: int, password: Optional[str] = None) -> None:
         await self.player_domain_service.validate_player_exists(playerID)
         await self.room_domain_service.validate_room_exists(roomID)
-        self.room_domain_service.validate_room_full(roomID)
+        await self.room_domain_service.validate_room_full(roomID)
         await self.room_domain_service.validate_game_not_started(roomID)
+        # bcrypt corre fuera de la unidad de trabajo para no retener el candado de escritura
+        await self.room_domain_service.validate_room_password(roomID, playerID, password=password)
 
-        self.room_domain_service.validate_room_password(roomID, password=password)
+        async with self.unit_of_work:
+            # La sala pudo llenarse o empezar la partida mientras se verificaba la contraseña
+            await self.room_domain_service.validate_room_full(roomID)
+            await self.room_domain_service.validate_game_not_started(roomID)
 
-        self.room_repository.add_player_to_room(playerID=playerID, roomID=roomID)
+            await self.room_repository.add_player_to_room(playerID=playerID, roomID=roomID)
 
-        await self.room_repository.broadcast_status_room_list()
+        await self.room_repository.broadcast_status_room_list(roomID)
         await self.room_repository.broadcast_status_room(roomID)
 
-    async def connect_to_room_list_websocket(self, playerID: int, websocket: WebSocket) -> None:
+    async def connect_to_room_list_websocket(
+        self, playerID: int, websocket: WebSocket, events: bool = False, heartbeat: bool = False
+    ) -> None:
         await self.player_domain_service.validate_player_exists(playerID, websocket)
 
-        await self.room_repository.setup_connection_room_list(websocket)
+        await self.room_repository.setup_connection_room_list(websocket, events, heartbeat)
 
-    async def connect_to_room_websocket(self, playerID: int, roomID: int, websocket: WebSocket) -> None:
+    async def connect_to_room_websocket(
+        self, playerID: int, roomID: int, websocket: WebSocket, heartbeat: bool = False
+    ) -> None:
         await self.player_domain_service.validate_player_exists(playerID, websocket)
         await self.room_domain_service.validate_room_exists(roomID, websocket)
         await self.room_domain_service.validate_player_in_room(playerID, roomID, websocket)
         await self.room_domain_service.validate_game_not_started(roomID, websocket)
 
-        await self.room_repository.setup_connection_room(playerID, roomID, websocket)
+        await self.room_repository.setup_connection_room(playerID, roomID, websocket, heartbeat)
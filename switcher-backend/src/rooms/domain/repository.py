@@ -13,7 +13,15 @@ from src.rooms.domain.models import (
 
 class RoomRepository(ABC):
     @abstractmethod
-    def create(self, room: RoomCreationRequest) -> RoomID:
+    def create(self, room: RoomCreationRequest, encrypted_password: Optional[str] = None) -> RoomID:
+        pass
+
+    @abstractmethod
+    async def encrypt_password(self, password: Optional[str]) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    async def verify_password(self, roomID: int, playerID: int, password: str, encrypted_password: str) -> bool:
         pass
 
     @abstractmethod
@@ -28,6 +36,10 @@ class RoomRepository(ABC):
     def get_all_rooms(self) -> list[RoomExtendedInfo]:
         pass
 
+    @abstractmethod
+    def get_extended_infos(self, roomIDs: list[int]) -> list[RoomExtendedInfo]:
+        pass
+
     @abstractmethod
     def get_player_count(self, roomID: int) -> int:
         pass
@@ -75,15 +87,19 @@ class RoomRepository(ABC):
 
 class RoomRepositoryWS(RoomRepository):
     @abstractmethod
-    async def setup_connection_room_list(self, websocket: WebSocket) -> None:
+    async def setup_connection_room_list(
+        self, websocket: WebSocket, events: bool = False, heartbeat: bool = False
+    ) -> None:
         pass
 
     @abstractmethod
-    async def setup_connection_room(self, playerID: int, roomID: int, websocket: WebSocket) -> None:
+    async def setup_connection_room(
+        self, playerID: int, roomID: int, websocket: WebSocket, heartbeat: bool = False
+    ) -> None:
         pass
 
     @abstractmethod
-    async def broadcast_status_room_list(self) -> None:
+    async def broadcast_status_room_list(self, roomID: int) -> None:
         pass
 
     @abstractmethod
@@ -1,6 +1,5 @@
 from typing import Optional
 
-import bcrypt
 from fastapi import HTTPException
 from fastapi.websockets import WebSocket, WebSocketDisconnect
 
@@ -18,7 +17,7 @@ class RepositoryValidators:
         self.player_repository = player_repository
 
     async def validate_room_exists(self, roomID: int, websocket: Optional[WebSocket] = None):
-        if self.room_repository.get(roomID) is not None:
+        if await self.room_repository.get(roomID) is not None:
             return
         if websocket is None:
             raise HTTPException(status_code=404, detail="La sala no existe.")
@@ -27,7 +26,7 @@ class RepositoryValidators:
             raise WebSocketDisconnect(4004, "La sala no existe.")
 
     async def validate_player_in_room(self, playerID: int, roomID: int, websocket: Optional[WebSocket] = None):
-        if self.room_repository.is_player_in_room(playerID, roomID):
+        if await self.room_repository.is_player_in_room(playerID, roomID):
             return
         if websocket is None:
             raise HTTPException(status_code=403, detail="El jugador no se encuentra en la sala.")
@@ -35,31 +34,33 @@ class RepositoryValidators:
             await websocket.accept()
             raise WebSocketDisconnect(4003, "El jugador no se encuentra en la sala.")
 
-    def validate_player_is_owner(self, playerID: int, roomID: int):
-        if not self.room_repository.is_owner(playerID, roomID):
+    async def validate_player_is_owner(self, playerID: int, roomID: int):
+        if not await self.room_repository.is_owner(playerID, roomID):
             raise HTTPException(status_code=403, detail="Solo el propietario puede iniciar la partida.")
 
-    def validate_room_full(self, roomID: int):
-        room = self.room_repository.get_public_info(roomID)
+    async def validate_room_full(self, roomID: int):
+        room = await self.room_repository.get_public_info(roomID)
         if room is None:
             raise HTTPException(status_code=404, detail="La sala no existe.")
         if len(room.players) >= room.maxPlayers:
             raise HTTPException(status_code=403, detail="La sala está llena.")
 
-    def validate_room_password(self, roomID: int, password: Optional[str] = None):
-        room = self.room_repository.get(roomID)
+    async def validate_room_password(self, roomID: int, playerID: int, password: Optional[str] = None):
+        room = await self.room_repository.get(roomID)
 
         if room is None:
             raise HTTPException(status_code=404, detail="Sala no encontrada.")
 
         if room.password:
-            if not password or not bcrypt.checkpw(password.encode(), room.password.encode()):
+            if not password or not await self.room_repository.verify_password(
+                roomID, playerID, password, room.password
+            ):
                 raise HTTPException(status_code=403, detail="Contraseña incorrecta.")
         elif password:
             raise HTTPException(status_code=403, detail="La sala no tiene contraseña.")
 
     async def validate_game_not_started(self, roomID: int, websocket: Optional[WebSocket] = None):
-        if not self.room_repository.is_game_started(roomID):
+        if not await self.room_repository.is_game_started(roomID):
             return
         if websocket is None:
             raise HTTPException(status_code=403, detail="La partida ya ha comenzado.")
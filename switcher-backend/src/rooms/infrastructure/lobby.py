@@ -0,0 +1,227 @@
+import asyncio
+import logging
+import weakref
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from src.rooms.domain.models import RoomExtendedInfo
+from src.rooms.infrastructure.websocket import MessageType, ws_manager_room_list
+from src.shared.bus import BroadcastBus, InMemoryBus, bus
+from src.shared.config import LOBBY_BROADCAST_WINDOW_SECONDS
+
+# Lee de la base las salas indicadas, o todas si recibe None
+RoomReader = Callable[[Optional[List[int]]], Awaitable[List[RoomExtendedInfo]]]
+
+logger = logging.getLogger(__name__)
+
+
+class LobbyProjection:
+    """Lista de salas del lobby en memoria, cargada de la base una sola vez y actualizada sala por sala.
+    Cada cambio recibe una versión nueva; el cliente debe pedir la lista completa si se salta alguna.
+    Las versiones no se reinician al descartar la lista, para que un cliente nunca reciba una versión repetida.
+    """
+
+    rooms: Dict[int, RoomExtendedInfo]
+
+    def __init__(self):
+        self.rooms = {}
+        self.version = 0
+        self.loaded = False
+        self.locks = weakref.WeakKeyDictionary()
+
+    def clean_up(self):
+        """Descarta la lista cargada; se vuelve a leer de la base en el próximo uso"""
+        self.rooms.clear()
+        self.loaded = False
+
+    def lock(self) -> asyncio.Lock:
+        """Candado que serializa la carga y las actualizaciones, uno por event loop"""
+        loop = asyncio.get_running_loop()
+        if loop not in self.locks:
+            self.locks[loop] = asyncio.Lock()
+        return self.locks[loop]
+
+    async def ensure_loaded(self, read_rooms: RoomReader) -> None:
+        """Carga la lista de salas la primera vez que se usa
+
+        Args:
+            read_rooms (RoomReader): Lectura de salas de la base
+        """
+        if not self.loaded:
+            self.load(await read_rooms(None))
+
+    def load(self, rooms: List[RoomExtendedInfo]) -> None:
+        """Reemplaza la lista completa de salas
+
+        Args:
+            rooms (List[RoomExtendedInfo]): Salas leídas de la base
+        """
+        self.rooms = {room.roomID: room for room in rooms}
+        self.version += 1
+        self.loaded = True
+
+    def upsert(self, room: RoomExtendedInfo) -> Optional[int]:
+        """Agrega o reemplaza una sala
+
+        Args:
+            room (RoomExtendedInfo): Estado actual de la sala
+
+        Returns:
+            Optional[int]: Versión del cambio, o None si la sala no cambió
+        """
+        if self.rooms.get(room.roomID) == room:
+            return None
+        self.rooms[room.roomID] = room
+        self.version += 1
+        return self.version
+
+    def remove(self, roomID: int) -> Optional[int]:
+        """Quita una sala de la lista
+
+        Args:
+            roomID (int): ID de la sala
+
+        Returns:
+            Optional[int]: Versión del cambio, o None si la sala no estaba en la lista
+        """
+        if self.rooms.pop(roomID, None) is None:
+            return None
+        self.version += 1
+        return self.version
+
+    def room_list(self) -> List[dict]:
+        """Lista de salas ordenada por ID, tal como la envía el estado completo"""
+        return [self.rooms[roomID].model_dump() for roomID in sorted(self.rooms)]
+
+    def snapshot(self) -> dict:
+        """Lista completa de salas junto con la versión a partir de la cual se aplican los eventos"""
+        return {"version": self.version, "rooms": self.room_list()}
+
+
+class LobbyBroadcaster:
+    """Junta las salas que cambiaron y envía la lista de salas a lo sumo una vez por ventana.
+    Los cambios de una misma sala dentro de la ventana se combinan: se lee su estado final una sola vez y cada
+    cliente recibe un único mensaje por ventana, sin importar cuántos cambios hubo.
+    El estado final se publica en el bus para que cada worker actualice su propia lista y la envíe a sus clientes.
+    """
+
+    dirty: Set[int]
+
+    def __init__(
+        self,
+        projection: LobbyProjection,
+        bus: Optional[BroadcastBus] = None,
+        window: float = LOBBY_BROADCAST_WINDOW_SECONDS,
+    ):
+        self.projection = projection
+        self.window = window
+        self.dirty = set()
+        self.locks = weakref.WeakKeyDictionary()
+        self.bus = bus if bus is not None else InMemoryBus()
+        self.bus.subscribe("lobby.rooms", self.on_rooms)
+        self.read_rooms: Optional[RoomReader] = None
+        self.pending: Optional[asyncio.Task] = None
+        self.events = 0
+        self.flushes = 0
+        self.coalesced = 0
+
+    def clean_up(self):
+        """Descarta los cambios pendientes"""
+        if self.pending is not None:
+            self.pending.cancel()
+            self.pending = None
+        self.dirty.clear()
+        self.read_rooms = None
+
+    def metrics(self) -> dict:
+        """Cambios recibidos, envíos realizados y cambios que se combinaron con otro de la misma ventana"""
+        return {
+            "events": self.events,
+            "flushes": self.flushes,
+            "coalesced": self.coalesced,
+            "pending": len(self.dirty),
+        }
+
+    async def notify(self, roomID: int, read_rooms: RoomReader) -> None:
+        """Marca una sala como modificada y programa el envío de la ventana actual
+
+        Args:
+            roomID (int): ID de la sala que cambió
+            read_rooms (RoomReader): Lectura de salas con una sesión propia, ya que el envío puede ocurrir
+                después de terminado el request
+        """
+        self.events += 1
+        if self.dirty:
+            self.coalesced += 1
+        self.dirty.add(roomID)
+        self.read_rooms = read_rooms
+
+        if self.window <= 0:
+            await self.flush()
+        elif self.pending is None:
+            self.pending = asyncio.get_running_loop().create_task(self.flush_later())
+
+    async def flush_later(self) -> None:
+        await asyncio.sleep(self.window)
+        self.pending = None
+        try:
+            await self.flush()
+        except Exception:
+            # Nadie espera esta tarea: el error se registra y las salas quedan pendientes para el próximo envío
+            logger.exception("No se pudo enviar la lista de salas al lobby")
+
+    def lock(self) -> asyncio.Lock:
+        """Candado que mantiene el orden de los envíos de este worker, uno por event loop"""
+        loop = asyncio.get_running_loop()
+        if loop not in self.locks:
+            self.locks[loop] = asyncio.Lock()
+        return self.locks[loop]
+
+    async def flush(self) -> None:
+        """Lee el estado final de las salas modificadas y lo publica para todos los workers.
+        Si la lectura o la publicación fallan, las salas vuelven a quedar pendientes.
+        """
+        if not self.dirty:
+            return
+        roomIDs, self.dirty = sorted(self.dirty), set()
+        read_rooms = self.read_rooms
+        self.flushes += 1
+
+        async with self.lock():
+            try:
+                rooms = await read_rooms(roomIDs)
+                found = {room.roomID for room in rooms}
+                await self.bus.publish(
+                    "lobby.rooms",
+                    {
+                        "rooms": [room.model_dump() for room in rooms],
+                        "removed": [roomID for roomID in roomIDs if roomID not in found],
+                    },
+                )
+            except BaseException:
+                self.dirty.update(roomIDs)
+                raise
+
+    async def on_rooms(self, message: dict) -> None:
+        """Aplica los cambios publicados a la lista de este worker y los envía a sus clientes.
+        Si la lista todavía no se cargó no hay nada que actualizar: se leerá completa con el primer cliente.
+        """
+        async with self.projection.lock():
+            if not self.projection.loaded:
+                return
+
+            events = []
+            for room in map(RoomExtendedInfo.model_validate, message["rooms"]):
+                version = self.projection.upsert(room)
+                if version is not None:
+                    events.append((MessageType.ROOM_UPSERT, {"version": version, "room": room.model_dump()}))
+            for roomID in message["removed"]:
+                version = self.projection.remove(roomID)
+                if version is not None:
+                    events.append((MessageType.ROOM_REMOVED, {"version": version, "roomID": roomID}))
+
+            if events:
+                await ws_manager_room_list.broadcast_events(events, self.projection.room_list)
+
+
+lobby_rooms = LobbyProjection()
+lobby_broadcaster = LobbyBroadcaster(lobby_rooms, bus)
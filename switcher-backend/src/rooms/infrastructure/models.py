@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from src.database import Base
@@ -15,7 +15,7 @@ class Room(Base):
 
     hostID = Column(Integer, ForeignKey("players.playerID"))
 
-    players = relationship("Player", secondary="player_room", back_populates="rooms")
+    players = relationship("Player", secondary="player_room", back_populates="rooms", order_by="Player.playerID")
     game = relationship("Game", back_populates="room", uselist=False)
 
     def __repr__(self):
@@ -29,3 +29,6 @@ class PlayerRoom(Base):
     roomID = Column(Integer, ForeignKey("rooms.roomID", ondelete="CASCADE"), primary_key=True)
     position = Column(Integer, nullable=True, default=0)
     isActive = Column(Boolean, nullable=True, default=True)
+
+    # Jugadores de una sala y búsqueda del turno por posición; la clave primaria empieza por playerID
+    __table_args__ = (Index("ix_player_room_room_position", "roomID", "position", "playerID", "isActive"),)
@@ -0,0 +1,77 @@
+import asyncio
+import hashlib
+import hmac
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+import bcrypt
+
+from src.shared.config import PASSWORD_CACHE_SIZE, PASSWORD_HASH_WORKERS
+
+
+class PasswordHasher:
+    """Calcula y verifica contraseñas de salas con bcrypt en un pool de hilos acotado.
+    Cada cálculo tarda cientos de milisegundos de CPU, por lo que nunca corre en el event loop ni en el hilo de
+    base de datos. Las verificaciones exitosas se recuerdan por (sala, jugador) junto con el hash verificado y un
+    HMAC de la contraseña enviada, con una clave aleatoria del proceso: un jugador que vuelve a entrar con la misma
+    contraseña no paga el costo otra vez, una contraseña distinta se verifica con bcrypt y un cambio de contraseña de
+    la sala invalida la entrada.
+    """
+
+    verified: "OrderedDict[Tuple[int, int], Tuple[str, bytes]]"
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, cache_size: int = PASSWORD_CACHE_SIZE):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+        self.cache_size = cache_size
+        self.verified = OrderedDict()
+        self.key = os.urandom(32)
+
+    def clean_up(self):
+        """Olvida las verificaciones recordadas"""
+        self.verified.clear()
+
+    async def hash(self, password: Optional[str]) -> Optional[str]:
+        """Calcula el hash de una contraseña
+
+        Args:
+            password (Optional[str]): Contraseña en texto plano
+
+        Returns:
+            Optional[str]: Hash bcrypt, o None si no hay contraseña
+        """
+        if not password:
+            return None
+        loop = asyncio.get_running_loop()
+        hashed = await loop.run_in_executor(self.executor, bcrypt.hashpw, password.encode(), bcrypt.gensalt())
+        return hashed.decode()
+
+    async def verify(self, roomID: int, playerID: int, password: str, hashed: str) -> bool:
+        """Verifica la contraseña de una sala, reutilizando una verificación exitosa del mismo jugador
+
+        Args:
+            roomID (int): ID de la sala
+            playerID (int): ID del jugador
+            password (str): Contraseña en texto plano
+            hashed (str): Hash guardado de la sala
+        """
+        key = (roomID, playerID)
+        digest = hmac.new(self.key, password.encode(), hashlib.sha256).digest()
+        cached = self.verified.get(key)
+        if cached is not None and cached[0] == hashed and hmac.compare_digest(cached[1], digest):
+            self.verified.move_to_end(key)
+            return True
+
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(self.executor, bcrypt.checkpw, password.encode(), hashed.encode()):
+            return False
+
+        self.verified[key] = (hashed, digest)
+        self.verified.move_to_end(key)
+        if len(self.verified) > self.cache_size:
+            self.verified.popitem(last=False)
+        return True
+
+
+password_hasher = PasswordHasher()
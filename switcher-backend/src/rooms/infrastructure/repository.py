@@ -1,11 +1,14 @@
+import functools
 import json
 from typing import List, Optional
 
-import bcrypt
 from fastapi.websockets import WebSocket
+from sqlalchemy import Engine, and_, func
 from sqlalchemy.orm import Session
 
+from src.database import after_commit, commit, run_db, run_read, writes
 from src.games.domain.models import GameID
+from src.games.infrastructure.models import Game as GameDB
 from src.players.domain.models import Player
 from src.rooms.domain.models import Room as RoomDomain
 from src.rooms.domain.models import (
@@ -15,7 +18,9 @@ from src.rooms.domain.models import (
     RoomPublicInfo,
 )
 from src.rooms.domain.repository import RoomRepository, RoomRepositoryWS
+from src.rooms.infrastructure.lobby import lobby_broadcaster, lobby_rooms
 from src.rooms.infrastructure.models import PlayerRoom, Room
+from src.rooms.infrastructure.passwords import password_hasher
 from src.rooms.infrastructure.websocket import (
     MessageType,
     ws_manager_room,
@@ -27,9 +32,8 @@ class SQLAlchemyRepository(RoomRepository):
     def __init__(self, db_session: Session):
         self.db_session = db_session
 
-    def create(self, room: RoomCreationRequest) -> RoomID:
-        encrypted_password = self.encrypt_password(room.password) if room.password else None
-
+    @writes
+    def create(self, room: RoomCreationRequest, encrypted_password: Optional[str] = None) -> RoomID:
         room = Room(
             roomName=room.roomName,
             minPlayers=room.minPlayers,
@@ -39,7 +43,7 @@ class SQLAlchemyRepository(RoomRepository):
         )
 
         self.db_session.add(room)
-        self.db_session.commit()
+        commit(self.db_session)
         self.db_session.refresh(room)
 
         return RoomID(roomID=room.roomID)
@@ -78,38 +82,41 @@ class SQLAlchemyRepository(RoomRepository):
         )
 
     def get_all_rooms(self) -> List[RoomExtendedInfo]:
-        all_rooms = self.db_session.query(Room).order_by(Room.roomID).all()
-        room_list = [
-            RoomExtendedInfo(
-                roomID=room.roomID,
-                roomName=room.roomName,
-                minPlayers=room.minPlayers,
-                maxPlayers=room.maxPlayers,
-                actualPlayers=len(
-                    [
-                        player
-                        for player in room.players
-                        if self.db_session.query(PlayerRoom)
-                        .filter_by(playerID=player.playerID, roomID=room.roomID)
-                        .one()
-                        .isActive
-                    ]
-                ),
-                started=room.game is not None,
-                private=room.password is not None,
-                playersID=[
-                    player.playerID
-                    for player in room.players
-                    if self.db_session.query(PlayerRoom)
-                    .filter_by(playerID=player.playerID, roomID=room.roomID)
-                    .one()
-                    .isActive
-                ],
+        rows = self.room_list_query().order_by(Room.roomID).all()
+        return [self.to_extended_info(row) for row in rows]
+
+    def get_extended_infos(self, roomIDs: List[int]) -> List[RoomExtendedInfo]:
+        rows = self.room_list_query().filter(Room.roomID.in_(roomIDs)).order_by(Room.roomID).all()
+        return [self.to_extended_info(row) for row in rows]
+
+    def room_list_query(self):
+        # Una sola consulta para toda la lista: los jugadores activos se agrupan por sala
+        return (
+            self.db_session.query(
+                Room.roomID,
+                Room.roomName,
+                Room.maxPlayers,
+                GameDB.gameID.isnot(None).label("started"),
+                Room.password.isnot(None).label("private"),
+                func.group_concat(PlayerRoom.playerID).label("playersID"),
             )
-            for room in all_rooms
-        ]
+            .outerjoin(GameDB, GameDB.roomID == Room.roomID)
+            .outerjoin(PlayerRoom, and_(PlayerRoom.roomID == Room.roomID, PlayerRoom.isActive.is_(True)))
+            .group_by(Room.roomID)
+        )
 
-        return room_list
+    @staticmethod
+    def to_extended_info(row) -> RoomExtendedInfo:
+        playersID = sorted(int(playerID) for playerID in row.playersID.split(",")) if row.playersID else []
+        return RoomExtendedInfo(
+            roomID=row.roomID,
+            roomName=row.roomName,
+            maxPlayers=row.maxPlayers,
+            actualPlayers=len(playersID),
+            started=row.started,
+            private=row.private,
+            playersID=playersID,
+        )
 
     def get_player_count(self, roomID: int) -> int:
         room = self.get(roomID)
@@ -123,6 +130,7 @@ class SQLAlchemyRepository(RoomRepository):
             raise ValueError(f"Room with ID {roomID} not found")
         return room.players
 
+    @writes
     def update(self, room: Room) -> None:
         self.db_session.query(Room).filter(Room.roomID == room.roomID).update(
             {
@@ -131,27 +139,30 @@ class SQLAlchemyRepository(RoomRepository):
                 "maxPlayers": room.maxPlayers,
             }
         )
-        self.db_session.commit()
+        commit(self.db_session)
         self.db_session.refresh(room)
 
+    @writes
     def delete_and_clean(self, roomID: int) -> None:
         if self.db_session.query(Room).filter(Room.roomID == roomID).one_or_none() is None:
             raise ValueError(f"Room with ID {roomID} not found")
         self.db_session.query(PlayerRoom).filter(PlayerRoom.roomID == roomID).delete()
         self.db_session.query(Room).filter(Room.roomID == roomID).delete()
-        self.db_session.commit()
+        commit(self.db_session)
 
+    @writes
     def add_player_to_room(self, playerID: int, roomID: int) -> None:
         player_join_room = PlayerRoom(roomID=roomID, playerID=playerID)
         self.db_session.add(player_join_room)
-        self.db_session.commit()
+        commit(self.db_session)
 
+    @writes
     def remove_player_from_room(self, playerID: int, roomID: int) -> None:
         player_in_room = self.db_session.query(PlayerRoom).filter(
             PlayerRoom.playerID == playerID, PlayerRoom.roomID == roomID
         )
         player_in_room.delete()
-        self.db_session.commit()
+        commit(self.db_session)
 
     def is_owner(self, playerID: int, roomID: int) -> bool:
         room = self.db_session.query(Room).filter_by(hostID=playerID, roomID=roomID).one_or_none()
@@ -165,16 +176,18 @@ class SQLAlchemyRepository(RoomRepository):
         room = self.db_session.query(Room).filter_by(roomID=roomID).one_or_none()
         return room.game is not None
 
+    @writes
     def set_position(self, playerID: int, position: int, roomID: int) -> None:
         self.db_session.query(PlayerRoom).filter(PlayerRoom.playerID == playerID, PlayerRoom.roomID == roomID).update(
             {"position": position}
         )
-        self.db_session.commit()
+        commit(self.db_session)
 
-    def encrypt_password(self, password: str) -> str:
-        if password is None:
-            return None
-        return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    async def encrypt_password(self, password: Optional[str]) -> Optional[str]:
+        return await password_hasher.hash(password)
+
+    async def verify_password(self, roomID: int, playerID: int, password: str, encrypted_password: str) -> bool:
+        return await password_hasher.verify(roomID, playerID, password, encrypted_password)
 
     def get_first_turn(self, roomID: int) -> int:
         return (
@@ -193,22 +206,67 @@ class SQLAlchemyRepository(RoomRepository):
         )
 
 
+async def read_rooms(db_session: Session, roomIDs: Optional[List[int]] = None) -> List[RoomExtendedInfo]:
+    """Lee salas de la lista de salas
+
+    Args:
+        db_session (Session): Sesión que indica la base de datos a leer
+        roomIDs (Optional[List[int]]): Salas a leer, o None para leer todas
+    """
+    return await run_read(
+        db_session,
+        lambda read_session: (
+            SQLAlchemyRepository(read_session).get_all_rooms()
+            if roomIDs is None
+            else SQLAlchemyRepository(read_session).get_extended_infos(roomIDs)
+        ),
+    )
+
+
+async def read_rooms_in_new_session(bind: Engine, roomIDs: Optional[List[int]] = None) -> List[RoomExtendedInfo]:
+    """Lee salas con una sesión propia, ya que puede correr después de cerrada la sesión del request
+
+    Args:
+        bind (Engine): Motor de la base a leer
+        roomIDs (Optional[List[int]]): Salas a leer, o None para leer todas
+    """
+    db_session = Session(bind=bind)
+    try:
+        return await read_rooms(db_session, roomIDs)
+    finally:
+        await run_db(db_session.close)
+
+
 class WebSocketRepository(RoomRepositoryWS, SQLAlchemyRepository):
-    async def setup_connection_room_list(self, websocket: WebSocket) -> None:
+    async def setup_connection_room_list(
+        self, websocket: WebSocket, events: bool = False, heartbeat: bool = False
+    ) -> None:
         """Establece la conexión con el websocket lista de salas
         y le envia el estado actual de la lista de salas
 
         Args:
-            playerID (int): ID del jugador
             websocket (WebSocket): Conexión con el cliente
+            events (bool): Si el cliente recibe eventos versionados por sala en lugar de la lista completa
+            heartbeat (bool): Si el cliente responde a los pings del servidor
         """
-        await ws_manager_room_list.connect(websocket)
-        room_list = self.get_all_rooms()
-        room_list_json = [room.model_dump() for room in room_list]
-        await ws_manager_room_list.send_personal_message(MessageType.STATUS, room_list_json, websocket)
-        await ws_manager_room_list.keep_listening(websocket)
-
-    async def setup_connection_room(self, playerID: int, roomID: int, websocket: WebSocket) -> None:
+        await ws_manager_room_list.connect(websocket, events, heartbeat)
+        try:
+            async with lobby_rooms.lock():
+                await lobby_rooms.ensure_loaded(functools.partial(read_rooms, self.db_session))
+                payload = lobby_rooms.snapshot() if events else lobby_rooms.room_list()
+            await ws_manager_room_list.send_personal_message(MessageType.STATUS, payload, websocket)
+
+            # La sesión del handshake se libera mientras la conexión queda abierta
+            await run_db(self.db_session.close)
+            await ws_manager_room_list.keep_listening(websocket, lobby_rooms.snapshot if events else None)
+        except BaseException:
+            # La conexión termina sin pasar por disconnect, por ejemplo si se cancela la tarea al apagar el servidor
+            ws_manager_room_list.forget(websocket)
+            raise
+
+    async def setup_connection_room(
+        self, playerID: int, roomID: int, websocket: WebSocket, heartbeat: bool = False
+    ) -> None:
         """Establece la conexión con el websocket de una sala
         y le envia el estado actual de la sala
 
@@ -216,20 +274,32 @@ class WebSocketRepository(RoomRepositoryWS, SQLAlchemyRepository):
             playerID (int): ID del jugador
             roomID (int): ID de la sala
             websocket (WebSocket): Conexión con el cliente
+            heartbeat (bool): Si el cliente responde a los pings del servidor
         """
-        await ws_manager_room.connect(playerID, roomID, websocket)
-        room = self.get_public_info(roomID)
-        if room is None:
-            raise ValueError(f"Room with ID {roomID} not found")
-        room_json = room.model_dump()
-        await ws_manager_room.send_personal_message(MessageType.STATUS, room_json, websocket)
-        await ws_manager_room.keep_listening(websocket)
+        await ws_manager_room.connect(playerID, roomID, websocket, heartbeat)
+        try:
+            room = await run_db(self.get_public_info, roomID)
+            if room is None:
+                raise ValueError(f"Room with ID {roomID} not found")
+            room_json = room.model_dump()
+            await ws_manager_room.send_personal_message(MessageType.STATUS, room_json, websocket)
+
+            # La sesión del handshake se libera mientras la conexión queda abierta
+            await run_db(self.db_session.close)
+            await ws_manager_room.keep_listening(websocket)
+        except BaseException:
+            # La conexión termina sin pasar por disconnect, por ejemplo si se cancela la tarea al apagar el servidor
+            ws_manager_room.forget(websocket)
+            raise
+
+    async def broadcast_status_room_list(self, roomID: int) -> None:
+        """Marca una sala como modificada; el cambio se envía a los clientes conectados a la lista de salas
+        junto con el resto de los cambios de la ventana actual
 
-    async def broadcast_status_room_list(self) -> None:
-        """Envía la lista de salas (actualizada) a todos los clientes conectados a la lista de salas"""
-        room_list = self.get_all_rooms()
-        room_list_json = [room.model_dump() for room in room_list]
-        await ws_manager_room_list.broadcast(MessageType.STATUS, room_list_json)
+        Args:
+            roomID (int): ID de la sala que cambió
+        """
+        await lobby_broadcaster.notify(roomID, functools.partial(read_rooms_in_new_session, self.db_session.get_bind()))
 
     async def broadcast_status_room(self, roomID: int) -> None:
         """Envía el estado de la sala (actualizado) a todos los clientes conectados a la sala
@@ -237,7 +307,7 @@ class WebSocketRepository(RoomRepositoryWS, SQLAlchemyRepository):
         Args:
             roomID (int): ID de la sala
         """
-        room = self.get_public_info(roomID)
+        room = await run_db(self.get_public_info, roomID)
         if room is None:
             raise ValueError(f"Room with ID {roomID} not found")
         room_json = room.model_dump()
@@ -254,21 +324,29 @@ class WebSocketRepository(RoomRepositoryWS, SQLAlchemyRepository):
         await ws_manager_room.broadcast(MessageType.START_GAME, game_info_json, roomID)
 
     async def broadcast_room_cancellation(self, roomID: int) -> None:
-        """Envía la señal de cancelación de sala a todos los clientes conectados a la sala
+        """Envía la señal de cancelación de sala a todos los clientes conectados a la sala, una vez confirmados los
+        cambios
 
         Args:
             roomID (int): ID de la sala
         """
         room_json = "{}"
-        players = self.get_players(roomID)
+        players = await run_db(self.get_players, roomID)
         for player in players:
-            await ws_manager_room.send_personal_message_by_id(MessageType.END_ROOM, room_json, player.playerID, roomID)
+            await after_commit(
+                self.db_session,
+                ws_manager_room.send_personal_message_by_id,
+                MessageType.END_ROOM,
+                room_json,
+                player.playerID,
+                roomID,
+            )
 
     async def disconnect_player(self, playerID: int, roomID: int) -> None:
-        """Remueve al jugador de la lista de conexiones activas
+        """Remueve al jugador de la lista de conexiones activas, una vez confirmados los cambios
 
         Args:
             playerID (int): ID del jugador
             gameID (int): ID del juego
         """
-        await ws_manager_room.disconnect_by_id_room(playerID, roomID)
+        await after_commit(self.db_session, ws_manager_room.disconnect_by_id_room, playerID, roomID)
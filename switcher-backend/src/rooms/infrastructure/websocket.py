@@ -1,57 +1,96 @@
 from enum import Enum
-from typing import Dict, List
+from typing import Callable, List, Optional, Set, Tuple
 
-from fastapi.websockets import WebSocket, WebSocketDisconnect, WebSocketState
+from fastapi.websockets import WebSocket, WebSocketDisconnect
+
+from src.shared.bus import BroadcastBus, InMemoryBus, bus
+from src.shared.websocket import ConnectionHub, encode_frame, heartbeats, outbound_queues
 
 
 class MessageType(str, Enum):
     STATUS = "status"
+    ROOM_UPSERT = "room_upsert"
+    ROOM_REMOVED = "room_removed"
+    ROOM_EVENTS = "room_events"
     START_GAME = "start"
     END_ROOM = "end"
 
 
 class ConnectionManagerRoomList:
-    active_connections: List[WebSocket]
+    active_connections: ConnectionHub
+    event_connections: Set[WebSocket]
 
     def __init__(self):
-        self.active_connections = []
+        self.active_connections = ConnectionHub()
+        self.event_connections = set()
 
     def clean_up(self):
         """Limpia la lista de conexiones activas"""
-        self.active_connections = []
+        self.active_connections.clean_up()
+        self.event_connections.clear()
+
+    def wants_events(self, websocket: WebSocket) -> bool:
+        """Indica si la conexión recibe eventos por sala en lugar de la lista completa
+
+        Args:
+            websocket (WebSocket): Conexión con el cliente
+        """
+        return websocket in self.event_connections
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, events: bool = False, heartbeat: bool = False):
         """Acepta la conexión con el cliente y la almacena.
 
         Args:
             websocket (WebSocket): Conexión con el cliente
+            events (bool): Si el cliente recibe eventos versionados por sala
+            heartbeat (bool): Si el cliente responde a los pings del servidor
         """
         await websocket.accept()
-        self.active_connections.append(websocket)
-
-    async def keep_listening(self, websocket: WebSocket):
+        outbound_queues.open(websocket)
+        self.active_connections.subscribe(None, websocket)
+        if events:
+            self.event_connections.add(websocket)
+        if heartbeat:
+            heartbeats.track(websocket)
+
+    async def keep_listening(self, websocket: WebSocket, snapshot: Optional[Callable[[], dict]] = None):
         """Mantiene la conexión abierta con el cliente por tiempo indefinido
 
         Args:
             websocket (WebSocket): Conexión con el cliente
+            snapshot (Optional[Callable[[], dict]]): Construye la lista completa que pide el cliente
+                al detectar un salto de versión
         """
         try:
             while True:
-                await websocket.receive_text()
+                data = await heartbeats.receive(websocket, websocket.receive_json)
+                if data.get("type") == "snapshot" and snapshot is not None:
+                    await self.send_personal_message(MessageType.STATUS, snapshot(), websocket)
 
-        except WebSocketDisconnect:
-            await self.disconnect(websocket)
+        except WebSocketDisconnect as e:
+            await self.disconnect(websocket, e.code, e.reason)
 
-    async def disconnect(self, websocket: WebSocket):
+    async def disconnect(self, websocket: WebSocket, code: int = 1000, reason: Optional[str] = None):
         """Remueve al cliente de la lista de conexiones activas
 
         Args:
             websocket (WebSocket): Conexión con el cliente
+            code (int): Código de cierre
+            reason (Optional[str]): Motivo del cierre
         """
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        if websocket.client_state != WebSocketState.DISCONNECTED:
-            await websocket.close()
+        await outbound_queues.close(websocket, code, reason)
+        self.forget(websocket)
+
+    def forget(self, websocket: WebSocket):
+        """Quita la conexión de todos los registros, descartando los mensajes pendientes
+
+        Args:
+            websocket (WebSocket): Conexión con el cliente
+        """
+        outbound_queues.discard(websocket)
+        self.active_connections.unsubscribe(websocket)
+        self.event_connections.discard(websocket)
+        heartbeats.untrack(websocket)
 
     async def send_personal_message(self, type: MessageType, payload, websocket: WebSocket):
         """Envía un mensaje personalizado al cliente
@@ -61,8 +100,8 @@ class ConnectionManagerRoomList:
             payload (str): Cuerpo del mensaje
             websocket (WebSocket): Conexión con el cliente
         """
-        message = {"type": type, "payload": payload}
-        await websocket.send_json(message)
+        frame = encode_frame(type, payload)
+        outbound_queues.send(websocket, frame)
 
     async def broadcast(self, type: MessageType, payload):
         """Envía un mensaje a todos los clientes conectados
@@ -71,22 +110,54 @@ class ConnectionManagerRoomList:
             type (str): Tipo de mensaje
             payload (str): Cuerpo del mensaje
         """
-        message = {"type": type, "payload": payload}
-        for connection in self.active_connections:
-            await connection.send_json(message)
+        frame = encode_frame(type, payload)
+        for connection in self.active_connections.members(None):
+            outbound_queues.send(connection, frame)
+
+    async def broadcast_events(self, events: List[Tuple[MessageType, dict]], room_list: Callable[[], List[dict]]):
+        """Envía los cambios de salas en un único mensaje a los clientes que reciben eventos
+        y la lista completa al resto
+
+        Args:
+            events (List[Tuple[MessageType, dict]]): Tipo y cuerpo de cada evento, en orden de versión
+            room_list (Callable[[], List[dict]]): Construye la lista completa, solo si algún cliente la necesita
+        """
+        if len(events) == 1:
+            event_frame = encode_frame(*events[0])
+        else:
+            event_frame = encode_frame(
+                MessageType.ROOM_EVENTS, [{"type": type, "payload": payload} for type, payload in events]
+            )
+        status_frame = None
+        for connection in self.active_connections.members(None):
+            if connection in self.event_connections:
+                outbound_queues.send(connection, event_frame)
+                continue
+            if status_frame is None:
+                status_frame = encode_frame(MessageType.STATUS, room_list())
+            outbound_queues.send(connection, status_frame)
 
 
 class ConnectionManagerRoom:
-    active_connections: Dict[int, Dict[int, WebSocket]]
+    """Conexiones de los jugadores a las salas en este worker.
+    Los mensajes dirigidos a una sala o a un jugador se publican en el bus, y cada worker los entrega
+    a las conexiones que tiene abiertas.
+    """
 
-    def __init__(self):
-        self.active_connections = {}
+    active_connections: ConnectionHub
+
+    def __init__(self, bus: Optional[BroadcastBus] = None):
+        self.active_connections = ConnectionHub()
+        self.bus = bus if bus is not None else InMemoryBus()
+        self.bus.subscribe("room.broadcast", self.on_broadcast)
+        self.bus.subscribe("room.send", self.on_send)
+        self.bus.subscribe("room.disconnect", self.on_disconnect)
 
     def clean_up(self):
         """Limpia la lista de conexiones activas"""
-        self.active_connections.clear()
+        self.active_connections.clean_up()
 
-    async def connect(self, playerID: int, roomID: int, websocket: WebSocket):
+    async def connect(self, playerID: int, roomID: int, websocket: WebSocket, heartbeat: bool = False):
         """Acepta la conexión con el cliente y la almacena.
         En caso de que ese jugador ya esté conectado a esa sala, se cierra la conexión anterior.
 
@@ -94,14 +165,16 @@ class ConnectionManagerRoom:
             playerID (int): ID del jugador
             roomID (int): ID de la sala
             websocket (WebSocket): Conexión con el cliente
+            heartbeat (bool): Si el cliente responde a los pings del servidor
         """
         await websocket.accept()
-        if roomID in self.active_connections:
-            if playerID in self.active_connections[roomID]:
-                await self.active_connections[roomID][playerID].close(4005, "Conexión abierta en otra pestaña")
-        if roomID not in self.active_connections:
-            self.active_connections[roomID] = {}
-        self.active_connections[roomID][playerID] = websocket
+        outbound_queues.open(websocket)
+        previous = self.active_connections.subscribe(roomID, websocket, playerID)
+        if previous is not None:
+            heartbeats.untrack(previous)
+            await outbound_queues.close(previous, 4005, "Conexión abierta en otra pestaña")
+        if heartbeat:
+            heartbeats.track(websocket)
 
     async def keep_listening(self, websocket: WebSocket):
         """Mantiene la conexión abierta con el cliente por tiempo indefinido
@@ -111,28 +184,31 @@ class ConnectionManagerRoom:
         """
         try:
             while True:
-                await websocket.receive_text()
+                await heartbeats.receive(websocket, websocket.receive_text)
 
-        except WebSocketDisconnect:
-            await self.disconnect(websocket)
+        except WebSocketDisconnect as e:
+            await self.disconnect(websocket, e.code, e.reason)
 
-    async def disconnect(self, websocket: WebSocket):
+    async def disconnect(self, websocket: WebSocket, code: int = 1000, reason: Optional[str] = None):
         """Remueve al cliente de la lista de conexiones activas y cierra la conexión en caso de que no esté cerrada
 
         Args:
             websocket (WebSocket): Conexión con el cliente
+            code (int): Código de cierre
+            reason (Optional[str]): Motivo del cierre
         """
-        if websocket.client_state != WebSocketState.DISCONNECTED:
-            await websocket.close()
-        active_connections = self.active_connections.copy()
-        for roomID in active_connections:
-            if websocket in active_connections[roomID].values():
-                playerID = list(active_connections[roomID].keys())[
-                    list(active_connections[roomID].values()).index(websocket)
-                ]
-                self.active_connections[roomID].pop(playerID)
-                if not self.active_connections[roomID]:
-                    self.active_connections.pop(roomID)
+        await outbound_queues.close(websocket, code, reason)
+        self.forget(websocket)
+
+    def forget(self, websocket: WebSocket):
+        """Quita la conexión de todos los registros, descartando los mensajes pendientes
+
+        Args:
+            websocket (WebSocket): Conexión con el cliente
+        """
+        outbound_queues.discard(websocket)
+        heartbeats.untrack(websocket)
+        self.active_connections.unsubscribe(websocket)
 
     async def disconnect_by_id_room(self, playerID: int, roomID: int):
         """Remueve al cliente de la lista de conexiones activas y cierra la conexión en caso de que no esté cerrada
@@ -141,14 +217,12 @@ class ConnectionManagerRoom:
             playerID (int): ID del jugador
             roomID (int): ID de la sala
         """
-        if roomID in self.active_connections:
-            if playerID in self.active_connections[roomID]:
-                websocket = self.active_connections[roomID][playerID]
-                if websocket.client_state != WebSocketState.DISCONNECTED:
-                    await websocket.close()
-                self.active_connections[roomID].pop(playerID)
-                if not self.active_connections[roomID]:
-                    self.active_connections.pop(roomID)
+        await self.bus.publish("room.disconnect", {"playerID": playerID, "roomID": roomID})
+
+    async def on_disconnect(self, message: dict):
+        websocket = self.active_connections.get(message["roomID"], message["playerID"])
+        if websocket is not None:
+            await self.disconnect(websocket)
 
     async def send_personal_message(self, type: MessageType, payload: str, websocket: WebSocket):
         """Envía un mensaje personalizado al cliente
@@ -158,8 +232,8 @@ class ConnectionManagerRoom:
             payload (str): Cuerpo del mensaje
             websocket (WebSocket): Conexión con el cliente
         """
-        message = {"type": type, "payload": payload}
-        await websocket.send_json(message)
+        frame = encode_frame(type, payload)
+        outbound_queues.send(websocket, frame)
 
     async def send_personal_message_by_id(self, type: MessageType, payload: str, playerID: int, roomID: int):
         """Envía un mensaje personalizado al cliente
@@ -170,10 +244,12 @@ class ConnectionManagerRoom:
             playerID (int): ID del jugador
             roomID (int): ID de la sala
         """
-        message = {"type": type, "payload": payload}
-        if roomID in self.active_connections:
-            if playerID in self.active_connections[roomID]:
-                await self.active_connections[roomID][playerID].send_json(message)
+        await self.bus.publish("room.send", {"type": type, "payload": payload, "playerID": playerID, "roomID": roomID})
+
+    async def on_send(self, message: dict):
+        websocket = self.active_connections.get(message["roomID"], message["playerID"])
+        if websocket is not None:
+            outbound_queues.send(websocket, encode_frame(message["type"], message["payload"]))
 
     async def broadcast(self, type: MessageType, payload: str, roomID: int):
         """Envía un mensaje a todos los clientes conectados a la sala
@@ -183,11 +259,15 @@ class ConnectionManagerRoom:
             payload (str): Cuerpo del mensaje
             roomID (int): ID de la sala
         """
-        message = {"type": type, "payload": payload}
-        if roomID in self.active_connections:
-            for connection in self.active_connections[roomID].values():
-                await connection.send_json(message)
+        await self.bus.publish("room.broadcast", {"type": type, "payload": payload, "roomID": roomID})
+
+    async def on_broadcast(self, message: dict):
+        connections = self.active_connections.members(message["roomID"])
+        if connections:
+            frame = encode_frame(message["type"], message["payload"])
+            for connection in connections:
+                outbound_queues.send(connection, frame)
 
 
 ws_manager_room_list = ConnectionManagerRoomList()
-ws_manager_room = ConnectionManagerRoom()
+ws_manager_room = ConnectionManagerRoom(bus)
@@ -1,11 +1,30 @@
+import asyncio
+import socket
+import threading
+import time
+from unittest.mock import patch
+
 import pytest
+import uvicorn
+from uvicorn.protocols.websockets.websockets_impl import WebSocketProtocol
+from fastapi.testclient import TestClient
 from fastapi.websockets import WebSocketDisconnect
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
 
 from src.conftest import override_get_db
+from src.database import Base, get_db
 from src.games.infrastructure.models import Game as GameDB
 from src.players.infrastructure.models import Player as PlayerDB
 from src.rooms.infrastructure.models import PlayerRoom as PlayerRoomDB
+from src.main import app, server_options
+from src.rooms.infrastructure.lobby import LobbyBroadcaster, LobbyProjection, lobby_broadcaster, lobby_rooms
 from src.rooms.infrastructure.models import Room as RoomDB
+from src.rooms.infrastructure.repository import SQLAlchemyRepository as RoomRepository
+from src.rooms.infrastructure.websocket import ws_manager_room_list
+from src.shared.bus import InMemoryBus
+from src.shared.config import WS_HEARTBEAT_CLOSE_CODE
+from src.shared.websocket import heartbeats
 
 
 def test_connect_to_room_list_websocket_user_not_exist(client, test_db):
@@ -249,7 +268,7 @@ def test_get_room_started(client, test_db):
     db.add(room1)
     db.commit()
     db.add(PlayerRoomDB(playerID=player1.playerID, roomID=room1.roomID))
-    game1 = GameDB(roomID=room1.roomID, board={}, lastMovements={}, prohibitedColor=None)
+    game1 = GameDB(roomID=room1.roomID, board="R" * 36, lastMovements={}, prohibitedColor=None)
     db.add(game1)
     db.commit()
 
@@ -267,3 +286,218 @@ def test_get_room_started(client, test_db):
                 "playersID": [1],
             },
         ]
+
+
+def test_open_websockets_release_pooled_connections(client, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.sqlite'}", pool_size=1, max_overflow=0, pool_timeout=5)
+    Base.metadata.create_all(bind=engine)
+    SmallPoolSession = sessionmaker(bind=engine)
+    with SmallPoolSession() as db:
+        db.add(PlayerDB(playerID=1, username="test user"))
+        db.commit()
+
+    def get_small_pool_db():
+        db = SmallPoolSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = get_small_pool_db
+    try:
+        with client.websocket_connect("/rooms/1") as first:
+            assert first.receive_json()["type"] == "status"
+            with client.websocket_connect("/rooms/1") as second:
+                assert second.receive_json()["type"] == "status"
+                with client.websocket_connect("/rooms/1") as third:
+                    assert third.receive_json()["type"] == "status"
+                assert engine.pool.checkedout() == 0
+    finally:
+        app.dependency_overrides[get_db] = override_get_db
+        lobby_rooms.clean_up()
+        engine.dispose()
+
+
+def test_room_list_events(client, test_db):
+    db = next(override_get_db())
+    db.add_all([PlayerDB(playerID=1, username="host"), PlayerDB(playerID=2, username="guest")])
+    db.commit()
+    room = {
+        "roomID": 1,
+        "roomName": "test room",
+        "maxPlayers": 4,
+        "actualPlayers": 1,
+        "started": False,
+        "private": False,
+        "playersID": [1],
+    }
+
+    with patch.object(RoomRepository, "get_all_rooms", autospec=True, side_effect=RoomRepository.get_all_rooms) as scan:
+        with client.websocket_connect("/rooms/2?events=true") as events, client.websocket_connect("/rooms/1") as legacy:
+            snapshot = events.receive_json()
+            version = snapshot["payload"]["version"]
+            assert snapshot == {"type": "status", "payload": {"version": version, "rooms": []}}
+            assert legacy.receive_json() == {"type": "status", "payload": []}
+
+            client.post("/rooms", json={"playerID": 1, "roomName": "test room", "minPlayers": 2, "maxPlayers": 4})
+            assert events.receive_json() == {"type": "room_upsert", "payload": {"version": version + 1, "room": room}}
+            assert legacy.receive_json() == {"type": "status", "payload": [room]}
+
+            client.put("/rooms/1/join", json={"playerID": 2})
+            room = {**room, "actualPlayers": 2, "playersID": [1, 2]}
+            assert events.receive_json() == {"type": "room_upsert", "payload": {"version": version + 2, "room": room}}
+            assert legacy.receive_json() == {"type": "status", "payload": [room]}
+
+            events.send_json({"type": "snapshot"})
+            assert events.receive_json() == {"type": "status", "payload": {"version": version + 2, "rooms": [room]}}
+
+            client.put("/rooms/1/leave", json={"playerID": 1})
+            assert events.receive_json() == {"type": "room_removed", "payload": {"version": version + 3, "roomID": 1}}
+            assert legacy.receive_json() == {"type": "status", "payload": []}
+
+    assert scan.call_count == 1
+
+
+def test_room_list_changes_are_coalesced_per_window(test_db):
+    db = next(override_get_db())
+    db.add_all([PlayerDB(playerID=playerID, username=f"player{playerID}") for playerID in range(1, 5)])
+    db.commit()
+    room = {"maxPlayers": 4, "started": False, "private": False}
+
+    # Un solo event loop para los requests y los websockets, así el envío diferido corre en el mismo loop
+    with TestClient(app) as client, patch.object(lobby_broadcaster, "window", 0.5):
+        metrics = client.get("/metrics").json()["lobby"]
+        with client.websocket_connect("/rooms/4?events=true") as events, client.websocket_connect("/rooms/4") as legacy:
+            version = events.receive_json()["payload"]["version"]
+            legacy.receive_json()
+
+            client.post("/rooms", json={"playerID": 1, "roomName": "room one", "minPlayers": 2, "maxPlayers": 4})
+            client.put("/rooms/1/join", json={"playerID": 2})
+            client.put("/rooms/1/join", json={"playerID": 3})
+            client.post("/rooms", json={"playerID": 4, "roomName": "room two", "minPlayers": 2, "maxPlayers": 4})
+
+            first = {**room, "roomID": 1, "roomName": "room one", "actualPlayers": 3, "playersID": [1, 2, 3]}
+            second = {**room, "roomID": 2, "roomName": "room two", "actualPlayers": 1, "playersID": [4]}
+            assert events.receive_json() == {
+                "type": "room_events",
+                "payload": [
+                    {"type": "room_upsert", "payload": {"version": version + 1, "room": first}},
+                    {"type": "room_upsert", "payload": {"version": version + 2, "room": second}},
+                ],
+            }
+            assert legacy.receive_json() == {"type": "status", "payload": [first, second]}
+
+            events.send_json({"type": "snapshot"})
+            assert events.receive_json()["payload"] == {"version": version + 2, "rooms": [first, second]}
+
+        assert client.get("/metrics").json()["lobby"] == {
+            "events": metrics["events"] + 4,
+            "flushes": metrics["flushes"] + 1,
+            "coalesced": metrics["coalesced"] + 3,
+            "pending": 0,
+        }
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_rooms_pending(caplog):
+    bus = InMemoryBus()
+    broadcaster = LobbyBroadcaster(LobbyProjection(), bus, window=0.01)
+    published, reads = [], []
+
+    async def on_rooms(message):
+        published.append(message)
+
+    bus.subscribe("lobby.rooms", on_rooms)
+
+    async def read_rooms(roomIDs):
+        reads.append(roomIDs)
+        if len(reads) == 1:
+            raise RuntimeError("database is locked")
+        return []
+
+    await broadcaster.notify(1, read_rooms)
+    await broadcaster.notify(2, read_rooms)
+    await asyncio.sleep(0.05)
+
+    assert published == []
+    assert broadcaster.dirty == {1, 2}
+    assert "No se pudo enviar la lista de salas" in caplog.text
+
+    await broadcaster.notify(3, read_rooms)
+    await asyncio.sleep(0.05)
+
+    assert reads == [[1, 2], [1, 2, 3]]
+    assert published == [{"rooms": [], "removed": [1, 2, 3]}]
+    assert broadcaster.dirty == set()
+
+
+def test_heartbeat_keeps_responsive_clients_and_reaps_silent_ones(test_db):
+    db = next(override_get_db())
+    db.add(PlayerDB(playerID=1, username="test user"))
+    db.commit()
+
+    with (
+        patch.object(heartbeats, "interval", 0.05),
+        patch.object(heartbeats, "timeout", 0.3),
+        TestClient(app) as client,
+    ):
+        reaped = client.get("/metrics").json()["websockets"]["reaped"]
+        with client.websocket_connect("/rooms/1?heartbeat=true") as websocket:
+            websocket.receive_json()
+
+            # Responde durante más tiempo que el plazo, por lo que la conexión sigue abierta
+            for _ in range(10):
+                assert websocket.receive_json() == {"type": "ping", "payload": None}
+                websocket.send_json({"type": "pong"})
+
+            with pytest.raises(WebSocketDisconnect) as e:
+                while True:
+                    assert websocket.receive_json()["type"] == "ping"
+            assert e.value.code == WS_HEARTBEAT_CLOSE_CODE
+
+        metrics = client.get("/metrics").json()["websockets"]
+        assert metrics["reaped"] == reaped + 1
+        assert metrics["heartbeat"] == 0
+        assert not ws_manager_room_list.active_connections
+
+
+class QuickCloseWebSocketProtocol(WebSocketProtocol):
+    """No espera los 10 segundos por defecto a que el cliente cierre el socket después del ping sin respuesta"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.close_timeout = 0.1
+
+
+def test_protocol_ping_reaps_silent_clients_without_heartbeat(test_db):
+    db = next(override_get_db())
+    db.add(PlayerDB(playerID=1, username="test user"))
+    db.commit()
+    assert server_options["ws"] == "websockets"
+    options = {**server_options, "ws": QuickCloseWebSocketProtocol, "ws_ping_interval": 0.1, "ws_ping_timeout": 0.1}
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", **options))
+    thread = threading.Thread(target=server.run)
+    thread.start()
+    try:
+        while not server.started:
+            time.sleep(0.01)
+        port = server.servers[0].sockets[0].getsockname()[1]
+
+        # Cliente que completa el handshake y nunca vuelve a leer ni responde los pings
+        with socket.create_connection(("127.0.0.1", port)) as client_socket:
+            client_socket.sendall(
+                b"GET /rooms/1 HTTP/1.1\r\nHost: 127.0.0.1\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                b"Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\nSec-WebSocket-Version: 13\r\n\r\n"
+            )
+            assert client_socket.recv(1024).startswith(b"HTTP/1.1 101")
+
+            deadline = time.monotonic() + 5
+            while not ws_manager_room_list.active_connections and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert ws_manager_room_list.active_connections
+            while ws_manager_room_list.active_connections and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert not ws_manager_room_list.active_connections
+    finally:
+        server.should_exit = True
+        thread.join()
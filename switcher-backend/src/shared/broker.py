@@ -0,0 +1,62 @@
+"""Broker del bus entre workers: reenvía cada línea que recibe a todos los workers conectados.
+
+Uso:
+    python -m src.shared.broker --path /tmp/switcher-bus.sock
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+from typing import Set
+
+from src.shared.bus import MESSAGE_LIMIT
+from src.shared.config import BUS_SOCKET_PATH
+
+
+class Broker:
+    writers: Set[asyncio.StreamWriter]
+
+    def __init__(self):
+        self.writers = set()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Reenvía los mensajes de un worker, en el orden en que llegan, a todos los workers
+
+        Args:
+            reader (asyncio.StreamReader): Mensajes del worker
+            writer (asyncio.StreamWriter): Conexión hacia el worker
+        """
+        self.writers.add(writer)
+        try:
+            while line := await reader.readline():
+                for connection in list(self.writers):
+                    connection.write(line)
+                await asyncio.gather(*(self.drain(connection) for connection in list(self.writers)))
+        finally:
+            self.writers.discard(writer)
+            writer.close()
+
+    async def drain(self, writer: asyncio.StreamWriter) -> None:
+        try:
+            await writer.drain()
+        except ConnectionError:
+            self.writers.discard(writer)
+
+    async def serve(self, path: str) -> asyncio.AbstractServer:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+        return await asyncio.start_unix_server(self.handle, path, limit=MESSAGE_LIMIT)
+
+
+async def main(path: str) -> None:
+    server = await Broker().serve(path)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default=BUS_SOCKET_PATH)
+    args = parser.parse_args()
+    asyncio.run(main(args.path))
@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import orjson
+
+from src.shared.config import (
+    BUS_BACKEND,
+    BUS_RECONNECT_DELAY_SECONDS,
+    BUS_RECONNECT_MAX_DELAY_SECONDS,
+    BUS_SOCKET_PATH,
+)
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Any], Awaitable[None]]
+
+# Tamaño máximo de una línea del bus, mayor al límite por defecto de asyncio para la lista de salas
+MESSAGE_LIMIT = 2**24
+
+# Tema que el bus entrega localmente al volver a conectarse: los mensajes publicados mientras estuvo desconectado
+# se perdieron
+RECONNECTED_TOPIC = "bus.reconnected"
+
+
+class BroadcastBus(ABC):
+    """Canal por el que los workers de la API se reparten los mensajes para los websockets.
+    Cada administrador de conexiones publica en el bus y entrega a sus propios sockets lo que recibe,
+    sin importar qué worker atendió el request que originó el mensaje.
+    """
+
+    handlers: Dict[str, Handler]
+
+    def __init__(self):
+        self.handlers = {}
+        # Identifica los mensajes publicados por este proceso
+        self.origin = f"{os.getpid()}-{id(self)}"
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        """Registra la función que entrega localmente los mensajes de un tema
+
+        Args:
+            topic (str): Tema del mensaje
+            handler (Handler): Función que recibe el mensaje
+        """
+        self.handlers[topic] = handler
+
+    async def deliver(self, topic: str, message: Any) -> None:
+        handler = self.handlers.get(topic)
+        if handler is not None:
+            await handler(message)
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    @abstractmethod
+    async def publish(self, topic: str, message: Any) -> None:
+        """Envía un mensaje a todos los workers, incluido este
+
+        Args:
+            topic (str): Tema del mensaje
+            message (Any): Cuerpo del mensaje, serializable a JSON
+        """
+
+    @abstractmethod
+    def publish_threadsafe(self, topic: str, message: Any) -> None:
+        """Envía un mensaje a los demás workers desde cualquier hilo, sin esperar a que se envíe
+
+        Args:
+            topic (str): Tema del mensaje
+            message (Any): Cuerpo del mensaje, serializable a JSON
+        """
+
+
+class InMemoryBus(BroadcastBus):
+    """Bus de un único worker: entrega cada mensaje en el momento, dentro del mismo proceso"""
+
+    async def publish(self, topic: str, message: Any) -> None:
+        await self.deliver(topic, message)
+
+    def publish_threadsafe(self, topic: str, message: Any) -> None:
+        # No hay otros workers a los que avisar
+        pass
+
+
+class UnixSocketBus(BroadcastBus):
+    """Bus entre workers de la misma máquina a través del broker de src/shared/broker.py.
+    Cada mensaje es una línea JSON [tema, mensaje]; el broker la reenvía a todos los workers conectados,
+    incluido el que la publicó, por lo que todos la reciben en el mismo orden.
+    Si el broker cierra la conexión, el bus vuelve a conectarse esperando cada vez más entre intentos, y al
+    lograrlo entrega RECONNECTED_TOPIC a este worker.
+    """
+
+    def __init__(
+        self,
+        path: str = BUS_SOCKET_PATH,
+        reconnect_delay: float = BUS_RECONNECT_DELAY_SECONDS,
+        max_reconnect_delay: float = BUS_RECONNECT_MAX_DELAY_SECONDS,
+    ):
+        super().__init__()
+        self.path = path
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.reader_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        reader = await self.connect()
+        self.loop = asyncio.get_running_loop()
+        self.reader_task = self.loop.create_task(self.run(reader))
+
+    async def stop(self) -> None:
+        if self.reader_task is not None:
+            self.reader_task.cancel()
+            try:
+                await self.reader_task
+            except asyncio.CancelledError:
+                pass
+            self.reader_task = None
+        self.close_writer()
+
+    async def connect(self) -> asyncio.StreamReader:
+        reader, self.writer = await asyncio.open_unix_connection(self.path, limit=MESSAGE_LIMIT)
+        return reader
+
+    def close_writer(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    async def run(self, reader: asyncio.StreamReader) -> None:
+        """Lee los mensajes del broker mientras el bus esté iniciado, volviendo a conectarse si se corta"""
+        while True:
+            try:
+                await self.read(reader)
+                logger.warning("El broker del bus cerró la conexión")
+            except (OSError, ValueError) as error:
+                # ValueError: una línea que supera MESSAGE_LIMIT deja el stream en un estado inválido
+                logger.warning("Se perdió la conexión con el broker del bus: %r", error)
+            self.close_writer()
+            reader = await self.reconnect()
+            await self.deliver(RECONNECTED_TOPIC, None)
+
+    async def reconnect(self) -> asyncio.StreamReader:
+        delay = self.reconnect_delay
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                reader = await self.connect()
+            except OSError as error:
+                logger.warning("No se pudo conectar al broker del bus: %r", error)
+                delay = min(delay * 2, self.max_reconnect_delay)
+            else:
+                logger.info("Bus reconectado al broker")
+                return reader
+
+    async def read(self, reader: asyncio.StreamReader) -> None:
+        while line := await reader.readline():
+            try:
+                topic, message = orjson.loads(line)
+                await self.deliver(topic, message)
+            except Exception:
+                logger.exception("No se pudo entregar un mensaje del bus")
+
+    def write(self, topic: str, message: Any) -> bool:
+        """Encola el mensaje en la conexión con el broker. Devuelve False y lo descarta si está desconectado"""
+        if self.writer is None or self.writer.is_closing():
+            logger.warning("Bus desconectado del broker, se descarta un mensaje de %s", topic)
+            return False
+        self.writer.write(orjson.dumps([topic, message]) + b"\n")
+        return True
+
+    async def publish(self, topic: str, message: Any) -> None:
+        writer = self.writer
+        if not self.write(topic, message):
+            return
+        try:
+            await writer.drain()
+        except OSError as error:
+            # El lector detecta el corte y vuelve a conectarse
+            logger.warning("No se pudo enviar un mensaje de %s al broker del bus: %r", topic, error)
+
+    def publish_threadsafe(self, topic: str, message: Any) -> None:
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.write, topic, message)
+
+
+def create_bus(backend: str = BUS_BACKEND) -> BroadcastBus:
+    if backend == "unix":
+        return UnixSocketBus()
+    return InMemoryBus()
+
+
+bus = create_bus()
@@ -0,0 +1,68 @@
+import os
+
+# Cantidad máxima de mensajes pendientes de envío por conexión websocket
+WS_SEND_QUEUE_SIZE = 64
+
+# Qué hacer cuando la cola de un cliente lento se llena:
+# "drop_oldest" descarta el mensaje de estado más antiguo, "close" cierra la conexión
+WS_SLOW_CONSUMER_POLICY = "drop_oldest"
+
+# Código con el que se cierra la conexión de un cliente lento
+WS_SLOW_CONSUMER_CLOSE_CODE = 4008
+
+# Ping del protocolo websocket que el servidor envía a todas las conexiones, y que el navegador responde sin
+# intervención del cliente: cada cuántos segundos se envía, y cuántos segundos se espera el pong antes de cerrarla
+WS_PING_INTERVAL_SECONDS = 20
+WS_PING_TIMEOUT_SECONDS = 20
+
+# Latido de la aplicación para las conexiones que lo piden (?heartbeat=true): cada cuántos segundos se les envía un
+# mensaje de ping, y cuántos segundos sin recibir ningún mensaje del cliente se esperan antes de cerrarla
+WS_HEARTBEAT_INTERVAL_SECONDS = 20
+WS_HEARTBEAT_TIMEOUT_SECONDS = 60
+
+# Código con el que se cierra una conexión que dejó de responder al ping
+WS_HEARTBEAT_CLOSE_CODE = 4009
+
+# Perfil del motor SQLite: "production" ejecuta SQLITE_PRAGMAS en cada conexión y abre un pool de solo lectura
+# para la lista de salas y los snapshots, "default" usa la configuración de SQLite sin cambios
+DB_ENGINE_PROFILE = os.getenv("DB_ENGINE_PROFILE", "production")
+
+# Pragmas de cada conexión del perfil "production"
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -16000,
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+}
+
+# Conexiones del pool de escritura: una por request en curso, ya que las consultas se serializan en el hilo de
+# base de datos
+DB_POOL_SIZE = 10
+DB_MAX_OVERFLOW = 20
+
+# Conexiones e hilos del pool de solo lectura
+DB_READ_POOL_SIZE = 4
+
+# Ventana en la que se juntan los cambios de la lista de salas antes de enviarlos al lobby; con 0 se envían al
+# instante
+LOBBY_BROADCAST_WINDOW_SECONDS = 0.1
+
+# Hilos dedicados a bcrypt: limita cuántas contraseñas se calculan a la vez sin bloquear el event loop ni el hilo
+# de base de datos
+PASSWORD_HASH_WORKERS = 2
+
+# Verificaciones exitosas de contraseña recordadas por (sala, jugador)
+PASSWORD_CACHE_SIZE = 4096
+
+# Bus por el que los workers se reparten los mensajes de los websockets: "memory" para un único worker, "unix" para
+# varios workers conectados al broker (python -m src.shared.broker) en BUS_SOCKET_PATH
+BUS_BACKEND = os.getenv("BUS_BACKEND", "memory")
+BUS_SOCKET_PATH = os.getenv("BUS_SOCKET_PATH", "/tmp/switcher-bus.sock")
+
+# Espera antes de volver a conectarse al broker tras perder la conexión, que se duplica en cada intento fallido
+# hasta el máximo
+BUS_RECONNECT_DELAY_SECONDS = 0.1
+BUS_RECONNECT_MAX_DELAY_SECONDS = 5
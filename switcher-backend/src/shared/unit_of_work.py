@@ -0,0 +1,58 @@
+import inspect
+from abc import ABC, abstractmethod
+from types import TracebackType
+from typing import Any, Callable, Optional, Type
+
+
+async def run_effect(callback: Callable[..., Any], *args: Any) -> None:
+    """Ejecuta un efecto, esperándolo si es una corutina"""
+    result = callback(*args)
+    if inspect.isawaitable(result):
+        await result
+
+
+class UnitOfWork(ABC):
+    """Transacción de un caso de uso.
+    Mientras está abierta los repositorios no confirman sus cambios: se confirman todos juntos al salir del bloque,
+    o se descartan todos si el caso de uso falla.
+    """
+
+    @abstractmethod
+    async def after_commit(self, callback: Callable[..., Any], *args: Any) -> None:
+        """Ejecuta un efecto visible fuera de la base de datos (mensajes, timers) recién cuando se confirman los
+        cambios; si el caso de uso falla, el efecto se descarta
+
+        Args:
+            callback (Callable[..., Any]): Función o corutina a ejecutar
+        """
+
+    @abstractmethod
+    async def __aenter__(self) -> "UnitOfWork":
+        pass
+
+    @abstractmethod
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        pass
+
+
+class AutoCommit(UnitOfWork):
+    """Sin transacción propia: cada operación del repositorio confirma sus cambios"""
+
+    async def __aenter__(self) -> "AutoCommit":
+        return self
+
+    async def after_commit(self, callback: Callable[..., Any], *args: Any) -> None:
+        await run_effect(callback, *args)
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        pass
@@ -0,0 +1,366 @@
+import asyncio
+from collections import deque
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, NamedTuple, Optional, Set, Tuple, Union
+
+import orjson
+from fastapi.websockets import WebSocket, WebSocketDisconnect, WebSocketState
+
+from src.shared.config import (
+    WS_HEARTBEAT_CLOSE_CODE,
+    WS_HEARTBEAT_INTERVAL_SECONDS,
+    WS_HEARTBEAT_TIMEOUT_SECONDS,
+    WS_SEND_QUEUE_SIZE,
+    WS_SLOW_CONSUMER_CLOSE_CODE,
+    WS_SLOW_CONSUMER_POLICY,
+)
+
+
+class SlowConsumerPolicy(str, Enum):
+    DROP_OLDEST = "drop_oldest"
+    CLOSE = "close"
+
+
+class Frame(NamedTuple):
+    type: str
+    data: str
+
+
+class CloseFrame(NamedTuple):
+    code: int
+    reason: Optional[str]
+
+
+def encode_frame(type: str, payload: Any) -> Frame:
+    """Codifica un mensaje {"type", "payload"} una sola vez, para enviarlo a todos sus destinatarios
+
+    Args:
+        type (str): Tipo de mensaje
+        payload (Any): Cuerpo del mensaje
+    """
+    return Frame(type, orjson.dumps({"type": type, "payload": payload}).decode())
+
+
+class ConnectionSender:
+    """Cola de salida acotada de una conexión, vaciada por su propia tarea de escritura.
+    Encolar un mensaje nunca bloquea, por lo que un cliente lento solo demora sus propios mensajes.
+    """
+
+    queue: Deque[Union[Frame, CloseFrame]]
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_size: int = WS_SEND_QUEUE_SIZE,
+        policy: SlowConsumerPolicy = SlowConsumerPolicy(WS_SLOW_CONSUMER_POLICY),
+    ):
+        self.websocket = websocket
+        self.max_size = max_size
+        self.policy = policy
+        self.queue = deque()
+        self.dropped = 0
+        self.closing = False
+        self.loop = asyncio.get_running_loop()
+        self.ready = asyncio.Event()
+        self.writer = self.loop.create_task(self._write())
+
+    def send(self, frame: Frame) -> None:
+        """Encola un mensaje ya codificado para el cliente
+
+        Args:
+            frame (Frame): Mensaje a enviar
+        """
+        self._call(self._enqueue, frame)
+
+    def close(self, code: int = 1000, reason: Optional[str] = None) -> None:
+        """Cierra la conexión después de enviar los mensajes pendientes
+
+        Args:
+            code (int): Código de cierre
+            reason (Optional[str]): Motivo del cierre
+        """
+        self._call(self._enqueue_close, code, reason)
+
+    def stop(self) -> None:
+        """Detiene la tarea de escritura descartando los mensajes pendientes"""
+        self._call(self.writer.cancel)
+
+    def _call(self, callback: Callable[..., Any], *args) -> None:
+        # La conexión puede recibir mensajes desde otro event loop (por ejemplo, en los tests)
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self.loop:
+            callback(*args)
+        elif not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(callback, *args)
+
+    def _enqueue(self, frame: Frame) -> None:
+        if self.closing:
+            return
+        if len(self.queue) >= self.max_size and not self._make_room():
+            return
+        self.queue.append(frame)
+        self.ready.set()
+
+    def _make_room(self) -> bool:
+        if self.policy == SlowConsumerPolicy.DROP_OLDEST:
+            for index, frame in enumerate(self.queue):
+                if isinstance(frame, Frame) and frame.type == "status":
+                    del self.queue[index]
+                    self.dropped += 1
+                    return True
+
+        self.dropped += len(self.queue)
+        self.queue.clear()
+        self._enqueue_close(WS_SLOW_CONSUMER_CLOSE_CODE, "Cliente demasiado lento")
+        return False
+
+    def _enqueue_close(self, code: int, reason: Optional[str]) -> None:
+        if self.closing:
+            return
+        self.closing = True
+        self.queue.append(CloseFrame(code, reason))
+        self.ready.set()
+
+    async def _write(self) -> None:
+        try:
+            while True:
+                await self.ready.wait()
+                while self.queue:
+                    frame = self.queue.popleft()
+                    if isinstance(frame, CloseFrame):
+                        if self.websocket.client_state != WebSocketState.DISCONNECTED:
+                            await self.websocket.close(frame.code, frame.reason)
+                        return
+                    await self.websocket.send_text(frame.data)
+                self.ready.clear()
+        except Exception:
+            # El cliente se desconectó mientras se le enviaba un mensaje
+            self.queue.clear()
+
+
+class OutboundQueues:
+    """Registro de las colas de salida de todas las conexiones websocket abiertas"""
+
+    senders: Dict[WebSocket, ConnectionSender]
+
+    def __init__(self):
+        self.senders = {}
+
+    def clean_up(self):
+        """Detiene todas las tareas de escritura"""
+        for sender in self.senders.values():
+            sender.stop()
+        self.senders.clear()
+
+    def open(self, websocket: WebSocket) -> ConnectionSender:
+        """Crea la cola de salida de una conexión ya aceptada
+
+        Args:
+            websocket (WebSocket): Conexión con el cliente
+        """
+        sender = self.senders.get(websocket)
+        if sender is None:
+            sender = ConnectionSender(websocket)
+            self.senders[websocket] = sender
+        return sender
+
+    def send(self, websocket: WebSocket, frame: Frame) -> None:
+        """Encola un mensaje ya codificado para el cliente sin esperar a que se envíe.
+        Si la conexión no tiene cola de salida (todavía no se abrió, o ya se cerró) el mensaje se descarta.
+
+        Args:
+            websocket (WebSocket): Conexión con el cliente
+            frame (Frame): Mensaje a enviar
+        """
+        sender = self.senders.get(websocket)
+        if sender is not None:
+            sender.send(frame)
+
+    async def close(self, websocket: WebSocket, code: int = 1000, reason: Optional[str] = None) -> None:
+        """Cierra la conexión cuando termine de enviar los mensajes pendientes y la quita del registro.
+        Si el cliente ya se desconectó, descarta los mensajes pendientes.
+
+        Args:
+            websocket (WebSocket): Conexión con el cliente
+            code (int): Código de cierre
+            reason (Optional[str]): Motivo del cierre
+        """
+        if websocket.client_state == WebSocketState.DISCONNECTED:
+            self.discard(websocket)
+            return
+        sender = self.senders.pop(websocket, None)
+        if sender is not None:
+            sender.close(code, reason)
+        else:
+            await websocket.close(code, reason)
+
+    def discard(self, websocket: WebSocket) -> None:
+        """Quita la conexión del registro descartando sus mensajes pendientes
+
+        Args:
+            websocket (WebSocket): Conexión con el cliente
+        """
+        sender = self.senders.pop(websocket, None)
+        if sender is not None:
+            sender.stop()
+
+
+class ConnectionHub:
+    """Conexiones agrupadas por tema (una partida, una sala o el lobby), indexadas en ambas direcciones:
+    de tema y clave (el jugador) a la conexión, y de la conexión a su tema y clave.
+    Suscribir, desuscribir y buscar una conexión cuesta O(1), sin importar cuántas haya abiertas.
+    """
+
+    topics: Dict[Hashable, Dict[Hashable, WebSocket]]
+    subscriptions: Dict[WebSocket, Tuple[Hashable, Hashable]]
+
+    def __init__(self):
+        self.topics = {}
+        self.subscriptions = {}
+
+    def __len__(self) -> int:
+        return len(self.subscriptions)
+
+    def __contains__(self, websocket: WebSocket) -> bool:
+        return websocket in self.subscriptions
+
+    def clean_up(self):
+        """Quita todas las conexiones"""
+        self.topics.clear()
+        self.subscriptions.clear()
+
+    def subscribe(self, topic: Hashable, websocket: WebSocket, key: Optional[Hashable] = None) -> Optional[WebSocket]:
+        """Registra la conexión en el tema, reemplazando a la que tuviera la misma clave
+
+        Args:
+            topic (Hashable): Tema de la conexión
+            websocket (WebSocket): Conexión con el cliente
+            key (Optional[Hashable]): Clave de la conexión dentro del tema; si no se indica, la propia conexión
+
+        Returns:
+            Optional[WebSocket]: Conexión reemplazada, ya quitada del registro
+        """
+        key = websocket if key is None else key
+        self.unsubscribe(websocket)
+        members = self.topics.setdefault(topic, {})
+        previous = members.get(key)
+        if previous is not None:
+            del self.subscriptions[previous]
+        members[key] = websocket
+        self.subscriptions[websocket] = (topic, key)
+        return previous
+
+    def unsubscribe(self, websocket: WebSocket) -> Optional[Tuple[Hashable, Hashable]]:
+        """Quita la conexión del registro
+
+        Args:
+            websocket (WebSocket): Conexión con el cliente
+
+        Returns:
+            Optional[Tuple[Hashable, Hashable]]: Tema y clave que tenía la conexión, o None si no estaba registrada
+        """
+        subscription = self.subscriptions.pop(websocket, None)
+        if subscription is None:
+            return None
+        topic, key = subscription
+        members = self.topics[topic]
+        del members[key]
+        if not members:
+            del self.topics[topic]
+        return subscription
+
+    def get(self, topic: Hashable, key: Hashable) -> Optional[WebSocket]:
+        """Conexión con la clave indicada dentro del tema, o None si no hay una"""
+        return self.topics.get(topic, {}).get(key)
+
+    def members(self, topic: Hashable) -> Tuple[WebSocket, ...]:
+        """Conexiones del tema, en el orden en que se registraron"""
+        return tuple(self.topics.get(topic, {}).values())
+
+
+outbound_queues = OutboundQueues()
+
+
+class Heartbeat:
+    """Latido de la aplicación para las conexiones que lo piden.
+    Cada `interval` segundos envía un mensaje de ping a esas conexiones, y el cliente responde con un pong. Una
+    conexión de la que no llega ningún mensaje durante `timeout` segundos se da por perdida: su espera de mensajes
+    termina como una desconexión, por lo que se quita del registro sin acumular tareas ni mensajes pendientes.
+    Las demás conexiones se cierran con los pings del protocolo que envía el servidor (ver server_options en main).
+    """
+
+    connections: Set[WebSocket]
+
+    def __init__(self, interval: float = WS_HEARTBEAT_INTERVAL_SECONDS, timeout: float = WS_HEARTBEAT_TIMEOUT_SECONDS):
+        self.interval = interval
+        self.timeout = timeout
+        self.connections = set()
+        self.task: Optional[asyncio.Task] = None
+        self.pings = 0
+        self.reaped = 0
+
+    def clean_up(self):
+        """Detiene el envío de pings y olvida las conexiones"""
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        self.connections.clear()
+
+    def start(self) -> None:
+        """Empieza a enviar pings periódicamente en el event loop actual"""
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    def metrics(self) -> dict:
+        """Conexiones abiertas, conexiones con latido, rondas de ping enviadas y conexiones cerradas por no responder"""
+        return {
+            "open": len(outbound_queues.senders),
+            "heartbeat": len(self.connections),
+            "pings": self.pings,
+            "reaped": self.reaped,
+        }
+
+    def track(self, websocket: WebSocket) -> None:
+        self.connections.add(websocket)
+
+    def untrack(self, websocket: WebSocket) -> None:
+        self.connections.discard(websocket)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            self.ping()
+
+    def ping(self) -> None:
+        """Encola un ping para cada conexión con latido"""
+        if not self.connections:
+            return
+        frame = encode_frame("ping", None)
+        for websocket in tuple(self.connections):
+            outbound_queues.send(websocket, frame)
+        self.pings += 1
+
+    async def receive(self, websocket: WebSocket, receive: Callable[[], Awaitable[Any]]) -> Any:
+        """Espera el próximo mensaje del cliente, con el plazo del latido si la conexión lo pidió
+
+        Args:
+            websocket (WebSocket): Conexión con el cliente
+            receive (Callable[[], Awaitable[Any]]): Lectura del mensaje, por ejemplo websocket.receive_json
+
+        Raises:
+            WebSocketDisconnect: Si el cliente no envió nada dentro del plazo
+        """
+        if websocket not in self.connections:
+            return await receive()
+        try:
+            return await asyncio.wait_for(receive(), self.timeout)
+        except asyncio.TimeoutError:
+            self.connections.discard(websocket)
+            self.reaped += 1
+            raise WebSocketDisconnect(WS_HEARTBEAT_CLOSE_CODE, "Sin respuesta al ping")
+
+
+heartbeats = Heartbeat()
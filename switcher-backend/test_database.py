@@ -2,9 +2,10 @@ import os
 from urllib.parse import urlparse
 
 import pytest
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
-from src.database import SessionLocal, engine, get_db
+from src.database import SessionLocal, create_sqlite_engine, engine, get_db
 
 
 def test_get_db():
@@ -20,3 +21,33 @@ def test_session_local():
     session = SessionLocal()
     assert session.bind == engine
     session.close()
+
+
+def test_production_profile_pragmas(tmp_path):
+    path = str(tmp_path / "profile.sqlite")
+    production_engine = create_sqlite_engine(path, profile="production")
+    with production_engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+        assert connection.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+        assert connection.exec_driver_sql("PRAGMA temp_store").scalar() == 2
+        connection.exec_driver_sql("CREATE TABLE moves (id INTEGER PRIMARY KEY)")
+        connection.commit()
+    production_engine.dispose()
+
+
+def test_read_only_engine_rejects_writes(tmp_path):
+    path = str(tmp_path / "profile.sqlite")
+    production_engine = create_sqlite_engine(path, profile="production")
+    with production_engine.connect() as connection:
+        connection.exec_driver_sql("CREATE TABLE moves (id INTEGER PRIMARY KEY)")
+        connection.commit()
+
+    read_only_engine = create_sqlite_engine(path, profile="production", read_only=True)
+    with read_only_engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT count(*) FROM moves").scalar() == 0
+        with pytest.raises(OperationalError):
+            connection.exec_driver_sql("INSERT INTO moves (id) VALUES (1)")
+    read_only_engine.dispose()
+    production_engine.dispose()